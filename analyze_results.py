@@ -2,50 +2,57 @@
 """
 排序算法性能数据分析脚本 - 完整版本（修复中文显示问题）
 包含散点图、折线图、柱状图等多种可视化
+
+pandas / numpy / matplotlib 均在用到的函数内部导入，保证 --help 和启动足够快
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
+import math
 import os
 import sys
 from datetime import datetime
 
-def setup_plot_style():
-    """设置绘图样式 - 修复中文显示问题"""
+def setup_plot_style(quiet=False):
+    """设置绘图样式 - 使用缓存的中文字体查找结果（quiet=True时不输出提示，供渲染子进程使用）"""
+    import matplotlib.pyplot as plt
+    from install_chinese_fonts import find_chinese_fonts
     try:
-        # 方法1: 尝试使用系统中文字体
-        plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Microsoft YaHei', 'SimHei', 'Arial Unicode MS']
-        plt.rcParams['axes.unicode_minus'] = False
-        
-        # 测试中文字体是否可用
-        test_fig, test_ax = plt.subplots()
-        test_ax.text(0.5, 0.5, '测试中文', fontsize=12)
-        plt.close(test_fig)
-        print("✓ 中文字体设置成功")
-        
+        chinese_fonts = find_chinese_fonts()
     except Exception as e:
-        print(f"⚠ 中文字体设置失败: {e}")
+        chinese_fonts = []
+        if not quiet:
+            print(f"⚠ 中文字体查找失败: {e}")
+    
+    # DejaVu Sans优先，缺失的中文字形由后面的中文字体补齐
+    plt.rcParams['font.sans-serif'] = ['DejaVu Sans'] + chinese_fonts + ['Microsoft YaHei', 'SimHei', 'Arial Unicode MS']
+    plt.rcParams['axes.unicode_minus'] = False
+    if quiet:
+        return
+    if chinese_fonts:
+        print("✓ 中文字体设置成功")
+    else:
         print("⚠ 将使用英文标签")
-        # 如果中文字体不可用，使用英文标签
-        plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial']
-        plt.rcParams['axes.unicode_minus'] = False
 
-def check_dependencies():
-    """检查依赖包"""
-    try:
-        import pandas as pd
-        import matplotlib.pyplot as plt
-        import numpy as np
-        print("✓ 所有依赖包已安装")
-        return True
-    except ImportError as e:
-        print(f"✗ 缺少依赖包: {e}")
+def check_dependencies(need_charts=True):
+    """检查依赖包是否已安装（只查找模块，不导入，need_charts=False时不检查matplotlib）"""
+    from importlib.util import find_spec
+    packages = ['pandas', 'numpy'] + (['matplotlib'] if need_charts else [])
+    missing = [name for name in packages if find_spec(name) is None]
+    if missing:
+        print(f"✗ 缺少依赖包: {', '.join(missing)}")
         print("请运行: pip install matplotlib pandas numpy")
         return False
+    print("✓ 所有依赖包已安装")
+    return True
 
-def find_performance_log():
-    """查找性能日志文件"""
+def find_performance_log(log_path=None):
+    """查找性能日志文件（显式指定路径时只检查该路径）"""
+    if log_path is not None:
+        if os.path.exists(log_path):
+            print(f"✓ 找到性能日志文件: {log_path}")
+            return log_path
+        print(f"✗ 错误: 性能日志文件不存在: {log_path}")
+        return None
+    
     possible_paths = [
         '../results/performance_log.txt',
         './results/performance_log.txt',
@@ -64,331 +71,1863 @@ def find_performance_log():
     print("请先运行性能测试程序")
     return None
 
+def log_shards(log_file):
+    """返回并行调度的工作进程写出的日志分片（<日志名>.shard<N><扩展名>），按编号排序"""
+    import glob
+    import re
+    stem, ext = os.path.splitext(log_file)
+    pattern = re.compile(re.escape(stem) + r'\.shard(\d+)' + re.escape(ext) + '$')
+    shards = []
+    for path in glob.glob(f'{glob.escape(stem)}.shard*{ext}'):
+        match = pattern.match(path)
+        if match:
+            shards.append((int(match.group(1)), path))
+    return [path for _, path in sorted(shards)]
+
+def read_log_frame(log_file):
+    """按LOG_DTYPES读取日志（含日志分片）为带类型的原始结果表，缺少的列补默认值"""
+    import pandas as pd
+    # 归并排序的PivotStrategy为"N/A"，不能被当作缺失值
+    frames = [_fill_log_defaults(pd.read_csv(path, dtype=LOG_DTYPES, keep_default_na=False))
+              for path in [log_file] + log_shards(log_file)]
+    return pd.concat(frames, ignore_index=True).astype(LOG_DTYPES)
+
 def parse_performance_log(log_file):
-    """解析性能日志文件"""
+    """解析性能日志文件（自动合并同目录下的日志分片）"""
+    import pandas as pd
     try:
-        df = pd.read_csv(log_file)
-        print(f"✓ 成功读取性能数据: {len(df)} 条记录")
+        shards = log_shards(log_file)
+        df = read_log_frame(log_file)
+        print(f"✓ 成功读取性能数据: {len(df)} 条记录" + (f" (含 {len(shards)} 个日志分片)" if shards else ""))
         
         # 数据质量检查
         print(f"  数据规模范围: {df['Size'].min()} - {df['Size'].max()}")
-        
-        # 安全地获取列信息
-        if 'Algorithm' in df.columns:
-            print(f"  算法数量: {len(df['Algorithm'].unique())}")
-        if 'PivotStrategy' in df.columns:
-            print(f"  Pivot策略数量: {len(df['PivotStrategy'].unique())}")
+        print(f"  算法数量: {df['Algorithm'].nunique()}")
+        print(f"  Pivot策略数量: {df['PivotStrategy'].nunique()}")
         
         return df
     except Exception as e:
         print(f"✗ 读取性能日志失败: {e}")
         return pd.DataFrame()
 
-def create_scatter_plots(df):
-    """创建散点图分析"""
-    if df.empty:
-        print("✗ 没有数据可生成散点图")
-        return
-    
-    print("\n=== 生成散点图分析 ===")
-    
-    # 确保结果目录存在
-    os.makedirs('../results', exist_ok=True)
-    
-    # 1. 所有算法的散点图
+# 流式读取：每块行数、列类型与聚合键
+STREAM_CHUNK_ROWS = 500_000
+LOG_DTYPES = {
+    'Algorithm': 'category',
+    'PivotStrategy': 'category',
+    'Size': 'int32',
+    'Time(ms)': 'float32',
+    'Sorted': 'bool',
+    'Repeat': 'int32',
+    'Distribution': 'category',
+    'Threads': 'int32',
+    'TaskDepth': 'int32',
+    'AuxBytes': 'int64',
+    'Cycles': 'int64',
+    'Instructions': 'int64',
+    'BranchMisses': 'int64',
+    'LLCMisses': 'int64',
+    'MaxRSSKB': 'int64',
+    'Build': 'category',
+    'Batch': 'int32',
+    'TimedOut': 'bool',
+    'DType': 'category',
+}
+# 旧日志中缺少的列使用的默认值（早期C程序只测试均匀随机数据，每个单元计时一次，
+# 不记录线程数和任务深度，用0表示未记录；辅助内存、硬件计数器和峰值RSS未记录时用-1；构建配置未记录时为unknown；
+# 自适应计时之前每个样本只排序一次，也没有时间上限；多元素类型之前只测试int32）
+LOG_COLUMN_DEFAULTS = {
+    'Repeat': 0,
+    'Distribution': 'Uniform',
+    'Threads': 0,
+    'TaskDepth': 0,
+    'AuxBytes': -1,
+    'Cycles': -1,
+    'Instructions': -1,
+    'BranchMisses': -1,
+    'LLCMisses': -1,
+    'MaxRSSKB': -1,
+    'Build': 'unknown',
+    'Batch': 1,
+    'TimedOut': 0,
+    'DType': 'int32',
+}
+# 硬件计数器列（--counters模式下记录，内核不允许时为-1），聚合时只对有效值取平均
+COUNTER_COLUMNS = ['Cycles', 'Instructions', 'BranchMisses', 'LLCMisses']
+AGGREGATE_KEYS = ['Algorithm', 'PivotStrategy', 'Distribution', 'Build', 'DType', 'Threads', 'TaskDepth', 'Size']
+# 聚合键中的字符串列和整数列
+CATEGORY_KEYS = ['Algorithm', 'PivotStrategy', 'Distribution', 'Build', 'DType']
+NUMERIC_KEYS = [key for key in AGGREGATE_KEYS if key not in CATEGORY_KEYS]
+
+# 统计量：每个单元保留最近的样本数上限（内存有界），bootstrap重采样次数和置信水平
+STATS_SAMPLE_WINDOW = 200
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE_LEVEL = 0.95
+# 计算bootstrap置信区间所需的最少样本数：样本太少时重采样的中位数只有几种取值，区间没有意义，记为NaN
+BOOTSTRAP_MIN_SAMPLES = 5
+# 向量化bootstrap每批的元素数上限（单元数 × 重采样次数），限制临时数组的内存
+BOOTSTRAP_BATCH_ELEMENTS = 1 << 22
+
+def _fold_aggregates(running, chunk):
+    """将一个数据块折叠进累计聚合结果，running为(聚合表, 最近样本表)"""
+    # 累加使用float64，避免float32在长日志上的累计误差
+    chunk = chunk.assign(_Time64=chunk['Time(ms)'].astype('float64'),
+                         **{f'_{col}': chunk[col].where(chunk[col] >= 0).astype('float64')
+                            for col in COUNTER_COLUMNS})
+    part = chunk.groupby(AGGREGATE_KEYS, observed=True, dropna=False).agg(
+        Count=('Time(ms)', 'size'),
+        TimeSum=('_Time64', 'sum'),
+        TimeMin=('Time(ms)', 'min'),
+        TimeMax=('Time(ms)', 'max'),
+        SortedCount=('Sorted', 'sum'),
+        AuxMax=('AuxBytes', 'max'),
+        RSSMax=('MaxRSSKB', 'max'),
+        BatchMax=('Batch', 'max'),
+        TimedOutCount=('TimedOut', 'sum'),
+        **{f'{col}Sum': (f'_{col}', 'sum') for col in COUNTER_COLUMNS},
+        **{f'{col}Runs': (f'_{col}', 'count') for col in COUNTER_COLUMNS},
+    )
+    samples = chunk[AGGREGATE_KEYS + ['Time(ms)']].astype({col: str for col in CATEGORY_KEYS})
+    return _combine_running(running, (part, samples.groupby(AGGREGATE_KEYS).tail(STATS_SAMPLE_WINDOW)))
+
+def _combine_running(running, other):
+    """合并两份累计聚合结果（来自同一日志的不同块，或不同的日志分片）"""
+    import pandas as pd
+    if running is None:
+        return other
+    if other is None:
+        return running
+    stats, old_samples = running
+    part, samples = other
+    merged = pd.concat([stats, part])
+    stats = merged.groupby(level=AGGREGATE_KEYS, dropna=False).agg(
+        {'Count': 'sum', 'TimeSum': 'sum', 'TimeMin': 'min', 'TimeMax': 'max', 'SortedCount': 'sum',
+         'AuxMax': 'max', 'RSSMax': 'max', 'BatchMax': 'max', 'TimedOutCount': 'sum',
+         **{f'{col}{suffix}': 'sum' for col in COUNTER_COLUMNS for suffix in ('Sum', 'Runs')}})
+    samples = pd.concat([old_samples, samples], ignore_index=True)
+    return stats, samples.groupby(AGGREGATE_KEYS).tail(STATS_SAMPLE_WINDOW)
+
+def _sample_statistics(samples):
+    """按单元计算中位数、四分位距和中位数的bootstrap置信区间
+    
+    样本数相同的单元排成矩阵一起计算（不逐个单元循环），并共用重采样下标；
+    样本数少于BOOTSTRAP_MIN_SAMPLES的单元置信区间为NaN。
+    每行样本先排序：对有序样本，排好序的下标取出的就是排好序的重采样，
+    所以每次重采样的中位数只需按排序后下标的中间位置取值，不必对每个单元的每次重采样求中位数。
+    """
+    import numpy as np
+    rng = np.random.default_rng(0)  # 固定种子，保证报告可复现
+    alpha = (1 - CONFIDENCE_LEVEL) / 2
+    grouped = samples.groupby(AGGREGATE_KEYS, sort=False)['Time(ms)']
+    cells = grouped.size().rename('Samples').reset_index()
+    counts = cells['Samples'].to_numpy()
+    # 每个单元的样本排成一行：行号为单元编号，列号为单元内的序号
+    matrix = np.full((len(cells), int(counts.max()) if len(cells) else 0), np.nan)
+    matrix[grouped.ngroup().to_numpy(), grouped.cumcount().to_numpy()] = samples['Time(ms)'].to_numpy(dtype='float64')
+    
+    stats = np.full((len(cells), 5), np.nan)   # Q1, 中位数, Q3, CI下限, CI上限
+    for n in np.unique(counts):
+        rows = np.flatnonzero(counts == n)
+        values = np.sort(matrix[rows, :n], axis=1)
+        stats[rows, :3] = np.percentile(values, [25, 50, 75], axis=1).T
+        if n < BOOTSTRAP_MIN_SAMPLES:
+            continue
+        picks = np.sort(rng.integers(0, n, size=(BOOTSTRAP_RESAMPLES, n)), axis=1)
+        lower, upper = picks[:, (n - 1) // 2], picks[:, n // 2]
+        batch = max(1, BOOTSTRAP_BATCH_ELEMENTS // BOOTSTRAP_RESAMPLES)
+        for start in range(0, len(rows), batch):
+            block = values[start:start + batch]
+            medians = (block[:, lower] + block[:, upper]) / 2         # 单元 × 重采样
+            stats[rows[start:start + batch], 3:] = np.percentile(
+                medians, [100 * alpha, 100 * (1 - alpha)], axis=1).T
+    return cells.assign(Median=stats[:, 1], Q1=stats[:, 0], Q3=stats[:, 2], IQR=stats[:, 2] - stats[:, 0],
+                        CILow=stats[:, 3], CIHigh=stats[:, 4])
+
+def add_hardware_metrics(df):
+    """由计数器和内存列派生每元素指标：IPC、每元素分支预测失败/LLC缺失次数、每元素字节数"""
+    df = df.copy()
+    size = df['Size'].astype('float64')
+    df['IPC'] = df['Instructions'] / df['Cycles'].where(df['Cycles'] > 0)
+    df['BranchMissesPerElement'] = df['BranchMisses'] / size
+    df['LLCMissesPerElement'] = df['LLCMisses'] / size
+    df['RSSBytesPerElement'] = df['MaxRSSKB'] * 1024 / size
+    df['AuxBytesPerElement'] = df['AuxBytes'] / size
+    return df
+
+# 每种元素类型的字节数（与C端 SortKernels.element_size 一致）
+DTYPE_BYTES = {'int32': 4, 'int64': 8, 'float64': 8, 'record': 16}
+
+def add_throughput(df):
+    """吞吐量：每秒排序的元素数和字节数（有中位数时用中位数时间，否则用平均时间）"""
+    time_ms = df['Median'].fillna(df['Time(ms)']) if 'Median' in df.columns else df['Time(ms)']
+    seconds = time_ms.where(time_ms > 0) / 1000
+    df['ElementsPerSec'] = df['Size'] / seconds
+    df['BytesPerSec'] = df['ElementsPerSec'] * df['DType'].astype(str).map(DTYPE_BYTES).astype('float64')
+    return df
+
+def _finalize_aggregates(running):
+    """把累计结果转换为与原始日志列名一致的聚合表，并附加每个单元的统计量"""
+    import pandas as pd
+    if running is None:
+        return pd.DataFrame()
+    stats, samples = running
+    agg = stats.reset_index()
+    agg['Time(ms)'] = agg['TimeSum'] / agg['Count']
+    agg['Sorted'] = agg['SortedCount']
+    # 峰值辅助内存（字节），旧日志未记录时为NaN
+    agg['AuxBytes'] = agg['AuxMax'].where(agg['AuxMax'] >= 0).astype('float64')
+    # 硬件计数器取有效测量的平均值，峰值RSS取最大值；未测量时为NaN
+    for col in COUNTER_COLUMNS:
+        runs = agg[f'{col}Runs']
+        agg[col] = (agg[f'{col}Sum'] / runs).where(runs > 0)
+    agg['MaxRSSKB'] = agg['RSSMax'].where(agg['RSSMax'] >= 0).astype('float64')
+    # 自适应计时：每个样本批量排序的次数，单元是否因时间上限提前停止
+    agg['Batch'] = agg['BatchMax']
+    agg['TimedOut'] = agg['TimedOutCount'] > 0
+    agg = add_hardware_metrics(agg)
+    for col in CATEGORY_KEYS:
+        agg[col] = agg[col].astype(str)
+    agg = agg.astype({col: 'int64' for col in NUMERIC_KEYS})
+    agg = agg.merge(_sample_statistics(samples.astype({col: 'int64' for col in NUMERIC_KEYS})),
+                    on=AGGREGATE_KEYS, how='left')
+    # 精度：中位数置信区间的半宽占中位数的比例（样本数少于BOOTSTRAP_MIN_SAMPLES时为NaN）
+    agg['Precision'] = (agg['CIHigh'] - agg['CILow']) / 2 / agg['Median']
+    agg = add_throughput(agg)
+    for col in CATEGORY_KEYS:
+        agg[col] = agg[col].astype('category')
+    agg = agg.astype({col: 'int32' for col in NUMERIC_KEYS})
+    return agg.sort_values(AGGREGATE_KEYS, ignore_index=True)
+
+class _LogSlice:
+    """只暴露日志文件[start, end)区间的只读文件对象，供pandas分块读取"""
+
+    def __init__(self, f, start, end):
+        self._f = f
+        self._remaining = end - start
+        f.seek(start)
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        return iter(self.read().splitlines(keepends=True))
+
+def _complete_lines_end(f, size):
+    """返回最后一个完整行的结束偏移，忽略C程序尚未写完的行"""
+    pos = size
+    while pos > 0:
+        step = min(65536, pos)
+        f.seek(pos - step)
+        block = f.read(step)
+        idx = block.rfind(b'\n')
+        if idx >= 0:
+            return pos - step + idx + 1
+        pos -= step
+    return 0
+
+def _stream_fold(source, running, names=None, chunksize=STREAM_CHUNK_ROWS):
+    """从source分块读取日志行并折叠进running，返回(running, 行数)"""
+    import pandas as pd
+    total_rows = 0
+    # 归并排序的PivotStrategy为"N/A"，不能被当作缺失值
+    reader = pd.read_csv(source, dtype=LOG_DTYPES, chunksize=chunksize,
+                         keep_default_na=False,
+                         header=None if names else 'infer', names=names)
+    for chunk in reader:
+        total_rows += len(chunk)
+        running = _fold_aggregates(running, _fill_log_defaults(chunk))
+    return running, total_rows
+
+def _fill_log_defaults(chunk):
+    """补齐旧日志（或内存中的结果表）缺少的列"""
+    for col, default in LOG_COLUMN_DEFAULTS.items():
+        if col not in chunk.columns:
+            chunk[col] = default
+    return chunk
+
+def aggregate_performance_frame(raw):
+    """聚合内存中与性能日志列相同的原始结果表（每次计时一行），不经过日志文件"""
+    import pandas as pd
+    if raw.empty:
+        return pd.DataFrame()
+    chunk = _fill_log_defaults(raw.copy()).astype(LOG_DTYPES)
+    return _finalize_aggregates(_fold_aggregates(None, chunk))
+
+def stream_performance_log(log_file, chunksize=STREAM_CHUNK_ROWS):
+    """分块流式读取性能日志，只保留每个(算法, Pivot策略, 规模)的聚合统计"""
+    import pandas as pd
+    try:
+        running, total_rows = _stream_fold(log_file, None, chunksize=chunksize)
+        agg = _finalize_aggregates(running)
+        print(f"✓ 流式读取性能数据: {total_rows} 条记录 -> {len(agg)} 个聚合单元")
+        return agg
+    except Exception as e:
+        print(f"✗ 流式读取性能日志失败: {e}")
+        return pd.DataFrame()
+
+# 增量聚合缓存：与日志同目录的.npz文件，记录已解析到的字节偏移和文件指纹
+AGG_CACHE_SUFFIX = '.aggcache.npz'
+AGG_CACHE_VERSION = 9
+FINGERPRINT_BYTES = 4096
+AGG_VALUE_COLUMNS = (['Count', 'TimeSum', 'TimeMin', 'TimeMax', 'SortedCount', 'AuxMax', 'RSSMax', 'BatchMax',
+                      'TimedOutCount']
+                     + [f'{col}{suffix}' for col in COUNTER_COLUMNS for suffix in ('Sum', 'Runs')])
+
+def _log_fingerprint(f, offset):
+    """对已覆盖区间的开头和结尾各取一段做哈希，检测日志被截断或重写"""
+    import hashlib
+    digest = hashlib.sha1()
+    f.seek(0)
+    digest.update(f.read(min(FINGERPRINT_BYTES, offset)))
+    tail_start = max(0, offset - FINGERPRINT_BYTES)
+    f.seek(tail_start)
+    digest.update(f.read(offset - tail_start))
+    return digest.hexdigest()
+
+def _load_aggregate_cache(cache_file):
+    """读取聚合缓存，失败或版本不符时返回None"""
+    import pandas as pd
+    import numpy as np
+    try:
+        with np.load(cache_file, allow_pickle=False) as data:
+            if int(data['version']) != AGG_CACHE_VERSION:
+                return None
+            index = pd.MultiIndex.from_arrays([data[key] for key in AGGREGATE_KEYS], names=AGGREGATE_KEYS)
+            stats = pd.DataFrame({col: data[col] for col in AGG_VALUE_COLUMNS}, index=index)
+            samples = pd.DataFrame({col: data[f'Sample{col}'] for col in AGGREGATE_KEYS + ['Time(ms)']})
+            return int(data['offset']), str(data['fingerprint']), (stats, samples)
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _save_aggregate_cache(cache_file, offset, fingerprint, running):
+    """原子地写入聚合缓存"""
+    import numpy as np
+    stats, samples = running
+    flat = stats.reset_index()
+    tmp_file = cache_file + '.tmp.npz'
+    arrays = {col: flat[col].to_numpy() for col in AGG_VALUE_COLUMNS}
+    for key in AGGREGATE_KEYS:
+        dtype = str if key in CATEGORY_KEYS else 'int64'
+        arrays[key] = flat[key].to_numpy(dtype=dtype)
+        arrays[f'Sample{key}'] = samples[key].to_numpy(dtype=dtype)
+    arrays['SampleTime(ms)'] = samples['Time(ms)'].to_numpy(dtype='float32')
+    np.savez(tmp_file, version=AGG_CACHE_VERSION, offset=offset, fingerprint=fingerprint, **arrays)
+    os.replace(tmp_file, cache_file)
+
+def _load_log_running(log_file, use_cache=True):
+    """增量解析一个日志文件，返回(累计聚合结果, 新解析的行数, 是否使用了缓存)"""
+    cache_file = log_file + AGG_CACHE_SUFFIX
+    with open(log_file, 'rb') as f:
+        end = _complete_lines_end(f, os.fstat(f.fileno()).st_size)
+        f.seek(0)
+        header = f.readline().decode('utf-8').strip()
+        names = header.split(',')
+
+        cached = _load_aggregate_cache(cache_file) if use_cache else None
+        running, offset = None, 0
+        if cached is not None:
+            cached_offset, cached_fingerprint, cached_running = cached
+            if cached_offset <= end and _log_fingerprint(f, cached_offset) == cached_fingerprint:
+                running, offset = cached_running, cached_offset
+            else:
+                print(f"⚠ 性能日志已被截断或重写，聚合缓存失效: {log_file}")
+
+        new_rows = 0
+        if offset == 0 and end > 0:
+            running, new_rows = _stream_fold(_LogSlice(f, 0, end), None)
+        elif offset < end:
+            running, new_rows = _stream_fold(_LogSlice(f, offset, end), running, names=names)
+
+        if use_cache and running is not None and (new_rows or cached is None):
+            _save_aggregate_cache(cache_file, end, _log_fingerprint(f, end), running)
+    return running, new_rows, offset > 0
+
+def load_performance_aggregates(log_file, use_cache=True):
+    """增量加载聚合统计：只解析缓存之后追加的日志行，日志被重写时自动失效
+    
+    并行调度的工作进程写出的日志分片（见log_shards）各自缓存，加载后与主日志合并。
+    """
+    import pandas as pd
+    shards = log_shards(log_file)
+    running, new_rows, incremental = None, 0, False
+    try:
+        for path in [log_file] + shards:
+            part, rows, cached = _load_log_running(path, use_cache)
+            running = _combine_running(running, part)
+            new_rows += rows
+            incremental = incremental or cached
+    except Exception as e:
+        print(f"✗ 读取性能日志失败: {e}")
+        return pd.DataFrame()
+
+    agg = _finalize_aggregates(running)
+    source = "增量解析" if incremental else "完整解析"
+    shard_note = f", 合并 {len(shards)} 个日志分片" if shards else ""
+    print(f"✓ 读取性能数据({source}{shard_note}): 新增 {new_rows} 条记录 -> {len(agg)} 个聚合单元")
+    return agg
+
+# 列式结果存储（results_store.py）：所有图表和报告都需要的列，个别图表额外需要的列和算法分区
+STORE_BASE_COLUMNS = ['Algorithm', 'PivotStrategy', 'Distribution', 'Build', 'DType', 'Threads', 'TaskDepth',
+                      'Size', 'Time(ms)', 'Sorted', 'Batch', 'TimedOut']
+CHART_STORE_COLUMNS = {
+    'auxiliary_memory': ['AuxBytes'],
+    'ipc': ['Cycles', 'Instructions'],
+    'misses_per_element': ['BranchMisses', 'LLCMisses'],
+    'bytes_per_element': ['MaxRSSKB', 'AuxBytes'],
+}
+# 只用到部分算法的图表；未列出的图表需要所有算法
+CHART_STORE_ALGORITHMS = {
+    'quick_sort_pivot_scatter': ['Quick Sort (Recursive)', 'Quick Sort (Iterative)'],
+    'recursive_vs_iterative_scatter': ['Quick Sort (Recursive)', 'Quick Sort (Iterative)'],
+    'pivot_strategy_comparison_recursive': ['Quick Sort (Recursive)'],
+    'pivot_strategy_comparison_iterative': ['Quick Sort (Iterative)'],
+    'pivot_strategy_ranking': ['Quick Sort (Recursive)', 'Quick Sort (Iterative)'],
+    'strong_scaling_speedup': ['Merge Sort (Parallel)'],
+    'strong_scaling_efficiency': ['Merge Sort (Parallel)'],
+    'weak_scaling': ['Merge Sort (Parallel)'],
+}
+
+def store_read_plan(charts):
+    """根据要生成的图表确定从存储读取的列和算法分区，返回(列, 算法)，None表示全部
+
+    charts为None（全部图表）或[]（只生成报告）时读取全部列和分区；只生成部分图表时报告也只覆盖读到的数据。
+    """
+    if not charts:
+        return None, None
+    columns = list(STORE_BASE_COLUMNS)
+    algorithms = set()
+    for name in charts:
+        columns += [col for col in CHART_STORE_COLUMNS.get(name, []) if col not in columns]
+        if name not in CHART_STORE_ALGORITHMS:
+            algorithms = None
+        elif algorithms is not None:
+            algorithms.update(CHART_STORE_ALGORITHMS[name])
+    return columns, (sorted(algorithms) if algorithms is not None else None)
+
+def load_store_aggregates(store_dir, charts=None, algorithms=None, **filters):
+    """从列式结果存储读取（过滤条件和列选择下推到Parquet）并聚合，filters见results_store.load_results"""
+    import pandas as pd
+    from importlib.util import find_spec
+    if find_spec('pyarrow') is None:
+        print("✗ 读取结果存储需要pyarrow，请运行: pip install pyarrow")
+        return pd.DataFrame()
+    import results_store
+    columns, chart_algorithms = store_read_plan(charts)
+    if algorithms and chart_algorithms is not None:
+        algorithms = [algo for algo in algorithms if algo in chart_algorithms]
+    elif not algorithms:
+        algorithms = chart_algorithms
+    try:
+        raw = results_store.load_results(store_dir, columns=columns, algorithms=algorithms, **filters)
+    except (RuntimeError, FileNotFoundError) as e:
+        print(f"✗ {e}")
+        return pd.DataFrame()
+    agg = aggregate_performance_frame(raw)
+    column_note = 'all columns' if columns is None else f'{len(columns)} columns'
+    partition_note = 'all algorithms' if algorithms is None else ', '.join(algorithms)
+    print(f"✓ 从结果存储读取: {len(raw)} 条记录 ({column_note}; {partition_note}) -> {len(agg)} 个聚合单元")
+    return agg
+
+def _record_weights(df):
+    """聚合表按Count加权，原始日志每行权重为1"""
+    import pandas as pd
+    if 'Count' in df.columns:
+        return df['Count']
+    return pd.Series(1, index=df.index)
+
+def _weighted_mean_time(df, by):
+    """按分组计算平均时间，兼容原始日志与聚合表"""
+    weights = _record_weights(df)
+    weighted = df['Time(ms)'] * weights
+    return (weighted.groupby(df[by], observed=True).sum()
+            / weights.groupby(df[by], observed=True).sum()).sort_values()
+
+def relative_to_fastest(df, value_col='Time(ms)', group_cols='Size', among=None):
+    """计算每行相对于同组最快值的比值（向量化，结果与df的索引对齐）
+    
+    among为布尔Series时只在为True的行中取最快值（例如只与比较排序比），其余行同样得到相对该最快值的比值；
+    比值为1的行即同组最快的行。
+    """
+    if isinstance(group_cols, str):
+        group_cols = [group_cols]
+    values = df[value_col]
+    candidates = values if among is None else values.where(among)
+    fastest = candidates.groupby([df[c] for c in group_cols]).transform('min')
+    ratio = values / fastest
+    # 最快时间为0（计时精度不足）时无法比较，视为与最快相同
+    return ratio.where(fastest > 0, 1.0)
+
+def _numeric_rows(df):
+    """丢弃没有计时结果的行（列类型在读取时已按LOG_DTYPES确定，这里不再转换）"""
+    return df.dropna(subset=['Time(ms)', 'Size'])
+
+def _finish_chart(title, out_path, legend_kwargs=None, grid_axis='both',
+                  xlabel='Data Size', ylabel='Sorting Time (ms)', facet=None):
+    """设置坐标轴标签、标题和图例后保存图表（facet为分面的数据分布名，附加在标题后；grid_axis为None时不画网格）"""
+    import matplotlib.pyplot as plt
+    if facet is not None:
+        title = f'{title}\n[Distribution: {facet}]'
+    plt.xlabel(xlabel, fontsize=12, fontweight='bold')
+    plt.ylabel(ylabel, fontsize=12, fontweight='bold')
+    plt.title(title, fontsize=14, fontweight='bold')
+    if legend_kwargs is not None:
+        plt.legend(**legend_kwargs)
+    if grid_axis is not None:
+        plt.grid(True, alpha=0.3, axis=grid_axis)
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=300, bbox_inches='tight')
+    plt.close('all')
+
+def _plot_series(plt, series, **style):
+    """绘制一条规模-时间折线；有置信区间时画中位数并加误差棒，否则画平均时间"""
+    series = series.sort_values('Size')
+    if 'CILow' in series.columns and series['CILow'].notna().any():
+        yerr = [(series['Median'] - series['CILow']).fillna(0),
+                (series['CIHigh'] - series['Median']).fillna(0)]
+        plt.errorbar(series['Size'], series['Median'], yerr=yerr, capsize=4, **style)
+    else:
+        plt.plot(series['Size'], series['Time(ms)'], **style)
+
+# ----------------------------------------------------------------------------
+# 渲染任务：每个函数只接收预先筛选好的数据切片，可在独立进程中运行
+# ----------------------------------------------------------------------------
+
+def render_all_algorithms_scatter(data, out_path, facet=None):
+    """所有算法的散点图"""
+    import matplotlib.pyplot as plt
+    import numpy as np
     plt.figure(figsize=(14, 10))
     
     # 定义颜色和标记
-    algorithms = df['Algorithm'].unique()
+    algorithms = data['Algorithm'].unique()
     colors = plt.cm.Set3(np.linspace(0, 1, len(algorithms)))
     
     for i, algo in enumerate(algorithms):
-        algo_data = df[df['Algorithm'] == algo].copy()
-        algo_data['Time(ms)'] = pd.to_numeric(algo_data['Time(ms)'], errors='coerce')
-        algo_data['Size'] = pd.to_numeric(algo_data['Size'], errors='coerce')
-        algo_data = algo_data.dropna(subset=['Time(ms)', 'Size'])
-        
+        algo_data = data[data['Algorithm'] == algo]
         if not algo_data.empty:
             plt.scatter(algo_data['Size'], algo_data['Time(ms)'], 
                        color=colors[i], label=algo, alpha=0.7, s=60, edgecolors='black', linewidth=0.5)
     
-    plt.xlabel('Data Size', fontsize=12, fontweight='bold')
-    plt.ylabel('Sorting Time (ms)', fontsize=12, fontweight='bold')
-    plt.title('Scatter Plot of All Sorting Algorithms Performance', fontsize=14, fontweight='bold')
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('../results/all_algorithms_scatter.png', dpi=300, bbox_inches='tight')
-    print("✓ 生成散点图: all_algorithms_scatter.png")
-    
-    # 2. 快速排序不同pivot策略的散点图
+    _finish_chart('Scatter Plot of All Sorting Algorithms Performance', out_path,
+                  legend_kwargs={'bbox_to_anchor': (1.05, 1), 'loc': 'upper left'}, facet=facet)
+
+def render_quick_sort_pivot_scatter(data, out_path, facet=None):
+    """快速排序不同pivot策略的散点图"""
+    import matplotlib.pyplot as plt
+    import numpy as np
     plt.figure(figsize=(14, 10))
     
-    quick_sort_data = df[df['Algorithm'].str.contains('Quick Sort', na=False)].copy()
-    pivot_strategies = quick_sort_data['PivotStrategy'].unique()
-    
+    pivot_strategies = data['PivotStrategy'].unique()
     colors_pivot = plt.cm.viridis(np.linspace(0, 1, len(pivot_strategies)))
     markers = ['o', 's', '^', 'D', 'v', '<', '>', 'p', '*', 'h']
     
     for i, strategy in enumerate(pivot_strategies):
-        strategy_data = quick_sort_data[quick_sort_data['PivotStrategy'] == strategy].copy()
-        strategy_data['Time(ms)'] = pd.to_numeric(strategy_data['Time(ms)'], errors='coerce')
-        strategy_data['Size'] = pd.to_numeric(strategy_data['Size'], errors='coerce')
-        strategy_data = strategy_data.dropna(subset=['Time(ms)', 'Size'])
-        
+        strategy_data = data[data['PivotStrategy'] == strategy]
         if not strategy_data.empty:
             plt.scatter(strategy_data['Size'], strategy_data['Time(ms)'], 
                        color=colors_pivot[i], marker=markers[i % len(markers)], 
                        label=f'{strategy}', alpha=0.8, s=80, edgecolors='white', linewidth=1)
     
-    plt.xlabel('Data Size', fontsize=12, fontweight='bold')
-    plt.ylabel('Sorting Time (ms)', fontsize=12, fontweight='bold')
-    plt.title('Quick Sort Performance with Different Pivot Strategies', fontsize=14, fontweight='bold')
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('../results/quick_sort_pivot_scatter.png', dpi=300, bbox_inches='tight')
-    print("✓ 生成散点图: quick_sort_pivot_scatter.png")
-    
-    # 3. 递归vs迭代快速排序散点图对比
+    _finish_chart('Quick Sort Performance with Different Pivot Strategies', out_path,
+                  legend_kwargs={'bbox_to_anchor': (1.05, 1), 'loc': 'upper left'}, facet=facet)
+
+def render_recursive_vs_iterative_scatter(data, out_path, facet=None):
+    """递归vs迭代快速排序散点图对比（Median3策略）"""
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(14, 8))
     
-    recursive_data = df[df['Algorithm'] == 'Quick Sort (Recursive)'].copy()
-    iterative_data = df[df['Algorithm'] == 'Quick Sort (Iterative)'].copy()
-    
-    # 只使用Median3策略进行比较
-    recursive_median = recursive_data[recursive_data['PivotStrategy'] == 'Median3'].copy()
-    iterative_median = iterative_data[iterative_data['PivotStrategy'] == 'Median3'].copy()
-    
-    recursive_median['Time(ms)'] = pd.to_numeric(recursive_median['Time(ms)'], errors='coerce')
-    recursive_median['Size'] = pd.to_numeric(recursive_median['Size'], errors='coerce')
-    iterative_median['Time(ms)'] = pd.to_numeric(iterative_median['Time(ms)'], errors='coerce')
-    iterative_median['Size'] = pd.to_numeric(iterative_median['Size'], errors='coerce')
-    
-    recursive_median = recursive_median.dropna(subset=['Time(ms)', 'Size'])
-    iterative_median = iterative_median.dropna(subset=['Time(ms)', 'Size'])
+    recursive_median = data[data['Algorithm'] == 'Quick Sort (Recursive)']
+    iterative_median = data[data['Algorithm'] == 'Quick Sort (Iterative)']
     
     plt.scatter(recursive_median['Size'], recursive_median['Time(ms)'], 
                color='red', marker='o', label='Recursive Quick Sort (Median3)', alpha=0.7, s=70)
     plt.scatter(iterative_median['Size'], iterative_median['Time(ms)'], 
                color='blue', marker='s', label='Iterative Quick Sort (Median3)', alpha=0.7, s=70)
     
-    plt.xlabel('Data Size', fontsize=12, fontweight='bold')
-    plt.ylabel('Sorting Time (ms)', fontsize=12, fontweight='bold')
-    plt.title('Recursive vs Iterative Quick Sort Performance Comparison (Median3 Pivot)', fontsize=14, fontweight='bold')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('../results/recursive_vs_iterative_scatter.png', dpi=300, bbox_inches='tight')
-    print("✓ 生成散点图: recursive_vs_iterative_scatter.png")
-    
-    # 4. 性能密度散点图（用颜色表示性能密度）
+    _finish_chart('Recursive vs Iterative Quick Sort Performance Comparison (Median3 Pivot)', out_path,
+                  legend_kwargs={}, facet=facet)
+
+def render_performance_density_scatter(data, out_path, facet=None):
+    """性能密度散点图（用颜色表示相对最快算法的性能比）"""
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(14, 10))
     
-    # 为所有数据点创建性能密度映射
-    all_data = df.copy()
-    all_data['Time(ms)'] = pd.to_numeric(all_data['Time(ms)'], errors='coerce')
-    all_data['Size'] = pd.to_numeric(all_data['Size'], errors='coerce')
-    all_data = all_data.dropna(subset=['Time(ms)', 'Size'])
-    
-    # 计算每个数据点的相对性能（相对于该规模下的最快时间）
-    performance_ratio = []
-    for size in all_data['Size'].unique():
-        size_data = all_data[all_data['Size'] == size]
-        min_time = size_data['Time(ms)'].min()
-        for idx, row in size_data.iterrows():
-            ratio = row['Time(ms)'] / min_time if min_time > 0 else 1
-            performance_ratio.append(ratio)
-    
-    all_data['PerformanceRatio'] = performance_ratio
-    
-    scatter = plt.scatter(all_data['Size'], all_data['Time(ms)'], 
-                         c=all_data['PerformanceRatio'], cmap='RdYlGn_r', 
+    scatter = plt.scatter(data['Size'], data['Time(ms)'], 
+                         c=data['PerformanceRatio'], cmap='RdYlGn_r', 
                          alpha=0.7, s=60, edgecolors='black', linewidth=0.5)
     
     plt.colorbar(scatter, label='Performance Ratio (Relative to Fastest Algorithm)')
-    plt.xlabel('Data Size', fontsize=12, fontweight='bold')
-    plt.ylabel('Sorting Time (ms)', fontsize=12, fontweight='bold')
-    plt.title('Performance Density Scatter Plot\n(Color indicates performance ratio relative to fastest algorithm)', fontsize=14, fontweight='bold')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('../results/performance_density_scatter.png', dpi=300, bbox_inches='tight')
-    print("✓ 生成散点图: performance_density_scatter.png")
-    
-    plt.close('all')
+    _finish_chart('Performance Density Scatter Plot\n(Color indicates performance ratio relative to fastest algorithm)',
+                  out_path, facet=facet)
 
-def create_pivot_analysis_charts(df):
-    """创建pivot策略分析图表"""
-    if df.empty:
-        print("✗ 没有数据可分析")
-        return
+def render_pivot_strategy_lines(data, version, out_path, facet=None):
+    """不同pivot策略性能比较折线图（单个快速排序版本）"""
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(14, 8))
     
-    # 确保结果目录存在
-    os.makedirs('../results', exist_ok=True)
+    for i, strategy in enumerate(PIVOT_STRATEGIES):
+        strategy_data = data[data['PivotStrategy'] == strategy]
+        if not strategy_data.empty:
+            _plot_series(plt, strategy_data,
+                         marker=PIVOT_MARKERS[i], label=f'{strategy}', 
+                         color=PIVOT_COLORS[i], linewidth=2.5, markersize=8, markeredgecolor='white', markeredgewidth=1)
     
-    print("\n=== 生成Pivot策略分析图表 ===")
+    _finish_chart(f'Quick Sort Performance with Different Pivot Strategies\n({version} Version)', out_path,
+                  legend_kwargs={'fontsize': 11}, facet=facet)
+
+def render_algorithm_comparison(data, out_path, facet=None):
+    """所有算法性能比较（快速排序使用Median3策略）"""
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(14, 8))
     
-    # 检查必要的列是否存在
-    required_columns = ['Algorithm', 'PivotStrategy', 'Size', 'Time(ms)']
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    if missing_columns:
-        print(f"✗ 缺少必要列: {missing_columns}")
-        return
+    colors_algo = ['#E74C3C', '#3498DB', '#2ECC71', '#9B59B6', '#E67E22', '#1ABC9C']
+    markers_algo = ['o', 's', '^', 'D', 'P', 'X']
     
-    # 1. 不同pivot策略性能比较（递归快速排序）
-    plt.figure(figsize=(14, 8))
+    for i, (label, (algo, strategy)) in enumerate(BEST_PIVOT_COMPARISON.items()):
+        if strategy == 'N/A':
+            # 归并排序、基数排序和样本排序
+            algo_data = data[data['Algorithm'] == algo]
+        else:
+            # 快速排序（使用Median3策略）
+            algo_data = data[(data['Algorithm'] == algo) & (data['PivotStrategy'] == strategy)]
+        
+        if not algo_data.empty:
+            _plot_series(plt, algo_data,
+                         marker=markers_algo[i], label=label, 
+                         color=colors_algo[i], linewidth=2.5, markersize=8)
     
-    pivot_strategies = ['First', 'Last', 'Middle', 'Random', 'Median3']
-    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
-    markers = ['o', 's', '^', 'D', 'v']
+    _finish_chart('Sorting Algorithm Performance Comparison (Using Best Pivot Strategy)', out_path,
+                  legend_kwargs={'fontsize': 11}, facet=facet)
+
+def render_auxiliary_memory(data, out_path, facet=None):
+    """峰值辅助内存随规模的变化（对数坐标，快速排序使用Median3策略）"""
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(14, 8))
     
-    # 筛选递归快速排序的结果
-    qs_recursive = df[df['Algorithm'] == 'Quick Sort (Recursive)'].copy()
+    colors_algo = ['#E74C3C', '#3498DB', '#2ECC71', '#9B59B6', '#E67E22', '#1ABC9C']
+    markers_algo = ['o', 's', '^', 'D', 'P', 'X']
+    
+    for i, (label, (algo, strategy)) in enumerate(BEST_PIVOT_COMPARISON.items()):
+        algo_data = data[data['Algorithm'] == algo]
+        if strategy != 'N/A':
+            algo_data = algo_data[algo_data['PivotStrategy'] == strategy]
+        # 同一规模下可能有多个线程/深度配置，取最大值
+        series = algo_data.groupby('Size')['AuxBytes'].max().dropna()
+        series = series[series > 0]
+        if not series.empty:
+            plt.plot(series.index, series.values, marker=markers_algo[i], label=label,
+                     color=colors_algo[i], linewidth=2.5, markersize=8)
+    
+    plt.yscale('log')
+    _finish_chart('Peak Auxiliary Memory per Sort', out_path, legend_kwargs={'fontsize': 11},
+                  ylabel='Peak Auxiliary Memory (bytes)', facet=facet)
+
+def render_pivot_strategy_ranking(pivot_performance, out_path, facet=None):
+    """Pivot策略性能排名（柱状图），pivot_performance为按时间排序的(策略, 平均时间)列表"""
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(12, 8))
     
-    # 确保数据是数值类型
-    qs_recursive['Time(ms)'] = pd.to_numeric(qs_recursive['Time(ms)'], errors='coerce')
-    qs_recursive['Size'] = pd.to_numeric(qs_recursive['Size'], errors='coerce')
-    qs_recursive = qs_recursive.dropna(subset=['Time(ms)', 'Size'])
+    strategies_sorted = [x[0] for x in pivot_performance]
+    times_sorted = [x[1] for x in pivot_performance]
     
-    for i, strategy in enumerate(pivot_strategies):
-        strategy_data = qs_recursive[qs_recursive['PivotStrategy'] == strategy]
-        if not strategy_data.empty:
-            strategy_data = strategy_data.sort_values('Size')
-            plt.plot(strategy_data['Size'], strategy_data['Time(ms)'], 
-                    marker=markers[i], label=f'{strategy}', 
-                    color=colors[i], linewidth=2.5, markersize=8, markeredgecolor='white', markeredgewidth=1)
-    
-    plt.xlabel('Data Size', fontsize=12, fontweight='bold')
-    plt.ylabel('Sorting Time (ms)', fontsize=12, fontweight='bold')
-    plt.title('Quick Sort Performance with Different Pivot Strategies\n(Recursive Version)', fontsize=14, fontweight='bold')
-    plt.legend(fontsize=11)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('../results/pivot_strategy_comparison_recursive.png', dpi=300, bbox_inches='tight')
-    print("✓ 生成图表: pivot_strategy_comparison_recursive.png")
+    # 创建渐变色
+    cmap = plt.cm.viridis
+    colors_bar = [cmap(i / len(strategies_sorted)) for i in range(len(strategies_sorted))]
     
-    # 2. 不同pivot策略性能比较（迭代快速排序）
-    plt.figure(figsize=(14, 8))
+    bars = plt.bar(strategies_sorted, times_sorted, color=colors_bar, edgecolor='black')
     
-    qs_iterative = df[df['Algorithm'] == 'Quick Sort (Iterative)'].copy()
+    # 在柱子上添加数值和排名
+    for i, (bar, time_val) in enumerate(zip(bars, times_sorted)):
+        plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(times_sorted)*0.01,
+                f'{time_val:.1f} ms\n(Rank {i+1})', ha='center', va='bottom', fontweight='bold')
     
-    qs_iterative['Time(ms)'] = pd.to_numeric(qs_iterative['Time(ms)'], errors='coerce')
-    qs_iterative['Size'] = pd.to_numeric(qs_iterative['Size'], errors='coerce')
-    qs_iterative = qs_iterative.dropna(subset=['Time(ms)', 'Size'])
+    _finish_chart('Pivot Strategy Performance Ranking\n(Average Across All Data Sizes)', out_path,
+                  grid_axis='y', xlabel='Pivot Selection Strategy', ylabel='Average Sorting Time (ms)',
+                  facet=facet)
+
+def render_strong_scaling_speedup(scaling, fits, out_path, facet=None):
+    """强扩展加速比折线图：每个规模一条线，附理想线性加速比和Amdahl拟合曲线"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    plt.figure(figsize=(12, 8))
     
-    for i, strategy in enumerate(pivot_strategies):
-        strategy_data = qs_iterative[qs_iterative['PivotStrategy'] == strategy]
-        if not strategy_data.empty:
-            strategy_data = strategy_data.sort_values('Size')
-            plt.plot(strategy_data['Size'], strategy_data['Time(ms)'], 
-                    marker=markers[i], label=f'{strategy}', 
-                    color=colors[i], linewidth=2.5, markersize=8, markeredgecolor='white', markeredgewidth=1)
-    
-    plt.xlabel('Data Size', fontsize=12, fontweight='bold')
-    plt.ylabel('Sorting Time (ms)', fontsize=12, fontweight='bold')
-    plt.title('Quick Sort Performance with Different Pivot Strategies\n(Iterative Version)', fontsize=14, fontweight='bold')
-    plt.legend(fontsize=11)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('../results/pivot_strategy_comparison_iterative.png', dpi=300, bbox_inches='tight')
-    print("✓ 生成图表: pivot_strategy_comparison_iterative.png")
+    max_threads = scaling['Threads'].max()
+    plt.plot([1, max_threads], [1, max_threads], 'k--', linewidth=1, label='Ideal (linear)')
+    colors = plt.cm.viridis(np.linspace(0, 0.9, scaling['Size'].nunique()))
+    threads_grid = np.linspace(1, max_threads, 50)
+    for color, (size, series) in zip(colors, scaling.groupby('Size')):
+        series = series.sort_values('Threads')
+        plt.plot(series['Threads'], series['Speedup'], marker='o', color=color, linewidth=2.5,
+                 markersize=8, label=f'n = {size:,}')
+        fit = fits[fits['Size'] == size]
+        if not fit.empty:
+            f = fit['ParallelFraction'].iloc[0]
+            plt.plot(threads_grid, 1 / ((1 - f) + f / threads_grid), ':', color=color, linewidth=1.5)
+    
+    _finish_chart('Merge Sort Strong Scaling: Speedup vs Threads\n(dotted: Amdahl fit)', out_path,
+                  legend_kwargs={'fontsize': 10}, xlabel='Threads', ylabel='Speedup over 1 Thread', facet=facet)
+
+def render_strong_scaling_efficiency(scaling, out_path, facet=None):
+    """强扩展并行效率折线图（加速比 / 线程数）"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    plt.figure(figsize=(12, 8))
     
-    # 3. 所有算法性能比较
-    plt.figure(figsize=(14, 8))
+    colors = plt.cm.viridis(np.linspace(0, 0.9, scaling['Size'].nunique()))
+    for color, (size, series) in zip(colors, scaling.groupby('Size')):
+        series = series.sort_values('Threads')
+        plt.plot(series['Threads'], series['Efficiency'], marker='s', color=color, linewidth=2.5,
+                 markersize=8, label=f'n = {size:,}')
+    plt.axhline(SCALING_EFFICIENCY_TARGET, color='red', linestyle='--', linewidth=1,
+                label=f'{SCALING_EFFICIENCY_TARGET:.0%} efficiency')
     
-    algorithms_comparison = {
-        'Quick Sort (Recursive) - Median3': ('Quick Sort (Recursive)', 'Median3'),
-        'Quick Sort (Iterative) - Median3': ('Quick Sort (Iterative)', 'Median3'),
-        'Merge Sort (Parallel)': ('Merge Sort (Parallel)', 'N/A')
-    }
+    _finish_chart('Merge Sort Strong Scaling: Parallel Efficiency', out_path,
+                  legend_kwargs={'fontsize': 10}, xlabel='Threads', ylabel='Parallel Efficiency', facet=facet)
+
+def render_weak_scaling(weak, out_path, facet=None):
+    """弱扩展效率折线图：每线程元素个数固定，效率 = T(1线程) / T(p线程)"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    plt.figure(figsize=(12, 8))
     
-    colors_algo = ['#E74C3C', '#3498DB', '#2ECC71']
-    markers_algo = ['o', 's', '^']
+    colors = plt.cm.plasma(np.linspace(0, 0.9, weak['PerThread'].nunique()))
+    for color, (per_thread, series) in zip(colors, weak.groupby('PerThread')):
+        series = series.sort_values('Threads')
+        plt.plot(series['Threads'], series['Efficiency'], marker='^', color=color, linewidth=2.5,
+                 markersize=8, label=f'{per_thread:,} elements / thread')
+    plt.axhline(1.0, color='black', linestyle='--', linewidth=1, label='Ideal')
     
-    for i, (label, (algo, strategy)) in enumerate(algorithms_comparison.items()):
-        if strategy == 'N/A':
-            # 归并排序
-            algo_data = df[df['Algorithm'] == algo].copy()
+    _finish_chart('Merge Sort Weak Scaling Efficiency', out_path,
+                  legend_kwargs={'fontsize': 10}, xlabel='Threads', ylabel='Weak Scaling Efficiency', facet=facet)
+
+def _counter_series(data):
+    """硬件计数器图表的曲线：递归快速排序的每种pivot策略 + 两种归并排序、基数排序和样本排序，返回[(标签, 数据, 样式)]"""
+    series = []
+    quick_sort = data[data['Algorithm'] == 'Quick Sort (Recursive)']
+    for i, strategy in enumerate(PIVOT_STRATEGIES):
+        series.append((f'Quick Sort - {strategy}', quick_sort[quick_sort['PivotStrategy'] == strategy],
+                       {'color': PIVOT_COLORS[i], 'marker': PIVOT_MARKERS[i]}))
+    for algo, color in (('Merge Sort (Parallel)', '#2ECC71'), ('Merge Sort (Buffered)', '#9B59B6'),
+                        ('Radix Sort (LSD)', '#E67E22'), ('Sample Sort (Parallel)', '#1ABC9C')):
+        series.append((algo, data[data['Algorithm'] == algo],
+                       {'color': color, 'marker': 'o', 'linestyle': '--'}))
+    return series
+
+def _plot_metric(ax, data, metric, **style):
+    """在ax上绘制一条规模-指标折线（同一规模有多个并行配置时取平均），没有有效值时返回False"""
+    values = data.groupby('Size')[metric].mean().dropna()
+    if values.empty:
+        return False
+    ax.plot(values.index, values.values, linewidth=2, markersize=7, **style)
+    return True
+
+def render_ipc(data, out_path, facet=None):
+    """每周期指令数（IPC）随规模的变化"""
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(14, 8))
+    ax = plt.gca()
+    for label, series, style in _counter_series(data):
+        _plot_metric(ax, series, 'IPC', label=label, **style)
+    plt.xscale('log')
+    _finish_chart('Instructions per Cycle (IPC)', out_path, legend_kwargs={'fontsize': 10, 'ncol': 2},
+                  ylabel='Instructions per Cycle', facet=facet)
+
+def _render_metric_panels(data, panels, title, out_path, facet=None, series_func=None):
+    """左右两个子图分别绘制两种每元素指标，panels为[(列名, 子图标题, y轴标签)]"""
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(1, len(panels), figsize=(18, 8))
+    if facet is not None:
+        title = f'{title}\n[Distribution: {facet}]'
+    for ax, (metric, panel_title, ylabel) in zip(axes, panels):
+        plotted = [_plot_metric(ax, series, metric, label=label, **style)
+                   for label, series, style in (series_func or _counter_series)(data)]
+        ax.set_xscale('log')
+        ax.set_xlabel('Data Size', fontsize=12, fontweight='bold')
+        ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
+        ax.set_title(panel_title, fontsize=13, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        if any(plotted):
+            ax.legend(fontsize=9)
         else:
-            # 快速排序（使用Median3策略）
-            algo_data = df[(df['Algorithm'] == algo) & (df['PivotStrategy'] == strategy)].copy()
-        
-        algo_data['Time(ms)'] = pd.to_numeric(algo_data['Time(ms)'], errors='coerce')
-        algo_data['Size'] = pd.to_numeric(algo_data['Size'], errors='coerce')
-        algo_data = algo_data.dropna(subset=['Time(ms)', 'Size'])
-        
-        if not algo_data.empty:
-            algo_data = algo_data.sort_values('Size')
-            plt.plot(algo_data['Size'], algo_data['Time(ms)'], 
-                    marker=markers_algo[i], label=label, 
-                    color=colors_algo[i], linewidth=2.5, markersize=8)
-    
-    plt.xlabel('Data Size', fontsize=12, fontweight='bold')
-    plt.ylabel('Sorting Time (ms)', fontsize=12, fontweight='bold')
-    plt.title('Sorting Algorithm Performance Comparison (Using Best Pivot Strategy)', fontsize=14, fontweight='bold')
-    plt.legend(fontsize=11)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('../results/algorithm_comparison_best_pivot.png', dpi=300, bbox_inches='tight')
-    print("✓ 生成图表: algorithm_comparison_best_pivot.png")
-    
-    # 4. Pivot策略性能排名（柱状图）
-    plt.figure(figsize=(12, 8))
+            ax.text(0.5, 0.5, 'not measured', ha='center', va='center', transform=ax.transAxes)
+    fig.suptitle(title, fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=300, bbox_inches='tight')
+    plt.close('all')
+
+def render_misses_per_element(data, out_path, facet=None):
+    """每元素分支预测失败次数和LLC缺失次数"""
+    _render_metric_panels(data, [('BranchMissesPerElement', 'Branch Misses per Element', 'Branch Misses / n'),
+                                 ('LLCMissesPerElement', 'LLC Misses per Element', 'LLC Misses / n')],
+                          'Hardware Counter Misses per Element', out_path, facet=facet)
+
+def _memory_series(data):
+    """内存图表的曲线：与算法比较图相同（快速排序使用Median3策略）"""
+    colors_algo = ['#E74C3C', '#3498DB', '#2ECC71', '#9B59B6', '#E67E22', '#1ABC9C']
+    markers_algo = ['o', 's', '^', 'D', 'P', 'X']
+    series = []
+    for i, (label, (algo, strategy)) in enumerate(BEST_PIVOT_COMPARISON.items()):
+        algo_data = data[data['Algorithm'] == algo]
+        if strategy != 'N/A':
+            algo_data = algo_data[algo_data['PivotStrategy'] == strategy]
+        series.append((label, algo_data, {'color': colors_algo[i], 'marker': markers_algo[i]}))
+    return series
+
+def render_bytes_per_element(data, out_path, facet=None):
+    """每元素字节数：进程峰值RSS / n 和峰值辅助内存 / n"""
+    _render_metric_panels(data, [('RSSBytesPerElement', 'Peak RSS per Element', 'Peak RSS Bytes / n'),
+                                 ('AuxBytesPerElement', 'Peak Auxiliary Memory per Element', 'Auxiliary Bytes / n')],
+                          'Memory Footprint per Element', out_path, facet=facet, series_func=_memory_series)
+
+# ----------------------------------------------------------------------------
+# 任务构建与调度
+# ----------------------------------------------------------------------------
+
+def render_build_speedup_heatmap(table, out_path, facet=None):
+    """渲染编译器变体矩阵热力图：行为(算法, Pivot策略)，列为构建，颜色为相对参考构建的加速比"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from matplotlib.colors import TwoSlopeNorm
+    reference = table['Reference'].iloc[0]
+    matrix = table.pivot_table(index=['Algorithm', 'PivotStrategy'], columns='Build', values='Speedup',
+                               observed=True)
+    labels = [algo if strategy == 'N/A' else f'{algo} / {strategy}' for algo, strategy in matrix.index]
+    values = matrix.to_numpy(dtype='float64')
+    
+    fig, ax = plt.subplots(figsize=(max(8, 1.4 * len(matrix.columns) + 4), max(5, 0.45 * len(labels) + 2)))
+    # 以1为中心的发散色标：绿色更快，红色更慢
+    low, high = min(float(np.nanmin(values)), 0.99), max(float(np.nanmax(values)), 1.01)
+    image = ax.imshow(values, cmap='RdYlGn', norm=TwoSlopeNorm(vcenter=1.0, vmin=low, vmax=high), aspect='auto')
+    for i in range(values.shape[0]):
+        for j in range(values.shape[1]):
+            if not np.isnan(values[i, j]):
+                ax.text(j, i, f'{values[i, j]:.2f}', ha='center', va='center', fontsize=9)
+    ax.set_xticks(range(len(matrix.columns)))
+    ax.set_xticklabels([str(build) for build in matrix.columns], rotation=30, ha='right')
+    ax.set_yticks(range(len(labels)))
+    ax.set_yticklabels(labels)
+    fig.colorbar(image, ax=ax, label=f'Speedup vs {reference} (geometric mean over sizes)')
+    _finish_chart(f'Speedup by Compiler Build (relative to {reference})', out_path, grid_axis=None,
+                  xlabel='Build', ylabel='Algorithm / Pivot Strategy', facet=facet)
+
+def render_dtype_throughput(table, out_path, facet=None):
+    """元素类型吞吐量（分组柱状图）：每个算法的代表配置一组，每种元素类型一根柱，高度为百万元素/秒"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    dtypes = [str(dtype) for dtype in table['DType'].cat.categories]
+    labels = [label for label, key in BEST_PIVOT_COMPARISON.items()
+              if ((table['Algorithm'] == key[0]) & (table['PivotStrategy'] == key[1])).any()]
+    width = 0.8 / len(dtypes)
+    plt.figure(figsize=(14, 8))
+    for i, dtype in enumerate(dtypes):
+        values = []
+        for label in labels:
+            algo, strategy = BEST_PIVOT_COMPARISON[label]
+            cell = table[(table['Algorithm'] == algo) & (table['PivotStrategy'] == strategy) & (table['DType'] == dtype)]
+            values.append(cell['ElementsPerSec'].iloc[0] / 1e6 if not cell.empty else np.nan)
+        positions = np.arange(len(labels)) + (i - (len(dtypes) - 1) / 2) * width
+        bars = plt.bar(positions, values, width, color=PIVOT_COLORS[i % len(PIVOT_COLORS)], edgecolor='black',
+                       label=f'{dtype} ({DTYPE_BYTES.get(dtype, "?")} B)')
+        for bar, value in zip(bars, values):
+            if not np.isnan(value):
+                plt.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), f'{value:.1f}',
+                         ha='center', va='bottom', fontsize=8)
+    plt.xticks(range(len(labels)), labels, rotation=15, ha='right')
+    _finish_chart(f'Sorting Throughput by Element Type (n={int(table["Size"].iloc[0]):,})', out_path,
+                  legend_kwargs=dict(fontsize=10), grid_axis='y', xlabel='Algorithm',
+                  ylabel='Throughput (million elements / s)', facet=facet)
+
+def render_history_trends(history, changes, out_path, facet=None):
+    """跨运行趋势：每个单元的代表时间随运行变化，竖虚线标出检测到的变化点"""
+    import matplotlib.pyplot as plt
+    runs = sorted(history['run_ts'].unique())
+    position = {ts: i for i, ts in enumerate(runs)}
+    plt.figure(figsize=(14, 8))
+    for i, (key, cell) in enumerate(history.groupby(HISTORY_CELL_KEYS, sort=True)):
+        algo, pivot, dist, build, dtype, threads, depth, size = key
+        cell = cell.sort_values('run_ts')
+        dtype_note = '' if dtype == REFERENCE_DTYPE else f', {dtype}'
+        label = f"{algo}{'' if pivot == 'N/A' else ' / ' + pivot} ({dist}{dtype_note}, n={size:,})"
+        color = PIVOT_COLORS[i % len(PIVOT_COLORS)]
+        plt.plot([position[ts] for ts in cell['run_ts']], _history_value(cell), marker='o', markersize=4,
+                 linewidth=1.5, color=color, label=label)
+        cell_changes = changes[(changes[HISTORY_CELL_KEYS] == list(key)).all(axis=1)] if not changes.empty else changes
+        for ts in cell_changes.get('run_ts', []):
+            plt.axvline(position[ts] - 0.5, color=color, linestyle='--', alpha=0.6)
+    step = max(1, len(runs) // 12)
+    plt.xticks(range(0, len(runs), step), [runs[i][:16].replace('T', ' ') for i in range(0, len(runs), step)],
+               rotation=30, ha='right')
+    plt.yscale('log')
+    _finish_chart(f'Cross-Run Trends (last {len(runs)} runs, dashed = change point)', out_path,
+                  legend_kwargs=dict(fontsize=8, loc='upper left', bbox_to_anchor=(1.01, 1)),
+                  xlabel='Run', ylabel='Median Sorting Time (ms)', facet=facet)
+
+PIVOT_STRATEGIES = ['First', 'Last', 'Middle', 'Random', 'Median3', 'Ninther', 'ThreeWay', 'Introsort']
+PIVOT_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#F39C12', '#2C3E50']
+PIVOT_MARKERS = ['o', 's', '^', 'D', 'v', 'P', 'X', '*']
+BEST_PIVOT_COMPARISON = {
+    'Quick Sort (Recursive) - Median3': ('Quick Sort (Recursive)', 'Median3'),
+    'Quick Sort (Iterative) - Median3': ('Quick Sort (Iterative)', 'Median3'),
+    'Merge Sort (Parallel)': ('Merge Sort (Parallel)', 'N/A'),
+    'Merge Sort (Buffered)': ('Merge Sort (Buffered)', 'N/A'),
+    'Radix Sort (LSD)': ('Radix Sort (LSD)', 'N/A'),
+    'Sample Sort (Parallel)': ('Sample Sort (Parallel)', 'N/A'),
+}
+
+# 图表名称（即输出文件名去掉.png）-> (报告中的分组, 说明)
+CHART_DESCRIPTIONS = {
+    'all_algorithms_scatter': ('Scatter plots', 'Scatter plot of all algorithms performance'),
+    'quick_sort_pivot_scatter': ('Scatter plots', 'Quick sort performance with different pivot strategies'),
+    'recursive_vs_iterative_scatter': ('Scatter plots', 'Recursive vs iterative quick sort comparison'),
+    'performance_density_scatter': ('Scatter plots', 'Performance density scatter plot'),
+    'pivot_strategy_comparison_recursive': ('Line charts and bar charts', 'Pivot strategy comparison (recursive)'),
+    'pivot_strategy_comparison_iterative': ('Line charts and bar charts', 'Pivot strategy comparison (iterative)'),
+    'algorithm_comparison_best_pivot': ('Line charts and bar charts', 'Algorithm comparison with best pivot'),
+    'pivot_strategy_ranking': ('Line charts and bar charts', 'Pivot strategy performance ranking'),
+    'auxiliary_memory': ('Line charts and bar charts', 'Peak auxiliary memory (heap scratch and stack) vs size'),
+    'strong_scaling_speedup': ('Scaling charts', 'Merge sort speedup vs threads with Amdahl fit'),
+    'strong_scaling_efficiency': ('Scaling charts', 'Merge sort parallel efficiency vs threads'),
+    'weak_scaling': ('Scaling charts', 'Merge sort weak scaling efficiency'),
+    'ipc': ('Hardware counter charts', 'Instructions per cycle by pivot strategy and algorithm'),
+    'misses_per_element': ('Hardware counter charts', 'Branch misses and LLC misses per element'),
+    'bytes_per_element': ('Hardware counter charts', 'Peak RSS and auxiliary memory bytes per element'),
+    'build_speedup_heatmap': ('Compiler build charts',
+                              'Speedup of each compiler build relative to -O2 per algorithm and pivot strategy'),
+    'dtype_throughput': ('Element type charts', 'Throughput in elements/s per element type at the largest size'),
+    'history_trends': ('History charts', 'Per-cell median time across recent runs with detected change points'),
+}
+CHART_GROUPS = ['Scatter plots', 'Line charts and bar charts', 'Scaling charts', 'Hardware counter charts',
+                'Compiler build charts', 'Element type charts', 'History charts']
+CHART_NAMES = list(CHART_DESCRIPTIONS)
+# 不按分布分面的图表（跨运行趋势图中每条曲线自带分布）
+UNFACETED_CHARTS = ['history_trends']
+
+def select_render_jobs(jobs, charts):
+    """按图表名筛选渲染任务，charts为None时保留全部"""
+    if charts is None:
+        return jobs
+    return [job for job in jobs if chart_base_name(job[2], job[3]) in charts]
+
+def chart_file_name(name, facet=None):
+    """图表输出文件名：按分布分面时为 <图表名>_<分布>.png"""
+    return f'{name}.png' if facet is None else f'{name}_{facet}.png'
+
+def chart_base_name(file_name, facet=None):
+    """chart_file_name的逆操作，返回图表名"""
+    name = os.path.splitext(file_name)[0]
+    return name if facet is None else name[:-len(facet) - 1]
+
+def distribution_names(df):
+    """排序后的数据分布名；没有分布列或只有一种分布时为[None]（不分面）"""
+    if 'Distribution' not in df.columns:
+        return [None]
+    distributions = [str(d) for d in df['Distribution'].unique()]
+    if len(distributions) <= 1:
+        return [None]
+    return sorted(distributions)
+
+def distribution_facets(df):
+    """按数据分布切分数据：[(分布名, 数据切片)]；只有一种分布时分布名为None（不分面）"""
+    names = distribution_names(df)
+    if names == [None]:
+        return [(None, df)]
+    return [(dist, df[df['Distribution'] == dist]) for dist in names]
+
+def build_faceted_jobs(df, *builders):
+    """对每种数据分布分别调用任务构建函数，返回[(渲染函数, 参数元组, 文件名, 分布名)]"""
+    jobs = []
+    for facet, data in distribution_facets(df):
+        for builder in builders:
+            for func, args, name in builder(data):
+                jobs.append((func, args, chart_file_name(os.path.splitext(name)[0], facet), facet))
+    return jobs
+
+def build_scatter_jobs(df):
+    """构建散点图渲染任务列表：[(渲染函数, 参数元组, 文件名)]"""
+    if df.empty:
+        print("✗ 没有数据可生成散点图")
+        return []
     
-    # 分析所有快速排序结果
-    all_quick_sort = df[df['Algorithm'].str.contains('Quick Sort', na=False)].copy()
+    data = _numeric_rows(df)
+    quick_sort_data = data[data['Algorithm'].str.contains('Quick Sort', na=False)]
+    median3 = quick_sort_data[quick_sort_data['PivotStrategy'] == 'Median3']
+    # 计算每个数据点的相对性能（相对于该规模下的最快时间）
+    density = data[['Size', 'Time(ms)']].assign(PerformanceRatio=relative_to_fastest(data))
+    
+    return [
+        (render_all_algorithms_scatter, (data[['Algorithm', 'Size', 'Time(ms)']],), 'all_algorithms_scatter.png'),
+        (render_quick_sort_pivot_scatter, (quick_sort_data[['PivotStrategy', 'Size', 'Time(ms)']],),
+         'quick_sort_pivot_scatter.png'),
+        (render_recursive_vs_iterative_scatter, (median3[['Algorithm', 'Size', 'Time(ms)']],),
+         'recursive_vs_iterative_scatter.png'),
+        (render_performance_density_scatter, (density,), 'performance_density_scatter.png'),
+    ]
+
+def build_pivot_jobs(df):
+    """构建pivot策略分析图表（折线图和柱状图）渲染任务列表"""
+    if df.empty:
+        print("✗ 没有数据可分析")
+        return []
     
-    all_quick_sort['Time(ms)'] = pd.to_numeric(all_quick_sort['Time(ms)'], errors='coerce')
-    all_quick_sort = all_quick_sort.dropna(subset=['Time(ms)'])
+    # 检查必要的列是否存在
+    required_columns = ['Algorithm', 'PivotStrategy', 'Size', 'Time(ms)']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        print(f"✗ 缺少必要列: {missing_columns}")
+        return []
+    
+    data = _numeric_rows(df)
+    line_columns = ['PivotStrategy', 'Size', 'Time(ms)']
+    line_columns += [col for col in ('Median', 'CILow', 'CIHigh') if col in data.columns]
+    qs_recursive = data[data['Algorithm'] == 'Quick Sort (Recursive)'][line_columns]
+    qs_iterative = data[data['Algorithm'] == 'Quick Sort (Iterative)'][line_columns]
+    comparison_algos = [algo for algo, _ in BEST_PIVOT_COMPARISON.values()]
+    comparison = data[data['Algorithm'].isin(comparison_algos)][['Algorithm'] + line_columns]
+    
+    jobs = [
+        (render_pivot_strategy_lines, (qs_recursive, 'Recursive'), 'pivot_strategy_comparison_recursive.png'),
+        (render_pivot_strategy_lines, (qs_iterative, 'Iterative'), 'pivot_strategy_comparison_iterative.png'),
+        (render_algorithm_comparison, (comparison,), 'algorithm_comparison_best_pivot.png'),
+    ]
+    if 'AuxBytes' in data.columns and data['AuxBytes'].notna().any():
+        aux = data[data['Algorithm'].isin(comparison_algos)][['Algorithm', 'PivotStrategy', 'Size', 'AuxBytes']]
+        jobs.append((render_auxiliary_memory, (aux,), 'auxiliary_memory.png'))
     
+    # 分析所有快速排序结果，计算每个策略在所有规模下的平均时间
+    all_quick_sort = data[data['Algorithm'].str.contains('Quick Sort', na=False)]
     pivot_performance = []
-    
-    for strategy in pivot_strategies:
+    for strategy in PIVOT_STRATEGIES:
         strategy_data = all_quick_sort[all_quick_sort['PivotStrategy'] == strategy]
         if not strategy_data.empty:
-            # 计算该策略在所有规模下的平均相对性能
-            avg_time = strategy_data['Time(ms)'].mean()
+            weights = _record_weights(strategy_data)
+            avg_time = (strategy_data['Time(ms)'] * weights).sum() / weights.sum()
             pivot_performance.append((strategy, avg_time))
     
     if pivot_performance:
         # 按性能排序（从快到慢）
         pivot_performance.sort(key=lambda x: x[1])
-        strategies_sorted = [x[0] for x in pivot_performance]
-        times_sorted = [x[1] for x in pivot_performance]
-        
-        # 创建渐变色
-        cmap = plt.cm.viridis
-        colors_bar = [cmap(i / len(strategies_sorted)) for i in range(len(strategies_sorted))]
-        
-        bars = plt.bar(strategies_sorted, times_sorted, color=colors_bar, edgecolor='black')
-        plt.xlabel('Pivot Selection Strategy', fontsize=12, fontweight='bold')
-        plt.ylabel('Average Sorting Time (ms)', fontsize=12, fontweight='bold')
-        plt.title('Pivot Strategy Performance Ranking\n(Average Across All Data Sizes)', fontsize=14, fontweight='bold')
+        jobs.append((render_pivot_strategy_ranking, (pivot_performance,), 'pivot_strategy_ranking.png'))
+    
+    return jobs
+
+def build_counter_jobs(df):
+    """构建硬件计数器图表渲染任务列表（日志中没有对应的测量值时跳过）"""
+    def measured(*cols):
+        return any(col in df.columns and df[col].notna().any() for col in cols)
+    
+    columns = ['Algorithm', 'PivotStrategy', 'Size', 'IPC', 'BranchMissesPerElement', 'LLCMissesPerElement',
+               'RSSBytesPerElement', 'AuxBytesPerElement']
+    if not measured(*columns[3:]):
+        return []
+    data = df[columns]
+    jobs = []
+    if measured('IPC'):
+        jobs.append((render_ipc, (data,), 'ipc.png'))
+    if measured('BranchMissesPerElement', 'LLCMissesPerElement'):
+        jobs.append((render_misses_per_element, (data,), 'misses_per_element.png'))
+    if measured('RSSBytesPerElement'):
+        jobs.append((render_bytes_per_element, (data,), 'bytes_per_element.png'))
+    return jobs
+
+def build_scaling_jobs(df):
+    """构建线程扩展性图表渲染任务列表（日志中没有线程数扫描时为空）"""
+    jobs = []
+    scaling = scaling_table(df)
+    if not scaling.empty:
+        jobs.append((render_strong_scaling_speedup, (scaling, fit_amdahl(scaling)), 'strong_scaling_speedup.png'))
+        jobs.append((render_strong_scaling_efficiency, (scaling,), 'strong_scaling_efficiency.png'))
+    weak = weak_scaling_table(df)
+    if not weak.empty:
+        jobs.append((render_weak_scaling, (weak,), 'weak_scaling.png'))
+    return jobs
+
+def build_matrix_jobs(df):
+    """构建编译器变体矩阵热力图渲染任务列表（日志中只有一个构建时为空）"""
+    table = build_speedup_table(df)
+    if table.empty:
+        return []
+    return [(render_build_speedup_heatmap, (table,), 'build_speedup_heatmap.png')]
+
+def build_dtype_jobs(df):
+    """构建元素类型吞吐量图渲染任务列表（日志中只有一种元素类型时为空）"""
+    table = dtype_throughput_table(df)
+    if table.empty:
+        return []
+    return [(render_dtype_throughput, (table,), 'dtype_throughput.png')]
+
+# 趋势图最多画出的单元数
+HISTORY_CHART_CELLS = 8
+
+def build_history_jobs(history):
+    """构建跨运行趋势图渲染任务：有变化点的单元（按变化幅度取前几个），没有时画各算法最佳配置在最大规模下的趋势"""
+    if history is None or history.empty or history['run_id'].nunique() < 2:
+        return []
+    changes = history_change_table(history)
+    if not changes.empty:
+        ranked = changes.assign(Magnitude=(changes['Ratio'].apply(math.log)).abs()).sort_values('Magnitude',
+                                                                                               ascending=False)
+        cells = ranked[HISTORY_CELL_KEYS].drop_duplicates().head(HISTORY_CHART_CELLS)
+    else:
+        largest = history[history['size'] == history['size'].max()]
+        headline = list(BEST_PIVOT_COMPARISON.values())
+        cells = largest[[(a, p) in headline for a, p in zip(largest['algorithm'], largest['pivot'])]]
+        cells = cells[HISTORY_CELL_KEYS].drop_duplicates().head(HISTORY_CHART_CELLS)
+    if cells.empty:
+        return []
+    selected = history.merge(cells, on=HISTORY_CELL_KEYS)
+    return [(render_history_trends, (selected, changes), chart_file_name('history_trends'), None)]
+
+def _run_render_job(func, args, out_path, facet=None):
+    """在工作进程中执行单个渲染任务"""
+    func(*args, out_path, facet=facet)
+    return os.path.basename(out_path)
+
+def run_render_jobs(jobs, out_dir='../results', n_jobs=1):
+    """执行渲染任务；n_jobs > 1 时使用进程池并行渲染"""
+    if not jobs:
+        return
+    
+    # 确保结果目录存在
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(func, args, os.path.join(out_dir, name), facet) for func, args, name, facet in jobs]
+    
+    if n_jobs <= 1 or len(tasks) == 1:
+        for task in tasks:
+            print(f"✓ 生成图表: {_run_render_job(*task)}")
+        return
+    
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks)),
+                             initializer=setup_plot_style, initargs=(True,)) as pool:
+        futures = [pool.submit(_run_render_job, *task) for task in tasks]
+        for future in as_completed(futures):
+            print(f"✓ 生成图表: {future.result()}")
+
+def create_scatter_plots(df, out_dir='../results', n_jobs=1):
+    """创建散点图分析"""
+    print("\n=== 生成散点图分析 ===")
+    run_render_jobs(build_faceted_jobs(select_primary_configuration(df)[0], build_scatter_jobs), out_dir, n_jobs)
+
+def create_pivot_analysis_charts(df, out_dir='../results', n_jobs=1):
+    """创建pivot策略分析图表"""
+    print("\n=== 生成Pivot策略分析图表 ===")
+    run_render_jobs(build_faceted_jobs(select_primary_configuration(df)[0], build_pivot_jobs), out_dir, n_jobs)
+
+# 复杂度拟合：候选模型 t = c * f(n) 及外推规模
+COMPLEXITY_MODELS = ['O(n)', 'O(n log n)', 'O(n^2)']
+EXTRAPOLATION_SIZES = [1_000_000, 10_000_000]
+MIN_FIT_POINTS = 3
+
+def _complexity_basis(sizes):
+    """返回 模型 × 规模 的f(n)矩阵，行顺序与COMPLEXITY_MODELS一致"""
+    import numpy as np
+    n = np.asarray(sizes, dtype='float64')
+    return np.stack([n, n * np.log2(n), n ** 2])
+
+def fit_complexity(df, series_keys=('Algorithm', 'PivotStrategy', 'Distribution')):
+    """对每个(算法, Pivot策略, 数据分布)序列分别拟合 n、n log n、n^2 模型，返回最佳模型、常数和外推时间
+    
+    所有序列和模型一次性用NumPy向量化求解：最小化相对误差 sum(((t - c*f(n)) / t)^2)，
+    闭式解为 c = sum(f/t) / sum((f/t)^2)。
+    """
+    import pandas as pd
+    import numpy as np
+    series_keys = [k for k in series_keys if k in df.columns]
+    value = 'Median' if 'Median' in df.columns else 'Time(ms)'
+    data = df[df[value] > 0]
+    if 'Sorted' in data.columns:
+        # 排序失败的单元计时无意义，不参与拟合
+        data = data[data['Sorted'] >= _record_weights(data)]
+    # 只转换用到的列（astype会复制整个宽表）
+    data = data[series_keys + ['Size', value]].astype({k: str for k in series_keys})
+    table = data.groupby(series_keys + ['Size'])[value].mean().unstack('Size')
+    table = table[table.notna().sum(axis=1) >= MIN_FIT_POINTS]
+    if table.empty:
+        return pd.DataFrame()
+    
+    sizes = table.columns.to_numpy(dtype='float64')
+    times = table.to_numpy(dtype='float64')                                  # 序列 × 规模
+    basis = _complexity_basis(sizes)                                         # 模型 × 规模
+    ratio = basis[None, :, :] / times[:, None, :]                            # 序列 × 模型 × 规模
+    constant = np.nansum(ratio, axis=2) / np.nansum(ratio ** 2, axis=2)
+    residual = 1 - constant[:, :, None] * ratio
+    points = np.sum(~np.isnan(times), axis=1)[:, None]
+    rel_rmse = np.sqrt(np.nansum(residual ** 2, axis=2) / points)
+    best = np.argmin(rel_rmse, axis=1)
+    rows = np.arange(len(best))
+    
+    result = table.index.to_frame(index=False)
+    result['Model'] = [COMPLEXITY_MODELS[i] for i in best]
+    result['Constant'] = constant[rows, best]
+    result['RelRMSE'] = rel_rmse[rows, best]
+    extrapolated = _complexity_basis(EXTRAPOLATION_SIZES)                    # 模型 × 外推规模
+    for j, n in enumerate(EXTRAPOLATION_SIZES):
+        result[f'Pred{n}'] = constant[rows, best] * extrapolated[best, j]
+    result['Quadratic'] = result['Model'] == 'O(n^2)'
+    return result
+
+# 线程扩展性分析：被扫描线程数的算法，以及判断"可用核数"的并行效率下限
+SCALING_ALGORITHM = 'Merge Sort (Parallel)'
+SCALING_EFFICIENCY_TARGET = 0.5
+CONFIG_KEYS = ['Threads', 'TaskDepth']
+
+def select_primary_configuration(df):
+    """每个算法只保留一种并行配置，供常规图表和排名使用
+    
+    存在多种(线程数, 任务深度)配置的算法取线程数最多、其中平均时间最短的任务深度。
+    返回(筛选后的数据, {算法: (线程数, 任务深度)})。
+    """
+    if not all(key in df.columns for key in CONFIG_KEYS):
+        return df, {}
+    keep = df['Algorithm'].notna()
+    chosen = {}
+    # 先找出有多种配置的算法（通常只有并行算法），只对这些算法分组
+    configs = df[['Algorithm'] + CONFIG_KEYS].drop_duplicates().groupby('Algorithm', observed=True).size()
+    swept = df[df['Algorithm'].isin(configs.index[configs > 1])]
+    for algo, group in swept.groupby('Algorithm', observed=True):
+        widest = group[group['Threads'] == group['Threads'].max()]
+        threads, depth = int(widest['Threads'].iloc[0]), int(_weighted_mean_time(widest, 'TaskDepth').index[0])
+        chosen[str(algo)] = (threads, depth)
+        keep &= (df['Algorithm'] != algo) | ((df['Threads'] == threads) & (df['TaskDepth'] == depth))
+    return df[keep], chosen
+
+def _best_depth_per_thread_count(df):
+    """取SCALING_ALGORITHM的每个(分布, 规模, 线程数)下最快的任务深度，返回带TimeMs列的表"""
+    value = 'Median' if 'Median' in df.columns else 'Time(ms)'
+    data = df[(df['Algorithm'] == SCALING_ALGORITHM) & (df['Threads'] > 0)]
+    data = data[data['Sorted'] >= _record_weights(data)]
+    data = data.loc[data[value] > 0, ['Distribution', 'Size', 'Threads', 'TaskDepth', value]].astype({'Distribution': str})
+    if data.empty:
+        return data
+    best = data.loc[data.groupby(['Distribution', 'Size', 'Threads'], observed=True)[value].idxmin()]
+    return best.assign(TimeMs=best[value])[['Distribution', 'Size', 'Threads', 'TaskDepth', 'TimeMs']]
+
+def scaling_table(df):
+    """强扩展：每个(分布, 规模)以1线程时间为基准，计算各线程数的加速比和并行效率"""
+    import pandas as pd
+    best = _best_depth_per_thread_count(df)
+    if best.empty or best['Threads'].nunique() < 2:
+        return pd.DataFrame()
+    base = best[best['Threads'] == 1].set_index(['Distribution', 'Size'])['TimeMs'].rename('BaseMs')
+    table = best.join(base, on=['Distribution', 'Size']).dropna(subset=['BaseMs'])
+    # 只保留测到了多个线程数的规模
+    table = table[table.groupby(['Distribution', 'Size'])['Threads'].transform('nunique') >= 2]
+    table = table.assign(Speedup=table['BaseMs'] / table['TimeMs'])
+    table['Efficiency'] = table['Speedup'] / table['Threads']
+    return table.sort_values(['Distribution', 'Size', 'Threads'], ignore_index=True)
+
+def fit_amdahl(scaling):
+    """对每个(分布, 规模)拟合Amdahl定律 S(p) = 1 / ((1 - f) + f / p)
+    
+    1 - 1/S = f * (1 - 1/p) 对f是线性的，最小二乘闭式解为 f = sum(x*y) / sum(x^2)。
+    UsefulThreads为并行效率不低于SCALING_EFFICIENCY_TARGET的最大线程数：
+    E(p) = 1 / (p(1 - f) + f) >= e  <=>  p <= (1/e - f) / (1 - f)；f = 0（2个线程也没有加速）时为0。
+    """
+    import pandas as pd
+    import numpy as np
+    rows = []
+    for (dist, size), series in scaling.groupby(['Distribution', 'Size']):
+        x = 1 - 1 / series['Threads'].to_numpy(dtype='float64')
+        y = 1 - 1 / series['Speedup'].to_numpy(dtype='float64')
+        if not np.any(x > 0):
+            continue
+        f = float(np.clip(np.sum(x * y) / np.sum(x * x), 0.0, 1.0))
+        predicted = 1 / ((1 - f) + f / series['Threads'].to_numpy(dtype='float64'))
+        rmse = float(np.sqrt(np.mean((predicted - series['Speedup'].to_numpy()) ** 2)))
+        if f == 0:
+            # 2个线程也没有加速：公式给出p <= 1/e，但多出的线程没有任何用处
+            max_speedup, useful = 1.0, 0
+        elif f < 1:
+            max_speedup = 1 / (1 - f)
+            useful = np.floor((1 / SCALING_EFFICIENCY_TARGET - f) / (1 - f))
+        else:
+            max_speedup = useful = np.inf
+        rows.append((dist, size, f, max_speedup, useful, float(series['Speedup'].max()), rmse))
+    return pd.DataFrame(rows, columns=['Distribution', 'Size', 'ParallelFraction', 'MaxSpeedup',
+                                       'UsefulThreads', 'ObservedSpeedup', 'RMSE'])
+
+def weak_scaling_table(df):
+    """弱扩展：每线程元素个数(Size / Threads)相同的单元组成一组，效率 = T(1线程) / T(p线程)"""
+    import pandas as pd
+    best = _best_depth_per_thread_count(df)
+    if best.empty:
+        return pd.DataFrame()
+    best = best[best['Size'] % best['Threads'] == 0]
+    best = best.assign(PerThread=best['Size'] // best['Threads'])
+    base = best[best['Threads'] == 1].set_index(['Distribution', 'PerThread'])['TimeMs'].rename('BaseMs')
+    table = best.join(base, on=['Distribution', 'PerThread']).dropna(subset=['BaseMs'])
+    table = table[table.groupby(['Distribution', 'PerThread'])['Threads'].transform('nunique') >= 2]
+    if table.empty:
+        return pd.DataFrame()
+    table = table.assign(Efficiency=table['BaseMs'] / table['TimeMs'])
+    return table.sort_values(['Distribution', 'PerThread', 'Threads'], ignore_index=True)
+
+# 编译器变体矩阵：参考构建（第2-5节和常规图表只使用它），优化级别按从低到高排列
+REFERENCE_BUILD = '-O2'
+OPT_LEVEL_ORDER = ['-O0', '-O1', '-O2', '-O3']
+
+def _build_sort_key(build):
+    """构建标签排序：先按优化级别，同一级别下不带额外参数的在前"""
+    level = build.split()[0] if build else ''
+    rank = OPT_LEVEL_ORDER.index(level) if level in OPT_LEVEL_ORDER else len(OPT_LEVEL_ORDER)
+    return rank, build != level, build
+
+def select_reference_build(df):
+    """只保留一种构建配置的数据，供第2-5节、常规图表和回归检测使用
+    
+    日志包含多个构建时优先取-O2，没有-O2时取记录最多的构建。返回(筛选后的数据, 构建标签)；
+    只有一个构建时返回(原数据, None)。
+    """
+    if 'Build' not in df.columns or df['Build'].nunique() <= 1:
+        return df, None
+    builds = [str(build) for build in df['Build'].unique()]
+    if REFERENCE_BUILD in builds:
+        reference = REFERENCE_BUILD
+    else:
+        reference = str(_record_weights(df).groupby(df['Build'].astype(str)).sum().idxmax())
+    return df[df['Build'] == reference], reference
+
+# 元素类型对比：参考类型（第2-6节和常规图表只使用它）
+REFERENCE_DTYPE = 'int32'
+DTYPE_ORDER = list(DTYPE_BYTES)
+
+def select_reference_dtype(df):
+    """只保留一种元素类型的数据，供第2-6节和常规图表使用
+
+    日志包含多种元素类型时优先取int32，没有int32时取记录最多的类型。返回(筛选后的数据, 类型名称)；
+    只有一种元素类型时返回(原数据, None)。
+    """
+    if 'DType' not in df.columns or df['DType'].nunique() <= 1:
+        return df, None
+    dtypes = [str(dtype) for dtype in df['DType'].unique()]
+    if REFERENCE_DTYPE in dtypes:
+        reference = REFERENCE_DTYPE
+    else:
+        reference = str(_record_weights(df).groupby(df['DType'].astype(str)).sum().idxmax())
+    return df[df['DType'] == reference], reference
+
+def dtype_throughput_table(df):
+    """每个(分布, 算法, Pivot策略, 元素类型)在最大公共规模下的吞吐量和相对参考类型的单元素耗时
+
+    最大公共规模为该分布下所有元素类型都测到的最大规模；Slowdown = 该类型时间 / 参考类型时间（>1更慢）。
+    日志中只有一种元素类型时返回空表。
+    """
+    import pandas as pd
+    _, reference = select_reference_dtype(df)
+    if reference is None:
+        return pd.DataFrame()
+    data = df.loc[(df['Sorted'] >= _record_weights(df)) & df['ElementsPerSec'].notna(),
+                  CATEGORY_KEYS + ['Size', 'ElementsPerSec', 'BytesPerSec']]
+    data = data.astype({col: str for col in CATEGORY_KEYS})
+    common = data.groupby(['Distribution', 'Size'])['DType'].nunique()
+    common = common[common == data['DType'].nunique()].reset_index()
+    if common.empty:
+        return pd.DataFrame()
+    largest = common.groupby('Distribution')['Size'].max().rename('LargestSize')
+    data = data.join(largest, on='Distribution')
+    data = data[data['Size'] == data['LargestSize']]
+    series = ['Distribution', 'Algorithm', 'PivotStrategy']
+    base = data[data['DType'] == reference].set_index(series)['ElementsPerSec'].rename('BaseElementsPerSec')
+    table = data.join(base, on=series)
+    table = table.assign(Slowdown=table['BaseElementsPerSec'] / table['ElementsPerSec'])
+    order = sorted(table['DType'].unique(), key=lambda d: DTYPE_ORDER.index(d) if d in DTYPE_ORDER else len(DTYPE_ORDER))
+    table['DType'] = pd.Categorical(table['DType'], categories=order, ordered=True)
+    table = table.sort_values(series + ['DType'], ignore_index=True)
+    return table[series + ['DType', 'Size', 'ElementsPerSec', 'BytesPerSec', 'Slowdown']].assign(Reference=reference)
+
+def build_speedup_table(df):
+    """每个(分布, 算法, Pivot策略, 构建)相对参考构建的加速比
+    
+    每个规模的加速比 = 参考构建时间 / 该构建时间（有中位数时用中位数），跨规模取几何平均；
+    LargestSpeedup为最大公共规模下的加速比。日志中只有一个构建时返回空表。
+    """
+    import pandas as pd
+    import numpy as np
+    _, reference = select_reference_build(df)
+    if reference is None:
+        return pd.DataFrame()
+    value = 'Median' if 'Median' in df.columns else 'Time(ms)'
+    data = df[(df['Sorted'] >= _record_weights(df)) & (df[value] > 0)]
+    data = data.astype({col: str for col in CATEGORY_KEYS})
+    cell_keys = [key for key in AGGREGATE_KEYS if key != 'Build']
+    base = data[data['Build'] == reference].set_index(cell_keys)[value].rename('BaseMs')
+    table = data.join(base, on=cell_keys).dropna(subset=['BaseMs'])
+    table = table.assign(LogSpeedup=np.log(table['BaseMs'] / table[value]))
+    series = ['Distribution', 'Algorithm', 'PivotStrategy', 'Build']
+    largest = table.loc[table.groupby(series)['Size'].idxmax()].set_index(series)
+    result = table.groupby(series).agg(Sizes=('Size', 'nunique'), LogSpeedup=('LogSpeedup', 'mean'))
+    result = result.assign(Speedup=np.exp(result['LogSpeedup']),
+                           LargestSize=largest['Size'],
+                           LargestSpeedup=np.exp(largest['LogSpeedup'])).reset_index()
+    order = sorted(result['Build'].unique(), key=_build_sort_key)
+    result['Build'] = pd.Categorical(result['Build'], categories=order, ordered=True)
+    result = result.sort_values(['Distribution', 'Algorithm', 'PivotStrategy', 'Build'], ignore_index=True)
+    return result.assign(Reference=reference).drop(columns='LogSpeedup')
+
+# 跨运行趋势（history_store.py）：分析的运行数，变化点检测的最小段长、最小相对变化和显著性阈值
+HISTORY_FILE = 'history.sqlite'
+HISTORY_RUNS = 20
+CHANGE_MIN_SEGMENT = 2
+CHANGE_MIN_SHIFT = 0.05
+CHANGE_THRESHOLD = 3.0
+HISTORY_CELL_KEYS = ['algorithm', 'pivot', 'distribution', 'build', 'dtype', 'threads', 'task_depth', 'size']
+
+def detect_change_points(values, min_segment=CHANGE_MIN_SEGMENT, min_shift=CHANGE_MIN_SHIFT,
+                         threshold=CHANGE_THRESHOLD):
+    """二分分割法检测时间序列（按运行顺序）的水平突变，返回新水平开始的下标列表
+    
+    在对数时间上寻找使两段平方和最小的分割点；两段均值之差同时满足相对变化不小于min_shift、
+    且不小于threshold倍的标准误（由段内残差估计）时接受，并在两段内递归检测。
+    """
+    import numpy as np
+    x = np.log(np.asarray(values, dtype='float64'))
+    points = []
+    
+    def split(lo, hi):
+        n = hi - lo
+        if n < 2 * min_segment:
+            return
+        segment = x[lo:hi]
+        costs = [(((segment[:k] - segment[:k].mean()) ** 2).sum() + ((segment[k:] - segment[k:].mean()) ** 2).sum(), k)
+                 for k in range(min_segment, n - min_segment + 1)]
+        cost, k = min(costs)
+        shift = segment[k:].mean() - segment[:k].mean()
+        stderr = math.sqrt(cost / max(n - 2, 1) * (1 / k + 1 / (n - k)))
+        if abs(shift) >= math.log1p(min_shift) and abs(shift) >= threshold * stderr:
+            points.append(lo + k)
+            split(lo, lo + k)
+            split(lo + k, hi)
+    
+    split(0, len(x))
+    return sorted(points)
+
+def _history_value(cells):
+    """历史单元的代表时间：有中位数时用中位数，否则用平均时间"""
+    return cells['median_ms'].fillna(cells['mean_ms'])
+
+def history_change_table(history):
+    """对最近几次运行中的每个单元检测变化点，返回每个变化点一行（变化前后各段的中位时间和比值）"""
+    import pandas as pd
+    import numpy as np
+    rows = []
+    if history is None or history.empty:
+        return pd.DataFrame()
+    history = history.assign(value=_history_value(history))
+    for key, cell in history[history['value'] > 0].groupby(HISTORY_CELL_KEYS, sort=True):
+        cell = cell.sort_values('run_ts')
+        values = cell['value'].to_numpy()
+        bounds = [0] + detect_change_points(values) + [len(values)]
+        for before, start, after in zip(bounds, bounds[1:], bounds[2:]):
+            old, new = float(np.median(values[before:start])), float(np.median(values[start:after]))
+            rows.append((*key, cell['run_ts'].iloc[start], cell['run_id'].iloc[start], start - before,
+                         after - start, old, new, new / old))
+    return pd.DataFrame(rows, columns=HISTORY_CELL_KEYS + [
+        'run_ts', 'run_id', 'RunsBefore', 'RunsAfter', 'BeforeMs', 'AfterMs', 'Ratio'])
+
+def _winner_significance(df, by, winner, runner_up):
+    """检验winner是否在每个规模下都显著快于runner_up（各取该规模下中位数最小的单元，比较置信区间）
+    
+    返回(是否显著, 置信区间重叠的规模列表)；样本不足无法检验时返回(None, [])
+    """
+    if 'CILow' not in df.columns:
+        return None, []
+    cells = df.loc[df[by].isin([winner, runner_up]) & df['Median'].notna(), [by, 'Size', 'Median', 'CILow', 'CIHigh']]
+    if cells.empty or cells['CILow'].isna().all():
+        return None, []
+    
+    best = cells.loc[cells.groupby([by, 'Size'], observed=True)['Median'].idxmin()]
+    best = best.assign(**{by: best[by].astype(str)})
+    ci_low = best.pivot(index='Size', columns=by, values='CILow')
+    ci_high = best.pivot(index='Size', columns=by, values='CIHigh')
+    if winner not in ci_low.columns or runner_up not in ci_low.columns:
+        return None, []
+    common = ci_low[[winner, runner_up]].dropna(how='all').index
+    separated = ci_high.loc[common, winner] < ci_low.loc[common, runner_up]
+    overlapping = [int(size) for size in common[~separated.to_numpy()]]
+    return not overlapping, overlapping
+
+def _write_winner(f, kind, ranking, data, by):
+    """写出最佳项结论：只有在与第二名的差异统计显著时才宣布胜者"""
+    best, best_time = ranking.index[0], ranking.iloc[0]
+    if len(ranking) < 2:
+        f.write(f"✓ Best {kind}: {best} (average {best_time:.2f} ms, no competitor)\n")
+        return
+    runner_up = ranking.index[1]
+    significant, overlapping = _winner_significance(data, by, best, runner_up)
+    if significant is None:
+        f.write(f"⚠ Fastest {kind} on average: {best} ({best_time:.2f} ms), "
+                f"not tested for significance (run the benchmark with --repeat >= {BOOTSTRAP_MIN_SAMPLES})\n")
+    elif significant:
+        f.write(f"✓ Best {kind}: {best} (average {best_time:.2f} ms), significantly faster than "
+                f"{runner_up} at every size ({CONFIDENCE_LEVEL:.0%} CIs do not overlap)\n")
+    else:
+        f.write(f"⚠ No statistically significant best {kind}: {best} vs {runner_up}, "
+                f"{CONFIDENCE_LEVEL:.0%} CIs overlap at sizes {', '.join(map(str, overlapping))}\n")
+
+def _ranking_tables(df):
+    """计算算法和Pivot策略的平均时间排名，返回(数值化数据, 算法排名, 快速排序数据, Pivot策略排名)"""
+    import pandas as pd
+    df_numeric = _numeric_rows(df)
+    algo_performance = _weighted_mean_time(df_numeric, 'Algorithm')
+    
+    quick_sort_data = df_numeric[df_numeric['Algorithm'].str.contains('Quick Sort', na=False)]
+    pivot_performance = (_weighted_mean_time(quick_sort_data, 'PivotStrategy') if not quick_sort_data.empty
+                         else pd.Series(dtype='float64'))
+    return df_numeric, algo_performance, quick_sort_data, pivot_performance
+
+# 基数排序和样本排序：第4节与最快的比较排序对比，并给出对应场景的建议
+ENGINE_ADVICE = {
+    'Radix Sort (LSD)': 'For integer keys in a bounded range',
+    'Sample Sort (Parallel)': 'For large datasets on multiple cores',
+}
+
+def engine_comparison_table(df):
+    """基数排序和样本排序与最快的比较排序（任一快速排序策略或归并排序）在它们测到的最大规模下的对比
+    
+    返回DataFrame(Algorithm, Size, TimeMs, Baseline, BaselineMs, Speedup)，Baseline为"算法 / 策略"，
+    Speedup > 1表示比最快的比较排序快；没有这两种算法或同规模没有比较排序时返回空表。
+    """
+    import pandas as pd
+    value = 'Median' if 'Median' in df.columns else 'Time(ms)'
+    data = df[(df['Sorted'] >= _record_weights(df)) & (df[value] > 0)]
+    engines = data[data['Algorithm'].isin(list(ENGINE_ADVICE))]
+    if engines.empty:
+        return pd.DataFrame()
+    size = engines['Size'].max()
+    at_size = data[data['Size'] == size]
+    is_comparison = ~at_size['Algorithm'].isin(list(ENGINE_ADVICE))
+    if not is_comparison.any():
+        return pd.DataFrame()
+    ratio = relative_to_fastest(at_size, value, among=is_comparison)
+    best = at_size[is_comparison & (ratio == 1)].iloc[0]
+    baseline = str(best['Algorithm']) + ('' if str(best['PivotStrategy']) == 'N/A' else f" / {best['PivotStrategy']}")
+    rows = []
+    for algo in ENGINE_ADVICE:
+        is_engine = at_size['Algorithm'] == algo
+        if not is_engine.any():
+            continue
+        rows.append({'Algorithm': algo, 'Size': int(size), 'TimeMs': float(at_size.loc[is_engine, value].min()),
+                     'Baseline': baseline, 'BaselineMs': float(best[value]),
+                     'Speedup': 1 / float(ratio[is_engine].min())})
+    return pd.DataFrame(rows)
+
+def _write_engine_comparison(f, engines):
+    """写出基数排序和样本排序相对最快比较排序的加速比"""
+    first = engines.iloc[0]
+    f.write(f"Radix and sample sort vs the fastest comparison sort at n = {first['Size']:,} "
+            f"({first['Baseline']}, {first['BaselineMs']:.3f} ms):\n")
+    for _, row in engines.iterrows():
+        relation = 'faster' if row['Speedup'] >= 1 else 'slower'
+        factor = row['Speedup'] if row['Speedup'] >= 1 else 1 / row['Speedup']
+        f.write(f"  {row['Algorithm']:<25} {row['TimeMs']:>10.3f} ms  {factor:.2f}x {relation}\n")
+
+def _engine_recommendations(engine_tables):
+    """按各分布的对比结果给出基数排序和样本排序的建议，engine_tables为[(分布, engine_comparison_table)]"""
+    lines = []
+    for algo, scenario in ENGINE_ADVICE.items():
+        speedups = {facet: row['Speedup'] for facet, table in engine_tables
+                    for _, row in table[table['Algorithm'] == algo].iterrows()}
+        if not speedups:
+            continue
+        low, high = min(speedups.values()), max(speedups.values())
+        span = f"{low:.1f}x" if f"{low:.1f}" == f"{high:.1f}" else f"{low:.1f}x-{high:.1f}x"
+        faster = [str(facet) for facet, speedup in speedups.items() if speedup >= 1]
+        if len(faster) == len(speedups):
+            lines.append(f"  - {scenario}: Use {algo} ({span} the speed of the fastest comparison sort "
+                         f"at the largest size)")
+        elif faster:
+            lines.append(f"  - {scenario}: {algo} beats the fastest comparison sort only on "
+                         f"{', '.join(faster)} ({span} its speed)")
+        else:
+            lines.append(f"  - {algo} does not beat the fastest comparison sort at the largest size "
+                         f"({span} its speed), keep a comparison sort")
+    return lines
+
+def _write_facet_header(f, facet):
+    """按分布分面时写出分面小标题"""
+    if facet is not None:
+        f.write(f"[Distribution: {facet}]\n")
+
+def _write_auxiliary_memory(f, df):
+    """写出最大规模下每个(算法, Pivot策略)的峰值辅助内存（旧日志未记录时跳过）"""
+    if 'AuxBytes' not in df.columns or df['AuxBytes'].isna().all():
+        return
+    largest = df['Size'].max()
+    peak = (df[df['Size'] == largest].groupby(['Algorithm', 'PivotStrategy'], observed=True)['AuxBytes']
+            .max().dropna().sort_values())
+    if peak.empty:
+        return
+    f.write(f"Peak auxiliary memory at n={largest} (heap scratch + quick sort stack, excluding the input array):\n")
+    for (algo, strategy), aux in peak.items():
+        f.write(f"  {str(algo):<25} {str(strategy):<10} : {int(aux):>12,} bytes ({aux / largest:.2f} B/element)\n")
+    f.write("\n")
+
+def _write_hardware_counters(f, df):
+    """写出最大规模下每个(算法, Pivot策略)的IPC和每元素缺失次数（未启用--counters时跳过）"""
+    import pandas as pd
+    metrics = ['IPC', 'BranchMissesPerElement', 'LLCMissesPerElement', 'RSSBytesPerElement']
+    if any(col not in df.columns for col in metrics) or df[metrics].isna().all().all():
+        return
+    largest = df['Size'].max()
+    table = (df[df['Size'] == largest].groupby(['Algorithm', 'PivotStrategy'], observed=True)[metrics]
+             .mean().dropna(how='all').sort_values('BranchMissesPerElement'))
+    f.write(f"Hardware counters at n={largest} (per element, n/a = counter not available):\n")
+    f.write(f"  {'Algorithm':<25} {'Pivot':<10} {'IPC':>6} {'BrMiss/n':>9} {'LLCMiss/n':>10} {'RSS B/n':>9}\n")
+    for (algo, strategy), row in table.iterrows():
+        cells = [f"{row[col]:>{width}.{digits}f}" if pd.notna(row[col]) else f"{'n/a':>{width}}"
+                 for col, width, digits in zip(metrics, (6, 9, 10, 9), (2, 3, 3, 1))]
+        f.write(f"  {str(algo):<25} {str(strategy):<10} {' '.join(cells)}\n")
+    f.write("\n")
+
+def _write_build_section(f, df):
+    """写出编译器变体矩阵：每个(算法, Pivot策略)在各构建下相对参考构建的加速比"""
+    import pandas as pd
+    import numpy as np
+    f.write("6. Compiler Build Comparison\n")
+    f.write("-" * 50 + "\n")
+    
+    table = build_speedup_table(df)
+    if table.empty:
+        f.write("Only one build in the log (run build_matrix.py to benchmark -O0..-O3, -march=native, LTO and PGO)\n\n")
+        return
+    reference = table['Reference'].iloc[0]
+    builds = [str(build) for build in table['Build'].cat.categories]
+    f.write(f"Speedup vs {reference} (reference time / build time, geometric mean over sizes; >1 = faster):\n")
+    for facet in distribution_names(df):
+        data = table if facet is None else table[table['Distribution'] == facet]
+        if data.empty:
+            continue
+        _write_facet_header(f, facet)
+        matrix = data.pivot_table(index=['Algorithm', 'PivotStrategy'], columns='Build', values='Speedup',
+                                  observed=True)
+        width = max(8, max(map(len, builds)))
+        f.write(f"  {'Algorithm':<25} {'Pivot':<10}" + ''.join(f" {build:>{width}}" for build in builds) + "\n")
+        for (algo, strategy), row in matrix.iterrows():
+            cells = [f"{row[build]:>{width - 1}.2f}x" if build in row.index and pd.notna(row[build])
+                     else f"{'n/a':>{width}}" for build in builds]
+            f.write(f"  {algo:<25} {strategy:<10} {' '.join(cells)}\n")
+        f.write("\n")
+    
+    # 每个构建在所有单元上的几何平均加速比，以及收益最大和最小的单元
+    overall = table.groupby('Build', observed=True)['Speedup'].apply(lambda x: float(np.exp(np.log(x).mean())))
+    f.write("Overall (geometric mean over all algorithms, pivots and distributions):\n")
+    for build, speedup in overall.items():
+        f.write(f"  {str(build):<20} : {speedup:.2f}x\n")
+    candidates = overall.drop(reference, errors='ignore')
+    if not candidates.empty:
+        best = candidates.idxmax()
+        cells = table[table['Build'] == best].sort_values('Speedup')
+        worst_cell, best_cell = cells.iloc[0], cells.iloc[-1]
+        spread = (f"per cell from {worst_cell['Speedup']:.2f}x ({worst_cell['Algorithm']}/{worst_cell['PivotStrategy']} "
+                  f"on {worst_cell['Distribution']}) to {best_cell['Speedup']:.2f}x ({best_cell['Algorithm']}/"
+                  f"{best_cell['PivotStrategy']} on {best_cell['Distribution']})")
+        if candidates.max() > 1:
+            f.write(f"✓ Fastest build overall: {best} ({candidates.max():.2f}x vs {reference}); {spread}\n")
+        else:
+            f.write(f"✓ No build is faster than {reference} overall; closest is {best} "
+                    f"({candidates.max():.2f}x), {spread}\n")
+    f.write("\n")
+
+def _write_dtype_section(f, df):
+    """写出元素类型对比：各类型在最大公共规模下的吞吐量（元素/秒、字节/秒）和相对参考类型的单元素耗时"""
+    import pandas as pd
+    import numpy as np
+    f.write("7. Element Type Comparison\n")
+    f.write("-" * 50 + "\n")
+    
+    table = dtype_throughput_table(df)
+    if table.empty:
+        f.write("Only one element type in the log (run sort_analysis --dtypes int32,int64,float64,record)\n\n")
+        return
+    reference = table['Reference'].iloc[0]
+    dtypes = [str(dtype) for dtype in table['DType'].cat.categories]
+    sizes = ', '.join(f"{dtype} ({DTYPE_BYTES[dtype]} B)" for dtype in dtypes if dtype in DTYPE_BYTES)
+    f.write(f"Element types: {sizes}; "
+            f"test data is generated as int32 and converted order-preserving, so every type sorts the same "
+            f"permutation\n")
+    f.write("Throughput at the largest common size in million elements/s (time per element vs "
+            f"{reference} in parentheses, >1 = slower):\n")
+    for facet in distribution_names(df):
+        data = table if facet is None else table[table['Distribution'] == facet]
+        if data.empty:
+            continue
+        _write_facet_header(f, facet)
+        f.write(f"  n = {int(data['Size'].iloc[0])}\n")
+        f.write(f"  {'Algorithm':<25} {'Pivot':<10}" + ''.join(f" {dtype:>15}" for dtype in dtypes) + "\n")
+        # 表已按序列和类型排序：逐行收集每个(算法, Pivot策略)各类型的单元
+        series = {}
+        for row in data.itertuples():
+            by_dtype = series.setdefault((row.Algorithm, row.PivotStrategy), {})
+            if pd.notna(row.ElementsPerSec):
+                by_dtype[str(row.DType)] = row
+        for (algo, strategy), by_dtype in series.items():
+            values = []
+            for dtype in dtypes:
+                if dtype in by_dtype:
+                    row = by_dtype[dtype]
+                    values.append(f"{row.ElementsPerSec / 1e6:>7.2f} ({row.Slowdown:.2f}x)")
+                else:
+                    values.append(f"{'n/a':>15}")
+            f.write(f"  {algo:<25} {strategy:<10} " + ' '.join(f"{value:>15}" for value in values) + "\n")
+        f.write("\n")
+    
+    # 每种类型在所有单元上的几何平均吞吐量（元素/秒和字节/秒）
+    columns = ['ElementsPerSec', 'BytesPerSec', 'Slowdown']
+    overall = np.exp(np.log(table[columns]).groupby(table['DType'], observed=True).mean())
+    f.write("Overall (geometric mean over all algorithms, pivots and distributions):\n")
+    f.write(f"  {'Type':<10} {'Melem/s':>10} {'MB/s':>10} {'vs ' + reference:>10}\n")
+    for dtype, row in overall.iterrows():
+        f.write(f"  {str(dtype):<10} {row['ElementsPerSec'] / 1e6:>10.2f} {row['BytesPerSec'] / 1e6:>10.1f} "
+                f"{row['Slowdown']:>9.2f}x\n")
+    widest = overall['Slowdown'].idxmax()
+    if widest != reference:
+        f.write(f"✓ Wider elements cost per element: {widest} is {overall.at[widest, 'Slowdown']:.2f}x slower than "
+                f"{reference} per element but moves {overall.at[widest, 'BytesPerSec'] / overall.at[reference, 'BytesPerSec']:.2f}x "
+                f"the bytes per second\n")
+    f.write("\n")
+
+def _write_sampling_summary(f, df):
+    """写出每个单元的计时次数和精度概况，以及自适应计时中批量排序和超时的单元"""
+    samples = df['Samples'].dropna()
+    precision = df['Precision'].dropna()
+    f.write(f"Samples per cell: min {int(samples.min())}, median {samples.median():g}, max {int(samples.max())}\n")
+    if not precision.empty:
+        worst = df.loc[precision.idxmax()]
+        f.write(f"Precision ({CONFIDENCE_LEVEL:.0%} CI half-width / median): median ±{precision.median():.1%}, "
+                f"worst ±{precision.max():.1%} ({worst['Algorithm']} / {worst['PivotStrategy']}, "
+                f"{worst['Distribution']}, n={worst['Size']})\n")
+    batched = df[df['Batch'] > 1]
+    if not batched.empty:
+        f.write(f"Batched cells (several sorts per timed sample): {len(batched)}, "
+                f"up to {int(batched['Batch'].max())} sorts per sample\n")
+    timed_out = df[df['TimedOut']]
+    if not timed_out.empty:
+        f.write(f"Timed-out cells ({len(timed_out)}, stopped at the per-cell time limit; larger sizes of a "
+                f"timed-out quick sort series are skipped):\n")
+        for row in timed_out.sort_values(AGGREGATE_KEYS).itertuples():
+            dtype_note = f", {row.DType}" if df['DType'].nunique() > 1 else ""
+            f.write(f"  ⚠ {row.Algorithm} / {row.PivotStrategy}, {row.Distribution}{dtype_note}, n={row.Size}: "
+                    f"{int(row.Samples)} samples, median {row.Median:.3f} ms\n")
+
+def _write_history_section(f, history):
+    """写出跨运行趋势：最近几次运行的范围和每个单元检测到的变化点"""
+    f.write("8. Cross-Run Trends\n")
+    f.write("-" * 50 + "\n")
+    if history is None or history.empty:
+        f.write("No run history (analyze with --record-history to record runs in results/history.sqlite)\n\n")
+        return
+    runs = history.drop_duplicates('run_id').sort_values('run_ts')
+    f.write(f"Last {len(runs)} recorded runs: {runs['run_ts'].iloc[0]} .. {runs['run_ts'].iloc[-1]}\n")
+    if len(runs) < 2 * CHANGE_MIN_SEGMENT:
+        f.write(f"Change point detection needs at least {2 * CHANGE_MIN_SEGMENT} runs\n\n")
+        return
+    changes = history_change_table(history)
+    f.write(f"Change points (binary segmentation on log median time; shift >= {CHANGE_MIN_SHIFT:.0%} and "
+            f">= {CHANGE_THRESHOLD:g} standard errors, segments of >= {CHANGE_MIN_SEGMENT} runs):\n")
+    if changes.empty:
+        f.write("  none detected\n\n")
+        return
+    f.write(f"  {'Algorithm':<25} {'Pivot':<10} {'Distribution':<13} {'Build':<10} {'DType':<8} {'Size':>8} "
+            f"{'From run':<20} {'Before(ms)':>10} {'After(ms)':>10} {'Change':>8}\n")
+    for row in changes.sort_values('Ratio', ascending=False).itertuples():
+        mark = "✗ slower" if row.Ratio > 1 else "✓ faster"
+        f.write(f"  {row.algorithm:<25} {row.pivot:<10} {row.distribution:<13} {row.build:<10} {row.dtype:<8} {row.size:>8} "
+                f"{row.run_ts:<20} {row.BeforeMs:>10.3f} {row.AfterMs:>10.3f} {row.Ratio - 1:>+7.1%}  {mark}\n")
+    f.write("\n")
+
+def _write_scaling_section(f, df):
+    """写出线程扩展性分析（强扩展加速比/效率、Amdahl拟合、弱扩展效率）"""
+    f.write(f"5. Thread Scaling Analysis ({SCALING_ALGORITHM})\n")
+    f.write("-" * 50 + "\n")
+    
+    # 分面按整个日志的分布决定，扩展性表只需要被扫描算法的行
+    facets = distribution_names(df)
+    df = df[df['Algorithm'] == SCALING_ALGORITHM]
+    scaling = scaling_table(df)
+    weak = weak_scaling_table(df)
+    if scaling.empty and weak.empty:
+        f.write("No thread sweep in the log (run the benchmark with --threads 1,2,4,...)\n\n")
+        return
+    
+    for facet in facets:
+        facet_scaling = scaling if facet is None or scaling.empty else scaling[scaling['Distribution'] == facet]
+        facet_weak = weak if facet is None or weak.empty else weak[weak['Distribution'] == facet]
+        if facet_scaling.empty and facet_weak.empty:
+            continue
+        _write_facet_header(f, facet)
         
-        # 在柱子上添加数值和排名
-        for i, (bar, time_val) in enumerate(zip(bars, times_sorted)):
-            plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(times_sorted)*0.01,
-                    f'{time_val:.1f} ms\n(Rank {i+1})', ha='center', va='bottom', fontweight='bold')
+        if not facet_scaling.empty:
+            f.write("Strong scaling (fastest task depth per thread count):\n")
+            f.write(f"  {'Size':>8} {'Threads':>7} {'Depth':>5} {'Time(ms)':>10} {'Speedup':>8} {'Efficiency':>10}\n")
+            for row in facet_scaling.itertuples():
+                f.write(f"  {row.Size:>8} {row.Threads:>7} {row.TaskDepth:>5} {row.TimeMs:>10.3f} "
+                        f"{row.Speedup:>7.2f}x {row.Efficiency:>10.1%}\n")
+            f.write("\n")
+            
+            fits = fit_amdahl(facet_scaling)
+            f.write(f"Amdahl fit S(p) = 1 / ((1 - f) + f / p); usable threads = largest p with "
+                    f"efficiency >= {SCALING_EFFICIENCY_TARGET:.0%}:\n")
+            f.write(f"  {'Size':>8} {'Parallel f':>10} {'Max speedup':>11} {'Usable threads':>14} "
+                    f"{'Observed':>9} {'RMSE':>6}\n")
+            for fit in fits.itertuples():
+                useful = ('unbounded' if math.isinf(fit.UsefulThreads)
+                          else 'none' if fit.UsefulThreads == 0 else str(int(fit.UsefulThreads)))
+                f.write(f"  {fit.Size:>8} {fit.ParallelFraction:>10.3f} {fit.MaxSpeedup:>10.2f}x {useful:>14} "
+                        f"{fit.ObservedSpeedup:>8.2f}x {fit.RMSE:>6.3f}\n")
+            if not fits.empty:
+                largest = fits.loc[fits['Size'].idxmax()]
+                f.write(f"✓ At n = {int(largest['Size']):,} the parallel fraction is {largest['ParallelFraction']:.3f}")
+                if math.isinf(largest['UsefulThreads']):
+                    f.write(": no serial bottleneck detected within the measured thread counts\n")
+                elif largest['UsefulThreads'] == 0:
+                    f.write(": additional threads give no speedup\n")
+                else:
+                    f.write(f": speedup is capped at {largest['MaxSpeedup']:.2f}x, more than "
+                            f"{int(largest['UsefulThreads'])} threads run below {SCALING_EFFICIENCY_TARGET:.0%} efficiency\n")
+            f.write("\n")
         
-        plt.grid(True, alpha=0.3, axis='y')
-        plt.tight_layout()
-        plt.savefig('../results/pivot_strategy_ranking.png', dpi=300, bbox_inches='tight')
-        print("✓ 生成图表: pivot_strategy_ranking.png")
-    
-    plt.close('all')
+        if not facet_weak.empty:
+            f.write("Weak scaling (fixed elements per thread, efficiency = T(1 thread) / T(p threads)):\n")
+            f.write(f"  {'Per thread':>10} {'Threads':>7} {'Size':>8} {'Time(ms)':>10} {'Efficiency':>10}\n")
+            for row in facet_weak.itertuples():
+                f.write(f"  {row.PerThread:>10} {row.Threads:>7} {row.Size:>8} {row.TimeMs:>10.3f} "
+                        f"{row.Efficiency:>10.1%}\n")
+            f.write("\n")
 
-def generate_analysis_report(df):
-    """生成完整的分析报告"""
+def generate_analysis_report(df, out_dir='../results', charts=None, history=None):
+    """生成完整的分析报告（charts为本次生成的图表名列表，None表示全部；history为最近几次运行的历史单元）
+    
+    日志中包含多种数据分布时，第2-4节按分布分别给出排名、扩展性和结论；
+    扫描了线程数的算法在第2-4节只使用一种并行配置，完整扫描结果见第5节；
+    日志中包含多个编译器构建时，第2-5节只使用参考构建（-O2），构建之间的对比见第6节；
+    日志中包含多种元素类型时，第2-6节只使用参考类型（int32），各类型的吞吐量对比见第7节；
+    第8节为最近几次运行的趋势和变化点（history为None时说明没有历史记录）。
+    """
+    import pandas as pd
     if df.empty:
         return
     
-    report_path = '../results/complete_analysis_report.txt'
+    os.makedirs(out_dir, exist_ok=True)
+    report_path = os.path.join(out_dir, 'complete_analysis_report.txt')
+    all_dtypes = df
+    df, reference_dtype = select_reference_dtype(df)
+    all_builds = df
+    df, reference_build = select_reference_build(df)
+    all_sampled = select_reference_build(all_dtypes)[0]
+    all_configs = df
+    df, primary_configs = select_primary_configuration(df)
+    facets = distribution_facets(df)
+    rankings = {facet: _ranking_tables(data) for facet, data in facets}
     
     with open(report_path, 'w', encoding='utf-8') as f:
         f.write("Sorting Algorithm Performance Complete Analysis Report\n")
         f.write("=" * 70 + "\n\n")
         f.write(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Total data records: {len(df)}\n\n")
+        f.write(f"Total data records: {int(_record_weights(all_dtypes).sum())}\n\n")
         
         # 基本统计信息
         f.write("1. Test Overview\n")
@@ -402,145 +1941,405 @@ def generate_analysis_report(df):
             strategies = [s for s in df['PivotStrategy'].unique() if str(s) != 'N/A']
             f.write(f"Tested pivot strategies: {', '.join(map(str, strategies))}\n")
         
+        if 'Distribution' in df.columns:
+            f.write(f"Tested input distributions: {', '.join(map(str, df['Distribution'].unique()))}\n")
+        
         if 'Size' in df.columns:
             sizes = sorted(df['Size'].unique())
             f.write(f"Tested data sizes: {', '.join(map(str, sizes))}\n")
         
-        f.write(f"Successful sorting records: {df['Sorted'].sum() if 'Sorted' in df.columns else 'N/A'}\n\n")
+        # 与开头的总记录数使用同一张表（所有构建、元素类型和并行配置）
+        f.write(f"Successful sorting records: "
+                f"{int(all_dtypes['Sorted'].sum()) if 'Sorted' in all_dtypes.columns else 'N/A'}\n")
+        for algo, (threads, depth) in primary_configs.items():
+            f.write(f"Parallel configuration used in sections 2-4: {algo} = {threads} threads, task depth {depth}\n")
+        if reference_build is not None:
+            builds = sorted(map(str, all_builds['Build'].unique()), key=_build_sort_key)
+            f.write(f"Tested compiler builds: {', '.join(builds)} (sections 2-5 use {reference_build})\n")
+        if reference_dtype is not None:
+            dtypes = sorted(map(str, all_dtypes['DType'].unique()),
+                            key=lambda d: DTYPE_ORDER.index(d) if d in DTYPE_ORDER else len(DTYPE_ORDER))
+            f.write(f"Tested element types: {', '.join(dtypes)} (sections 2-6 use {reference_dtype})\n")
+        _write_sampling_summary(f, all_sampled)
+        f.write("\n")
         
         # 性能分析
         f.write("2. Performance Analysis Results\n")
         f.write("-" * 50 + "\n")
         
-        # 分析每个算法的平均性能
-        if 'Algorithm' in df.columns and 'Time(ms)' in df.columns:
-            df_numeric = df.copy()
-            df_numeric['Time(ms)'] = pd.to_numeric(df_numeric['Time(ms)'], errors='coerce')
-            df_numeric = df_numeric.dropna(subset=['Time(ms)'])
-            
-            algo_performance = df_numeric.groupby('Algorithm')['Time(ms)'].mean().sort_values()
+        for facet, data in facets:
+            _write_facet_header(f, facet)
+            _, algo_performance, _, pivot_performance = rankings[facet]
             
+            # 分析每个算法的平均性能
             f.write("Algorithm Average Performance Ranking (Fastest to Slowest):\n")
             for i, (algo, avg_time) in enumerate(algo_performance.items(), 1):
                 f.write(f"  {i:2d}. {algo:<30} : {avg_time:.2f} ms\n")
             f.write("\n")
-        
-        # Pivot策略分析
-        quick_sort_data = df[df['Algorithm'].str.contains('Quick Sort', na=False)].copy()
-        if not quick_sort_data.empty and 'PivotStrategy' in quick_sort_data.columns:
-            quick_sort_data['Time(ms)'] = pd.to_numeric(quick_sort_data['Time(ms)'], errors='coerce')
-            quick_sort_data = quick_sort_data.dropna(subset=['Time(ms)'])
             
-            pivot_performance = quick_sort_data.groupby('PivotStrategy')['Time(ms)'].mean().sort_values()
+            # Pivot策略分析
+            if not pivot_performance.empty:
+                f.write("Pivot Strategy Average Performance Ranking (Fastest to Slowest):\n")
+                for i, (strategy, avg_time) in enumerate(pivot_performance.items(), 1):
+                    f.write(f"  {i:2d}. {strategy:<15} : {avg_time:.2f} ms\n")
+                f.write("\n")
             
-            f.write("Pivot Strategy Average Performance Ranking (Fastest to Slowest):\n")
-            for i, (strategy, avg_time) in enumerate(pivot_performance.items(), 1):
-                f.write(f"  {i:2d}. {strategy:<15} : {avg_time:.2f} ms\n")
-            f.write("\n")
+            # 每个单元的统计量（中位数、四分位距、中位数的bootstrap置信区间）
+            if 'Median' in data.columns:
+                f.write(f"Per-Cell Timing Statistics (median, IQR, {CONFIDENCE_LEVEL:.0%} bootstrap CI of the median, "
+                        f"precision = CI half-width / median, batch = sorts per sample, "
+                        f"throughput from the median):\n")
+                f.write(f"  {'Algorithm':<25} {'Pivot':<8} {'Size':>8} {'n':>4} {'Median':>10} {'IQR':>9} "
+                        f"{'Precision':>9} {'Batch':>5} {'Melem/s':>8} {'MB/s':>8}   CI\n")
+                for row in data.sort_values(AGGREGATE_KEYS).itertuples():
+                    ci = (f"[{row.CILow:.3f}, {row.CIHigh:.3f}]" if pd.notna(row.CILow)
+                          else f"n/a (< {BOOTSTRAP_MIN_SAMPLES} samples)")
+                    precision = f"±{row.Precision:.1%}" if pd.notna(row.Precision) else 'n/a'
+                    timed_out = "  ⚠ timed out" if row.TimedOut else ""
+                    f.write(f"  {str(row.Algorithm):<25} {str(row.PivotStrategy):<8} {row.Size:>8} "
+                            f"{int(row.Samples):>4} {row.Median:>10.3f} {row.IQR:>9.3f} "
+                            f"{precision:>9} {int(row.Batch):>5} {row.ElementsPerSec / 1e6:>8.2f} "
+                            f"{row.BytesPerSec / 1e6:>8.1f}   {ci}{timed_out}\n")
+                f.write("\n")
         
         # 规模扩展性分析
         f.write("3. Scalability Analysis\n")
         f.write("-" * 50 + "\n")
         
-        if 'Size' in df.columns and 'Time(ms)' in df.columns:
-            sizes = sorted(df['Size'].unique())
-            for size in sizes:
-                size_data = df_numeric[df_numeric['Size'] == size]
-                if not size_data.empty:
-                    fastest = size_data.loc[size_data['Time(ms)'].idxmin()]
-                    f.write(f"Size {size}: Fastest algorithm = {fastest['Algorithm']} ({fastest['PivotStrategy']}), "
-                           f"Time = {fastest['Time(ms)']:.2f} ms\n")
+        quadratic_series = []
+        for facet, _ in facets:
+            _write_facet_header(f, facet)
+            df_numeric = rankings[facet][0]
+            # 比值为1的行是该规模下最快的行；按时间稳定排序，最快时间为0时取第一个0 ms的行
+            fastest = (df_numeric[relative_to_fastest(df_numeric) == 1].sort_values('Time(ms)', kind='stable')
+                       .drop_duplicates('Size').sort_values('Size'))
+            for size, algo, pivot, time_ms in zip(fastest['Size'], fastest['Algorithm'], fastest['PivotStrategy'],
+                                                  fastest['Time(ms)']):
+                f.write(f"Size {size}: Fastest algorithm = {algo} ({pivot}), Time = {time_ms:.2f} ms\n")
             f.write("\n")
+            
+            # 经验复杂度拟合与外推
+            fits = fit_complexity(df_numeric)
+            if not fits.empty:
+                pred_headers = ''.join(f"{f'@{n:,}':>14}" for n in EXTRAPOLATION_SIZES)
+                f.write("Empirical complexity fit (t = c * f(n), least squares on relative error):\n")
+                f.write(f"  {'Algorithm':<25} {'Pivot':<8} {'Model':<11} {'c (ms)':>11} {'RelRMSE':>8}{pred_headers}\n")
+                for _, fit in fits.iterrows():
+                    preds = ''.join(f"{fit[f'Pred{n}']:>11.1f} ms" for n in EXTRAPOLATION_SIZES)
+                    flag = "  ⚠ QUADRATIC" if fit['Quadratic'] else ""
+                    f.write(f"  {fit['Algorithm']:<25} {fit['PivotStrategy']:<8} {fit['Model']:<11} "
+                            f"{fit['Constant']:>11.3e} {fit['RelRMSE']:>8.3f}{preds}{flag}\n")
+                quadratic = fits[fits['Quadratic']]
+                if not quadratic.empty:
+                    series = [f"{r.Algorithm}/{r.PivotStrategy}" for r in quadratic.itertuples()]
+                    f.write("⚠ Series with quadratic growth (do not use for large inputs): " + ', '.join(series) + "\n")
+                    quadratic_series += [f"{name} on {facet}" if facet else name for name in series]
+                f.write("\n")
+            _write_auxiliary_memory(f, df_numeric)
+            _write_hardware_counters(f, df_numeric)
         
         # 结论和建议
         f.write("4. Conclusions and Recommendations\n")
         f.write("-" * 50 + "\n")
         
-        if not algo_performance.empty:
-            best_algo = algo_performance.index[0]
-            best_time = algo_performance.iloc[0]
-            f.write(f"✓ Best performing algorithm: {best_algo} (average {best_time:.2f} ms)\n")
+        engine_tables = []
+        for facet, _ in facets:
+            _write_facet_header(f, facet)
+            df_numeric, algo_performance, quick_sort_data, pivot_performance = rankings[facet]
+            if not algo_performance.empty:
+                _write_winner(f, 'performing algorithm', algo_performance, df_numeric, 'Algorithm')
+            if not pivot_performance.empty:
+                _write_winner(f, 'pivot strategy', pivot_performance, quick_sort_data, 'PivotStrategy')
+            engines = engine_comparison_table(df_numeric)
+            if not engines.empty:
+                _write_engine_comparison(f, engines)
+                engine_tables.append((facet, engines))
+            f.write("\n")
         
-        if not pivot_performance.empty:
-            best_pivot = pivot_performance.index[0]
-            f.write(f"✓ Best pivot strategy: {best_pivot}\n")
+        if len(facets) > 1 and quadratic_series:
+            f.write("⚠ Input-dependent worst cases (quadratic growth): " + '; '.join(quadratic_series) + "\n\n")
         
-        f.write("\n✓ Practical recommendations:\n")
+        f.write("✓ Practical recommendations:\n")
         f.write("  - For general use: Use Quick Sort + Median-of-Three pivot strategy\n")
+        f.write("  - For bounded worst-case latency: Use Introsort (ninther pivot, three-way partition, heapsort fallback)\n")
+        f.write("  - For inputs with many duplicate keys: Use a three-way partition (ThreeWay or Introsort)\n")
         f.write("  - For large datasets: Consider parallel merge sort\n")
+        for line in _engine_recommendations(engine_tables):
+            f.write(line + "\n")
         f.write("  - Avoid First/Last pivot strategies, they can lead to worst-case scenarios\n")
         f.write("  - Use iterative quick sort for memory-sensitive scenarios to avoid stack overflow\n\n")
         
-        f.write("5. Generated Visualization Files\n")
-        f.write("-" * 50 + "\n")
-        f.write("Scatter plots:\n")
-        f.write("  - all_algorithms_scatter.png: Scatter plot of all algorithms performance\n")
-        f.write("  - quick_sort_pivot_scatter.png: Quick sort performance with different pivot strategies\n")
-        f.write("  - recursive_vs_iterative_scatter.png: Recursive vs iterative quick sort comparison\n")
-        f.write("  - performance_density_scatter.png: Performance density scatter plot\n\n")
+        _write_scaling_section(f, all_configs)
+        _write_build_section(f, select_primary_configuration(all_builds)[0])
+        _write_dtype_section(f, select_primary_configuration(select_reference_build(all_dtypes)[0])[0])
+        _write_history_section(f, history)
         
-        f.write("Line charts and bar charts:\n")
-        f.write("  - pivot_strategy_comparison_recursive.png: Pivot strategy comparison (recursive)\n")
-        f.write("  - pivot_strategy_comparison_iterative.png: Pivot strategy comparison (iterative)\n")
-        f.write("  - algorithm_comparison_best_pivot.png: Algorithm comparison with best pivot\n")
-        f.write("  - pivot_strategy_ranking.png: Pivot strategy performance ranking\n")
+        f.write("9. Generated Visualization Files\n")
+        f.write("-" * 50 + "\n")
+        listed = CHART_NAMES if charts is None else [name for name in CHART_NAMES if name in charts]
+        if os.path.exists(os.path.join(out_dir, 'dashboard.html')):
+            f.write("Interactive report: dashboard.html (filter by algorithm, pivot, size, distribution, build and "
+                    "element type)\n\n")
+        elif not listed:
+            f.write("No charts generated (report-only mode)\n")
+        for group in CHART_GROUPS:
+            group_charts = [name for name in listed if CHART_DESCRIPTIONS[name][0] == group]
+            # 扩展性图表只在有线程数扫描数据的分布下生成，趋势图不分面
+            rendered = {name: [chart_file_name(name, facet)
+                               for facet in ([None] if name in UNFACETED_CHARTS else [facet for facet, _ in facets])
+                               if os.path.exists(os.path.join(out_dir, chart_file_name(name, facet)))]
+                        for name in group_charts}
+            if any(rendered.values()):
+                f.write(f"{group}:\n")
+                for name in group_charts:
+                    if rendered[name]:
+                        f.write(f"  - {', '.join(rendered[name])}: {CHART_DESCRIPTIONS[name][1]}\n")
+                f.write("\n")
     
     print(f"✓ 生成完整分析报告: {report_path}")
 
+# 回归检测：有回归时的进程退出码
+EXIT_REGRESSION = 3
+
+def compare_runs(baseline, candidate, tolerance=0.05, min_time_ms=0.01):
+    """按(算法, Pivot策略, 数据分布, 规模)对齐两次运行的聚合结果，计算每个单元的加速比并标记回归
+    
+    加速比 = 基线时间 / 候选时间（<1表示变慢）。候选比基线慢超过tolerance，且两者的
+    置信区间不重叠（样本足够时）才算回归；两次运行都低于min_time_ms的单元视为计时噪声。
+    """
+    import numpy as np
+    # 两次运行通常来自不同的构建（如-O2与-O3），按构建以外的键对齐；包含多个构建的日志只取参考构建
+    baseline, _ = select_reference_build(baseline)
+    candidate, _ = select_reference_build(candidate)
+    keys = [key for key in AGGREGATE_KEYS if key != 'Build']
+    columns = keys + ['Time(ms)'] + [c for c in ('Median', 'CILow', 'CIHigh') if c in baseline.columns]
+    as_text = {col: str for col in keys if col in CATEGORY_KEYS}
+    base = baseline[[c for c in columns if c in baseline.columns]].astype(as_text)
+    cand = candidate[[c for c in columns if c in candidate.columns]].astype(as_text)
+    table = base.merge(cand, on=keys, how='inner', suffixes=('Base', 'Cand'))
+    
+    def center(suffix):
+        # 有中位数时用中位数，否则用平均时间
+        median_col = f'Median{suffix}'
+        if median_col in table.columns:
+            return table[median_col].fillna(table[f'Time(ms){suffix}'])
+        return table[f'Time(ms){suffix}']
+    
+    table['BaseMs'] = center('Base')
+    table['CandMs'] = center('Cand')
+    table['Speedup'] = table['BaseMs'] / table['CandMs']
+    slower = table['CandMs'] > table['BaseMs'] * (1 + tolerance)
+    
+    if 'CILowCand' in table.columns and 'CIHighBase' in table.columns:
+        # 置信区间可用时，要求候选的区间整体落在基线区间之上
+        ci_known = table['CILowCand'].notna() & table['CIHighBase'].notna()
+        slower &= ~ci_known | (table['CILowCand'] > table['CIHighBase'])
+    
+    measurable = np.maximum(table['BaseMs'], table['CandMs']) >= min_time_ms
+    table['Regression'] = slower & measurable
+    return table.sort_values('Speedup', ignore_index=True)
+
+def print_comparison(table, tolerance):
+    """打印按加速比排序的对比表（最慢的在前），返回回归单元数"""
+    regressions = int(table['Regression'].sum())
+    print(f"\n=== 基线 vs 候选 对比 ({len(table)} 个对齐单元, 容差 {tolerance:.1%}) ===")
+    print(f"  {'Algorithm':<25} {'Pivot':<8} {'Distribution':<13} {'Thr/Depth':>9} {'Size':>8} "
+          f"{'Base(ms)':>10} {'Cand(ms)':>10} {'Speedup':>8}")
+    for _, row in table.iterrows():
+        mark = "✗ REGRESSION" if row['Regression'] else ""
+        config = f"{row['Threads']}/{row['TaskDepth']}"
+        print(f"  {row['Algorithm']:<25} {row['PivotStrategy']:<8} {row['Distribution']:<13} {config:>9} {row['Size']:>8} "
+              f"{row['BaseMs']:>10.3f} {row['CandMs']:>10.3f} {row['Speedup']:>7.3f}x  {mark}")
+    if regressions:
+        print(f"✗ 发现 {regressions} 个性能回归单元")
+    else:
+        print("✓ 没有超出容差的性能回归")
+    return regressions
+
+def run_compare(baseline_log, candidate_log, tolerance, min_time_ms):
+    """对比模式入口，返回进程退出码"""
+    baseline = load_performance_aggregates(baseline_log)
+    candidate = load_performance_aggregates(candidate_log)
+    if baseline.empty or candidate.empty:
+        return 1
+    
+    table = compare_runs(baseline, candidate, tolerance, min_time_ms)
+    if table.empty:
+        print("✗ 基线与候选没有共同的(算法, Pivot策略, 数据分布, 规模)单元")
+        return 1
+    return EXIT_REGRESSION if print_comparison(table, tolerance) else 0
+
 def install_chinese_fonts():
-    """尝试安装中文字体（可选）"""
+    """检查系统中文字体（结果缓存在磁盘上，与install_chinese_fonts.py共用查找逻辑）"""
     try:
-        import matplotlib.font_manager as fm
-        # 检查系统中是否有中文字体
-        chinese_fonts = [f.name for f in fm.fontManager.ttflist if 'Chinese' in f.name or 'SimHei' in f.name or 'Microsoft' in f.name]
+        from install_chinese_fonts import find_chinese_fonts
+        chinese_fonts = find_chinese_fonts()
         if chinese_fonts:
             print(f"✓ 发现系统中文字体: {', '.join(chinese_fonts[:3])}")
             return True
         else:
             print("⚠ 未发现系统中文字体，将使用英文标签")
             return False
-    except:
+    except Exception:
         print("⚠ 无法检查字体，将使用英文标签")
         return False
 
-def main():
-    """主函数"""
+def parse_args(argv=None):
+    """解析命令行参数"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Sorting algorithm performance data analysis tool')
+    parser.add_argument('--log', default=None,
+                        help='performance log to analyze (default: search the usual results/ locations)')
+    parser.add_argument('--out', default='../results',
+                        help='directory for charts and the report (default: ../results)')
+    chart_group = parser.add_mutually_exclusive_group()
+    chart_group.add_argument('--charts', nargs='+', choices=CHART_NAMES, metavar='CHART',
+                             help=f'render only these charts; choices: {", ".join(CHART_NAMES)}')
+    chart_group.add_argument('--no-charts', action='store_true',
+                             help='report-only mode: skip charts and never import matplotlib')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes used to render charts (default: CPU count)')
+    parser.add_argument('--html', action='store_true',
+                        help='also write dashboard.html: an interactive report with the aggregated cells embedded '
+                             'as JSON, filtered and plotted in the browser (combine with --no-charts to skip matplotlib)')
+    parser.add_argument('--html-max-points', type=int, default=None, metavar='N',
+                        help='min/max downsample dashboard series with more than N sizes (default: 400)')
+    history_group = parser.add_argument_group('run history (see history_store.py)')
+    history_group.add_argument('--history', default=None, metavar='DB',
+                               help='SQLite run history read for the trend charts '
+                                    '(default: history.sqlite next to the log)')
+    history_group.add_argument('--record-history', action='store_true',
+                               help='record the analyzed log as one run in the history (collects run metadata '
+                                    'and calls git; ignored with --store)')
+    history_group.add_argument('--history-runs', type=int, default=HISTORY_RUNS, metavar='N',
+                               help='trend charts and change point detection over the last N runs (default: %(default)s)')
+    history_group.add_argument('--no-history', action='store_true', help='do not read the run history')
+    store_group = parser.add_argument_group('columnar results store (see results_store.py, requires pyarrow)')
+    store_group.add_argument('--store', default=None, metavar='DIR',
+                             help='read from a partitioned Parquet store instead of a log; only the partitions '
+                                  'and columns needed by the selected charts are read')
+    store_group.add_argument('--since', default=None, metavar='YYYY-MM-DD', help='only runs on or after this date')
+    store_group.add_argument('--until', default=None, metavar='YYYY-MM-DD', help='only runs on or before this date')
+    store_group.add_argument('--run-id', nargs='+', default=None, metavar='RUN', help='only these runs')
+    store_group.add_argument('--algorithms', nargs='+', default=None, metavar='ALGO', help='only these algorithms')
+    compare_group = parser.add_argument_group('regression detection')
+    compare_group.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'),
+                               help='compare two performance logs; exit with status '
+                                    f'{EXIT_REGRESSION} if any cell regresses beyond the tolerance')
+    compare_group.add_argument('--tolerance', type=float, default=0.05,
+                               help='allowed slowdown before a cell counts as a regression (default: 0.05 = 5%%)')
+    compare_group.add_argument('--min-time-ms', type=float, default=0.01,
+                               help='ignore cells faster than this in both runs as timer noise (default: 0.01)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """主函数，返回进程退出码"""
+    args = parse_args(argv)
+    if args.compare:
+        # 对比模式只需要pandas/numpy，不生成图表和报告
+        if not check_dependencies(need_charts=False):
+            return 1
+        return run_compare(*args.compare, args.tolerance, args.min_time_ms)
+    
+    charts = [] if args.no_charts else args.charts
+    need_charts = charts != []
+    
     print("=" * 70)
     print("    Sorting Algorithm Performance Data Analysis Tool")
     print("    (Pivot Strategy Analysis + Scatter Plots)")
     print("=" * 70)
     
     # 检查依赖
-    if not check_dependencies():
-        return
-    
-    # 检查中文字体
-    install_chinese_fonts()
-    
-    # 设置绘图样式
-    setup_plot_style()
-    
-    # 查找性能日志文件
-    log_file = find_performance_log()
-    if not log_file:
-        return
+    if not check_dependencies(need_charts):
+        return 1
     
-    # 解析数据
-    df = parse_performance_log(log_file)
+    if need_charts:
+        # 检查中文字体
+        install_chinese_fonts()
+        
+        # 设置绘图样式
+        setup_plot_style()
+    
+    if args.store:
+        # 列式结果存储：分区裁剪 + 列选择 + 行组过滤
+        df = load_store_aggregates(args.store, charts, algorithms=args.algorithms, since=args.since,
+                                   until=args.until, run_ids=args.run_id)
+    else:
+        # 查找性能日志文件
+        log_file = find_performance_log(args.log)
+        if not log_file:
+            return 1
+        
+        # 解析数据（流式聚合 + 增量缓存，只解析上次运行之后追加的日志行）
+        df = load_performance_aggregates(log_file)
     if df.empty:
-        return
-    
-    # 创建所有图表
-    create_scatter_plots(df)           # 散点图
-    create_pivot_analysis_charts(df)   # 折线图和柱状图
+        return 1
+    
+    history = None
+    if not args.no_history:
+        # 默认数据库与日志（或结果存储目录）在同一目录；只有--record-history时记录本次运行
+        # （收集运行元数据需要调用git），从结果存储读取时只读取历史
+        source = os.path.normpath(args.store) if args.store else log_file
+        db_path = args.history or os.path.join(os.path.dirname(source), HISTORY_FILE)
+        record_file = log_file if args.record_history and not args.store else None
+        history = load_run_history(db_path, df, record_file, args.history_runs)
+    
+    run_analysis(df, args.out, charts, n_jobs=args.jobs, html=args.html, html_max_points=args.html_max_points,
+                 history=history)
+    return 0
+
+def load_run_history(db_path, df, log_file=None, last_runs=HISTORY_RUNS):
+    """把本次分析的日志记录为一次运行（log_file为None时只读取），返回最近last_runs次运行的历史单元"""
+    import history_store
+    if log_file is None and not os.path.exists(db_path):
+        return None
+    try:
+        if log_file is not None:
+            cells, metadata = history_store.record_log(log_file, db_path, agg=df)
+            print(f"✓ 记录运行历史: {metadata['run_id']} ({cells} 个单元) -> {db_path}")
+        conn = history_store.connect(db_path)
+        try:
+            history = history_store.load_recent_cells(conn, last_runs)
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"⚠ 读取运行历史失败: {e}")
+        return None
+    print(f"✓ 运行历史: 最近 {history['run_id'].nunique()} 次运行")
+    return history
+
+def run_analysis(df, out_dir, charts=None, n_jobs=1, html=False, html_max_points=None, history=None):
+    """对聚合表生成图表和分析报告（charts为[]时只生成报告；调用方负责字体和绘图样式设置）
+
+    html为True时另外生成交互式HTML报告（dashboard.py），包含所有构建和并行配置，由浏览器端过滤；
+    history为history_store.load_recent_cells读出的最近几次运行，用于趋势图和报告第8节。
+    """
+    if charts != []:
+        # 创建图表：散点图、折线图和柱状图作为独立任务一起调度
+        print(f"\n=== 生成图表 (并行进程数: {n_jobs}) ===")
+        # 常规图表和扩展性图表只使用参考构建和参考元素类型，编译器变体矩阵使用所有构建，元素类型图使用所有类型
+        all_dtypes, _ = select_reference_build(df)
+        reference, _ = select_reference_dtype(all_dtypes)
+        primary, _ = select_primary_configuration(reference)
+        jobs = select_render_jobs(build_faceted_jobs(primary, build_scatter_jobs, build_pivot_jobs, build_counter_jobs)
+                                  + build_faceted_jobs(reference, build_scaling_jobs)
+                                  + build_faceted_jobs(select_primary_configuration(select_reference_dtype(df)[0])[0],
+                                                       build_matrix_jobs)
+                                  + build_faceted_jobs(select_primary_configuration(all_dtypes)[0], build_dtype_jobs)
+                                  + build_history_jobs(history), charts)
+        run_render_jobs(jobs, out_dir, n_jobs=n_jobs)
+    
+    if html:
+        from dashboard import DEFAULT_MAX_POINTS, write_dashboard
+        write_dashboard(df, out_dir, max_points=html_max_points or DEFAULT_MAX_POINTS)
     
     # 生成分析报告
-    generate_analysis_report(df)
+    generate_analysis_report(df, out_dir, charts, history)
     
     print("\n" + "=" * 70)
     print("Data Analysis Completed!")
-    print(f"All charts and reports saved to: {os.path.abspath('../results')}")
+    print(f"All charts and reports saved to: {os.path.abspath(out_dir)}")
     print("=" * 70)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
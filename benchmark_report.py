@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+报告模式耗时基准测试
+生成一个合成性能日志，运行 analyze_results.py --no-charts，测量脚本自身的耗时
+（总耗时减去导入pandas/numpy的固定开销），防止报告模式重新变慢
+"""
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+LOG_HEADER = ('Algorithm,PivotStrategy,Size,Time(ms),Sorted,Repeat,Distribution,Threads,TaskDepth,AuxBytes,'
+              'Cycles,Instructions,BranchMisses,LLCMisses,MaxRSSKB,Build,Batch,TimedOut,DType')
+
+# 合成日志的测试单元：(算法, Pivot策略列表, (线程数, 任务深度)列表, 每元素耗时系数ns)
+SERIES = [
+    ('Quick Sort (Recursive)', ['First', 'Last', 'Middle', 'Random', 'Median3'], [(1, 0)], 6.0),
+    ('Quick Sort (Iterative)', ['First', 'Last', 'Middle', 'Random', 'Median3'], [(1, 0)], 6.5),
+    ('Merge Sort (Buffered)', ['N/A'], [(1, 0)], 8.0),
+    ('Introsort', ['N/A'], [(1, 0)], 5.5),
+    ('Merge Sort (Parallel)', ['N/A'], [(1, 2), (2, 2), (4, 2), (4, 4)], 9.0),
+]
+SIZES = [1000, 5000, 10000, 50000, 100000]
+DISTRIBUTIONS = ['Uniform', 'Sorted']
+DTYPES = ['int32', 'int64']
+
+def write_synthetic_log(path, rows, seed=0):
+    """按SERIES × 分布 × 元素类型 × 规模循环写入计时样本，直到写满rows行"""
+    rng = random.Random(seed)
+    cells = [(algo, pivot, threads, depth, ns, dist, dtype, size)
+             for algo, pivots, configs, ns in SERIES for pivot in pivots for threads, depth in configs
+             for dist in DISTRIBUTIONS for dtype in DTYPES for size in SIZES]
+    repeats = max(1, -(-rows // len(cells)))
+    with open(path, 'w') as f:
+        f.write(LOG_HEADER + '\n')
+        written = 0
+        for algo, pivot, threads, depth, ns, dist, dtype, size in cells:
+            for repeat in range(repeats):
+                if written == rows:
+                    return
+                time_ms = ns * size * size.bit_length() / threads / 1e6 * rng.uniform(0.95, 1.1)
+                f.write(f"{algo},{pivot},{size},{time_ms:.4f},1,{repeat},{dist},{threads},{depth},0,"
+                        f"-1,-1,-1,-1,-1,-O2,1,0,{dtype}\n")
+                written += 1
+
+def measure_wall_time(args, cwd):
+    """运行一次python子进程，返回墙钟耗时（秒）"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable] + args, cwd=cwd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        output = (result.stderr or result.stdout).strip().splitlines()
+        raise RuntimeError(output[-1] if output else 'analysis failed')
+    return elapsed
+
+def main():
+    """主函数，返回进程退出码"""
+    parser = argparse.ArgumentParser(description='Report-only mode benchmark for analyze_results.py')
+    parser.add_argument('--rows', type=int, default=2000, help='rows in the synthetic log (default: 2000)')
+    parser.add_argument('--budget-ms', type=float, default=500.0,
+                        help='maximum time of the report-only run beyond importing pandas/numpy in ms '
+                             '(default: 500)')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs; the fastest is reported (default: 5)')
+    args = parser.parse_args()
+
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    work_dir = tempfile.mkdtemp(prefix='report_bench_')
+    try:
+        log_file = os.path.join(work_dir, 'performance_log.txt')
+        write_synthetic_log(log_file, args.rows)
+        analysis = ['analyze_results.py', '--log', log_file, '--out', os.path.join(work_dir, 'out'), '--no-charts']
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            # 每次都删除聚合缓存，测量第一次分析日志（完整解析）的耗时；
+            # 基线与分析交替运行，两者受到相近的系统负载影响
+            for name in os.listdir(work_dir):
+                if name.endswith('.aggcache.npz'):
+                    os.remove(os.path.join(work_dir, name))
+            baseline = measure_wall_time(['-c', 'import pandas, numpy'], cwd)
+            runs.append((measure_wall_time(analysis, cwd), baseline))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    # 取脚本自身耗时最短的一次，降低系统噪声影响
+    total, baseline = min(runs, key=lambda run: run[0] - run[1])
+    total_ms, baseline_ms = total * 1000, baseline * 1000
+    own_ms = total_ms - baseline_ms
+    print(f"=== 报告模式基准测试: analyze_results.py --no-charts ({args.rows} 行日志) ===")
+    print(f"总耗时: {total_ms:.1f} ms ({len(runs)} 次运行取最快)")
+    print(f"  导入pandas/numpy: {baseline_ms:.1f} ms")
+    print(f"  分析脚本自身: {own_ms:.1f} ms (预算 {args.budget_ms:.1f} ms)")
+
+    if own_ms > args.budget_ms:
+        print(f"✗ 报告模式耗时超出预算: {own_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        return 1
+    print("✓ 报告模式耗时在预算之内")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+分析脚本启动时间基准测试
+使用 python -X importtime 测量导入 analyze_results 的耗时，防止重量级依赖回到模块顶层
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# 这些包只能在真正用到的函数内部导入
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib']
+
+def measure_import_time(module, cwd):
+    """运行 python -X importtime 导入模块，返回[(模块名, 自身耗时us, 累计耗时us)]"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else 'import failed')
+
+    timings = []
+    for line in result.stderr.splitlines():
+        # 格式: "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+def main():
+    """主函数，返回进程退出码"""
+    parser = argparse.ArgumentParser(description='Startup (import time) benchmark for analyze_results.py')
+    parser.add_argument('--module', default='analyze_results', help='module to import (default: analyze_results)')
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help='maximum cumulative import time of the module in ms (default: 100)')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs; the fastest is reported (default: 5)')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest imports to list (default: 10)')
+    args = parser.parse_args()
+
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    runs = [measure_import_time(args.module, cwd) for _ in range(max(1, args.repeat))]
+    # 取模块自身累计耗时最小的一次，降低系统噪声影响
+    best = min(runs, key=lambda timings: next(c for n, s, c in timings if n == args.module))
+    total_ms = next(c for n, s, c in best if n == args.module) / 1000.0
+
+    print(f"=== 启动时间基准测试: import {args.module} ===")
+    print(f"累计导入耗时: {total_ms:.1f} ms (预算 {args.budget_ms:.1f} ms, {len(runs)} 次运行取最快)")
+    print(f"最慢的 {args.top} 个导入 (自身耗时):")
+    for name, self_us, _ in sorted(best, key=lambda t: t[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000.0:8.2f} ms  {name}")
+
+    ok = True
+    heavy = sorted({n.split('.')[0] for n, _, _ in best} & set(HEAVY_MODULES))
+    if heavy:
+        print(f"✗ 启动时导入了重量级依赖: {', '.join(heavy)}")
+        ok = False
+    if total_ms > args.budget_ms:
+        print(f"✗ 导入耗时超出预算: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        ok = False
+    if ok:
+        print("✓ 启动时间在预算之内")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+编译器变体矩阵驱动：用相同的测试参数依次运行各个构建的 sort_analysis_<构建> 程序，
+把每次运行的性能日志（含日志分片）合并为一个日志，再交给 analyze_results 生成图表和报告
+每个程序在日志的Build列写入自己的构建标签，报告第6节和 build_speedup_heatmap.png 给出相对-O2的加速比
+
+先编译所有构建: make build_matrix
+"""
+
+import os
+import subprocess
+import sys
+
+# 构建名 -> make build_matrix 生成的程序后缀：各优化级别，以及-O2基础上的-march=native、LTO和PGO
+# （构建名不带前导'-'，否则命令行上的 --builds O0 会被argparse当成选项）
+BUILD_SUFFIXES = {
+    'O0': '-O0',
+    'O1': '-O1',
+    'O2': '-O2',
+    'O3': '-O3',
+    'native': 'native',
+    'lto': 'lto',
+    'pgo': 'pgo',
+}
+BUILDS = list(BUILD_SUFFIXES)
+PROGRAM_NAME = 'sort_analysis'
+
+# 程序在工作目录下写出的日志（与 main.c 的 PERFORMANCE_LOG 一致）
+RUN_LOG = os.path.join('results', 'performance_log.txt')
+
+def find_programs(bin_dir, builds=BUILDS):
+    """返回已编译的[(构建, 程序路径)]，缺少的构建给出提示后跳过"""
+    programs = []
+    for build in builds:
+        path = os.path.join(bin_dir, f'{PROGRAM_NAME}_{BUILD_SUFFIXES[build]}')
+        if os.access(path, os.X_OK):
+            programs.append((build, os.path.abspath(path)))
+        else:
+            print(f"⚠ 跳过构建 {build}: 找不到 {path}")
+    return programs
+
+def read_run_log(work_dir):
+    """读取一次运行的日志和日志分片，返回(表头, 数据行列表)"""
+    from analyze_results import log_shards
+    log_file = os.path.join(work_dir, RUN_LOG)
+    header, rows = None, []
+    for path in [log_file] + log_shards(log_file):
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        if not lines:
+            continue
+        if header is not None and lines[0] != header:
+            raise ValueError(f"日志表头不一致: {path}")
+        header = lines[0]
+        rows += [line for line in lines[1:] if line]
+    return header, rows
+
+def run_matrix(programs, bench_args, log_file, work_dir, rounds=1):
+    """按轮次运行所有构建并把结果追加到log_file，返回记录数；任一程序失败时返回None
+
+    每轮轮换构建的执行顺序，避免机器状态（频率、温度、页缓存）的漂移总是落在同一个构建上。
+    """
+    header = None
+    total = 0
+    with open(log_file, 'w', encoding='utf-8') as out:
+        for round_index in range(rounds):
+            shift = round_index % len(programs)
+            for build, path in programs[shift:] + programs[:shift]:
+                print(f"--- 第 {round_index + 1}/{rounds} 轮: {build} ---")
+                result = subprocess.run([path] + bench_args, cwd=work_dir, stdout=subprocess.DEVNULL)
+                if result.returncode != 0:
+                    print(f"✗ {os.path.basename(path)} 退出码 {result.returncode}")
+                    return None
+                run_header, rows = read_run_log(work_dir)
+                if header is None:
+                    header = run_header
+                    out.write(header + '\n')
+                elif run_header != header:
+                    print(f"✗ {build} 的日志格式与其他构建不同，请用 make build_matrix 重新编译所有构建")
+                    return None
+                out.write(''.join(row + '\n' for row in rows))
+                out.flush()
+                total += len(rows)
+                print(f"✓ {build}: {len(rows)} 条记录")
+    return total
+
+def parse_builds(value):
+    """解析逗号分隔的构建列表（如 O0,O2,native；也接受 --builds=-O0,-O2 这样带前导'-'的写法）"""
+    import argparse
+    builds = [build.strip().lstrip('-') for build in value.split(',') if build.strip()]
+    unknown = [build for build in builds if build not in BUILD_SUFFIXES]
+    if unknown or not builds:
+        raise argparse.ArgumentTypeError(f"unknown build(s) {', '.join(unknown) or value!r}; "
+                                         f"choose from {','.join(BUILDS)}")
+    return builds
+
+def parse_args(argv=None):
+    """解析命令行参数，'--' 之后的参数原样传给每个构建的程序"""
+    import argparse
+    from analyze_results import CHART_NAMES
+    parser = argparse.ArgumentParser(
+        description='Run the same benchmark sweep across compiler builds and analyze the merged log',
+        epilog='arguments after -- are passed to every build, e.g. -- --repeat 3 --distributions Uniform')
+    parser.add_argument('--builds', type=parse_builds, default=BUILDS, metavar='BUILD[,BUILD...]',
+                        help=f'comma-separated builds to run (default: {",".join(BUILDS)})')
+    parser.add_argument('--bin-dir', default='..',
+                        help='directory with the sort_analysis_<build> programs; they run there and write '
+                             'results/ and data/ as usual (default: %(default)s)')
+    parser.add_argument('--rounds', type=int, default=1,
+                        help='run every build this many times, rotating the order each round (default: 1)')
+    parser.add_argument('--log', default='../results/build_matrix_log.txt',
+                        help='merged performance log (default: %(default)s)')
+    parser.add_argument('--out', default='../results/build_matrix',
+                        help='directory for charts and the report (default: %(default)s)')
+    chart_group = parser.add_mutually_exclusive_group()
+    chart_group.add_argument('--charts', nargs='+', choices=CHART_NAMES, metavar='CHART',
+                             help='render only these charts (default: all)')
+    chart_group.add_argument('--no-charts', action='store_true', help='report only')
+    parser.add_argument('--no-analysis', action='store_true', help='only write the merged log')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes used to render charts (default: CPU count)')
+    parser.add_argument('bench_args', nargs='*', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """主函数，返回进程退出码"""
+    import analyze_results as analysis
+    args = parse_args(argv)
+    charts = [] if args.no_charts else args.charts
+    if args.rounds < 1:
+        print("✗ 轮数至少为1")
+        return 1
+    if not args.no_analysis and not analysis.check_dependencies(need_charts=charts != []):
+        return 1
+
+    programs = find_programs(args.bin_dir, args.builds)
+    if len(programs) < 2:
+        print("✗ 至少需要两个构建，请先运行: make build_matrix")
+        return 1
+    print(f"✓ 构建: {', '.join(build for build, _ in programs)}; 测试参数: {' '.join(args.bench_args) or '(默认)'}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.log)), exist_ok=True)
+    total = run_matrix(programs, args.bench_args, args.log, os.path.abspath(args.bin_dir), args.rounds)
+    if total is None:
+        return 1
+    print(f"\n✓ 合并日志: {args.log} ({total} 条记录)")
+    if args.no_analysis:
+        return 0
+
+    if charts != []:
+        analysis.install_chinese_fonts()
+        analysis.setup_plot_style()
+    df = analysis.load_performance_aggregates(args.log)
+    if df.empty:
+        return 1
+    analysis.run_analysis(df, args.out, charts, n_jobs=args.jobs)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+交互式HTML报告：把聚合后的测试单元嵌入为JSON，由浏览器端过滤和绘图
+每个序列（算法、Pivot策略、分布、构建、元素类型、线程数、任务深度）一组按规模排列的列式数组；
+点数超过上限的序列按规模分桶做最小/最大值降采样，保留每个桶中最快和最慢的单元，
+因此报告大小只取决于序列数和点数上限，与日志行数无关，打开时不需要matplotlib或服务端
+"""
+
+import json
+import os
+from datetime import datetime
+
+# 每个序列嵌入的最大点数（降采样后每桶保留最小值和最大值两个点）
+DEFAULT_MAX_POINTS = 400
+DASHBOARD_FILE = 'dashboard.html'
+
+# 序列键与嵌入的数值列（JSON字段名 -> 聚合表列名），缺少的列不嵌入
+SERIES_KEYS = ['Algorithm', 'PivotStrategy', 'Distribution', 'Build', 'DType', 'Threads', 'TaskDepth']
+VALUE_FIELDS = {
+    'time': 'Time(ms)',
+    'median': 'Median',
+    'ciLow': 'CILow',
+    'ciHigh': 'CIHigh',
+    'min': 'TimeMin',
+    'max': 'TimeMax',
+    'count': 'Count',
+}
+
+def minmax_downsample(values, max_points):
+    """返回降采样后保留的下标（升序）：把点按顺序分为max_points/2个桶，每桶保留最小值和最大值
+
+    与等间隔抽样不同，尖峰和退化点（如O(n²)的pivot策略）不会被丢掉。
+    """
+    import numpy as np
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    keep = []
+    for bucket in np.array_split(np.arange(n), max(1, max_points // 2)):
+        bucket_values = values[bucket]
+        keep += [bucket[np.nanargmin(bucket_values)], bucket[np.nanargmax(bucket_values)]]
+    return np.unique(keep)
+
+def _json_values(series):
+    """把数值列转换为JSON数组，NaN写为null"""
+    import numpy as np
+    values = series.to_numpy(dtype='float64')
+    return [None if np.isnan(v) else round(float(v), 6) for v in values]
+
+def dashboard_series(df, max_points=DEFAULT_MAX_POINTS):
+    """把聚合表转换为序列列表（每个序列为按规模排序的列式数组），返回(序列列表, 降采样的序列数)"""
+    keys = [key for key in SERIES_KEYS if key in df.columns]
+    fields = {name: col for name, col in VALUE_FIELDS.items() if col in df.columns}
+    series, downsampled = [], 0
+    for key, group in df.sort_values(keys + ['Size']).groupby(keys, observed=True, sort=True):
+        group = group[group['Time(ms)'].notna()]
+        if group.empty:
+            continue
+        keep = minmax_downsample(group['Time(ms)'].to_numpy(dtype='float64'), max_points)
+        if len(keep) < len(group):
+            downsampled += 1
+            group = group.iloc[keep]
+        labels = dict(zip(keys, key if isinstance(key, tuple) else (key,)))
+        entry = {
+            'algorithm': str(labels.get('Algorithm')),
+            'pivot': str(labels.get('PivotStrategy', 'N/A')),
+            'distribution': str(labels.get('Distribution', 'Uniform')),
+            'build': str(labels.get('Build', 'unknown')),
+            'dtype': str(labels.get('DType', 'int32')),
+            'threads': int(labels.get('Threads', 0)),
+            'depth': int(labels.get('TaskDepth', 0)),
+            'size': [int(size) for size in group['Size']],
+        }
+        entry.update({name: _json_values(group[col]) for name, col in fields.items()})
+        series.append(entry)
+    return series, downsampled
+
+def write_dashboard(df, out_dir='../results', max_points=DEFAULT_MAX_POINTS, title=None):
+    """生成自包含的交互式HTML报告，返回文件路径"""
+    os.makedirs(out_dir, exist_ok=True)
+    series, downsampled = dashboard_series(df, max_points)
+    payload = {
+        'title': title or 'Sorting Algorithm Performance Dashboard',
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'cells': int(len(df)),
+        'records': int(df['Count'].sum()) if 'Count' in df.columns else int(len(df)),
+        'maxPoints': max_points,
+        'downsampled': downsampled,
+        'series': series,
+    }
+    # 防止数据中的"</"提前结束<script>标签
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    path = os.path.join(out_dir, DASHBOARD_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HTML_TEMPLATE.replace('__DASHBOARD_DATA__', data))
+    print(f"✓ 生成交互式HTML报告: {path} ({len(series)} 个序列"
+          + (f", {downsampled} 个序列降采样到 {max_points} 点以内" if downsampled else "") + ")")
+    return path
+
+HTML_TEMPLATE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Sorting Algorithm Performance Dashboard</title>
+<style>
+  body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; margin: 0; color: #222; }
+  header { padding: 12px 20px; background: #2C3E50; color: #fff; }
+  header h1 { font-size: 18px; margin: 0 0 4px 0; }
+  header .meta { font-size: 12px; opacity: 0.8; }
+  main { display: flex; }
+  aside { width: 260px; padding: 12px 16px; border-right: 1px solid #ddd; font-size: 13px; flex-shrink: 0; }
+  aside fieldset { border: 1px solid #ddd; margin: 0 0 10px 0; padding: 6px 8px; max-height: 180px; overflow-y: auto; }
+  aside legend { font-weight: bold; }
+  aside label { display: block; white-space: nowrap; }
+  aside .links { font-size: 11px; font-weight: normal; margin-left: 6px; }
+  aside .links a { cursor: pointer; color: #45B7D1; }
+  section { flex: 1; padding: 12px 20px; min-width: 0; }
+  canvas { width: 100%; height: 480px; border: 1px solid #eee; }
+  #tooltip { position: fixed; pointer-events: none; background: rgba(0,0,0,0.8); color: #fff; font-size: 12px;
+             padding: 4px 8px; border-radius: 3px; display: none; white-space: pre; }
+  table { border-collapse: collapse; font-size: 12px; margin-top: 14px; width: 100%; }
+  th, td { border-bottom: 1px solid #eee; padding: 3px 8px; text-align: right; }
+  th { cursor: pointer; background: #f7f7f7; }
+  td.label, th.label { text-align: left; }
+  .swatch { display: inline-block; width: 10px; height: 10px; margin-right: 6px; }
+</style>
+</head>
+<body>
+<header>
+  <h1 id="title"></h1>
+  <div class="meta" id="meta"></div>
+</header>
+<main>
+  <aside>
+    <fieldset><legend>View</legend>
+      <label>Metric <select id="metric">
+        <option value="time">Mean time (ms)</option>
+        <option value="median">Median time (ms)</option>
+        <option value="perElement">Mean time per element (ns)</option>
+        <option value="relative">Relative to fastest at each size</option>
+      </select></label>
+      <label><input type="checkbox" id="logY" checked> Logarithmic time axis</label>
+      <label><input type="checkbox" id="showRange"> Min/max band</label>
+    </fieldset>
+    <fieldset><legend>Size</legend>
+      <label>from <select id="sizeMin"></select></label>
+      <label>to <select id="sizeMax"></select></label>
+    </fieldset>
+    <div id="filters"></div>
+  </aside>
+  <section>
+    <canvas id="chart"></canvas>
+    <table id="summary"></table>
+  </section>
+</main>
+<div id="tooltip"></div>
+<script id="dashboard-data" type="application/json">__DASHBOARD_DATA__</script>
+<script>
+"use strict";
+const DATA = JSON.parse(document.getElementById("dashboard-data").textContent);
+const COLORS = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#F39C12", "#DDA0DD", "#2C3E50", "#E74C3C",
+                "#27AE60", "#8E44AD", "#D35400", "#16A085", "#7F8C8D", "#C0392B", "#2980B9", "#F1C40F"];
+const FILTERS = [["algorithm", "Algorithm"], ["pivot", "Pivot strategy"], ["distribution", "Distribution"],
+                 ["build", "Build"], ["dtype", "Element type"], ["threads", "Threads"]];
+const state = {};
+let sortColumn = "last", sortAscending = true, drawn = [];
+
+function label(s) {
+  const parts = [s.algorithm];
+  if (s.pivot !== "N/A") parts.push(s.pivot);
+  if (distinct("distribution").length > 1) parts.push(s.distribution);
+  if (distinct("build").length > 1) parts.push(s.build);
+  if (distinct("dtype").length > 1) parts.push(s.dtype);
+  if (distinct("threads").length > 1 || s.threads > 1) parts.push(s.threads + "T/d" + s.depth);
+  return parts.join(" / ");
+}
+function escapeHtml(text) {
+  return String(text).replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})[c]);
+}
+const distinctCache = {};
+function distinct(field) {
+  return distinctCache[field] ??= [...new Set(DATA.series.map(s => s[field]))].sort((a, b) => a < b ? -1 : a > b ? 1 : 0);
+}
+
+function buildControls() {
+  document.getElementById("title").textContent = DATA.title;
+  document.getElementById("meta").textContent = `Generated ${DATA.generated} · ${DATA.records.toLocaleString()} ` +
+    `timings in ${DATA.cells.toLocaleString()} cells · ${DATA.series.length} series` +
+    (DATA.downsampled ? ` · ${DATA.downsampled} series min/max downsampled to ≤${DATA.maxPoints} points` : "");
+  const container = document.getElementById("filters");
+  for (const [field, title] of FILTERS) {
+    const values = distinct(field);
+    state[field] = new Set(values);
+    if (values.length < 2) continue;
+    const box = document.createElement("fieldset");
+    box.innerHTML = `<legend>${title}<span class="links"><a data-all="1">all</a> · <a data-all="0">none</a></span></legend>`;
+    for (const value of values) {
+      const item = document.createElement("label");
+      const input = document.createElement("input");
+      input.type = "checkbox";
+      input.checked = true;
+      input.onchange = () => { input.checked ? state[field].add(value) : state[field].delete(value); render(); };
+      item.append(input, " " + value);
+      box.append(item);
+    }
+    box.querySelectorAll("a").forEach(a => a.onclick = () => {
+      const all = a.dataset.all === "1";
+      state[field] = new Set(all ? values : []);
+      box.querySelectorAll("input").forEach(input => input.checked = all);
+      render();
+    });
+    container.append(box);
+  }
+  const sizes = [...new Set(DATA.series.flatMap(s => s.size))].sort((a, b) => a - b);
+  for (const id of ["sizeMin", "sizeMax"]) {
+    const select = document.getElementById(id);
+    for (const size of sizes) select.add(new Option(size.toLocaleString(), size));
+    select.value = id === "sizeMin" ? sizes[0] : sizes[sizes.length - 1];
+    select.onchange = render;
+  }
+  for (const id of ["metric", "logY", "showRange"]) document.getElementById(id).onchange = render;
+}
+
+// 当前过滤条件下的序列，每个点的取值按所选指标计算
+function selectedSeries() {
+  const lo = +document.getElementById("sizeMin").value, hi = +document.getElementById("sizeMax").value;
+  const metric = document.getElementById("metric").value;
+  const chosen = DATA.series.filter(s => FILTERS.every(([field]) => state[field].has(s[field])));
+  const fastest = {};
+  if (metric === "relative") {
+    for (const s of chosen) s.size.forEach((n, i) => {
+      const key = s.distribution + "|" + n;
+      if (s.time[i] > 0) fastest[key] = Math.min(fastest[key] ?? Infinity, s.time[i]);
+    });
+  }
+  const value = (s, i, t) => {
+    if (t == null) return null;
+    if (metric === "perElement") return t * 1e6 / s.size[i];
+    if (metric === "relative") return t / fastest[s.distribution + "|" + s.size[i]];
+    return t;
+  };
+  return chosen.map((s, index) => {
+    const points = [];
+    s.size.forEach((n, i) => {
+      if (n < lo || n > hi) return;
+      const t = metric === "median" && s.median ? (s.median[i] ?? s.time[i]) : s.time[i];
+      points.push({n, y: value(s, i, t), lo: s.min ? value(s, i, s.min[i]) : null,
+                   hi: s.max ? value(s, i, s.max[i]) : null, count: s.count ? s.count[i] : null});
+    });
+    return {label: label(s), color: COLORS[index % COLORS.length], points: points.filter(p => p.y != null && p.y > 0)};
+  }).filter(s => s.points.length);
+}
+
+function niceTicks(min, max, log) {
+  if (log) {
+    const ticks = [];
+    for (let e = Math.floor(Math.log10(min)); e <= Math.ceil(Math.log10(max)); e++) ticks.push(Math.pow(10, e));
+    return ticks;
+  }
+  const step = Math.pow(10, Math.floor(Math.log10((max - min) / 5 || 1)));
+  const ticks = [];
+  for (let v = Math.ceil(min / step) * step; v <= max; v += step) ticks.push(v);
+  return ticks.length > 12 ? ticks.filter((_, i) => i % Math.ceil(ticks.length / 8) === 0) : ticks;
+}
+function format(v) {
+  return Math.abs(v) >= 1e4 || (Math.abs(v) < 1e-2 && v !== 0) ? v.toExponential(1) : +v.toPrecision(3) + "";
+}
+
+function drawChart(series) {
+  const canvas = document.getElementById("chart");
+  const ratio = window.devicePixelRatio || 1;
+  canvas.width = canvas.clientWidth * ratio;
+  canvas.height = canvas.clientHeight * ratio;
+  const ctx = canvas.getContext("2d");
+  ctx.scale(ratio, ratio);
+  const W = canvas.clientWidth, H = canvas.clientHeight, pad = {l: 70, r: 20, t: 16, b: 44};
+  ctx.clearRect(0, 0, W, H);
+  drawn = [];
+  if (!series.length) {
+    ctx.fillText("No data for the current filters", W / 2 - 80, H / 2);
+    return;
+  }
+  const logY = document.getElementById("logY").checked, band = document.getElementById("showRange").checked;
+  const xs = series.flatMap(s => s.points.map(p => p.n));
+  const ys = series.flatMap(s => s.points.flatMap(p => band ? [p.y, p.lo, p.hi] : [p.y])).filter(v => v > 0);
+  let [x0, x1] = [Math.min(...xs), Math.max(...xs)], [y0, y1] = [Math.min(...ys), Math.max(...ys)];
+  if (x0 === x1) { x0 /= 2; x1 *= 2; }
+  if (!logY) y0 = 0;
+  if (y0 === y1) { y0 /= 2; y1 *= 2; }
+  const lx = Math.log10, sx = n => pad.l + (lx(n) - lx(x0)) / (lx(x1) - lx(x0)) * (W - pad.l - pad.r);
+  const sy = v => H - pad.b - (logY ? (lx(v) - lx(y0)) / (lx(y1) - lx(y0)) : (v - y0) / (y1 - y0)) * (H - pad.t - pad.b);
+
+  ctx.strokeStyle = "#eee"; ctx.fillStyle = "#555"; ctx.font = "11px sans-serif";
+  for (const t of niceTicks(y0, y1, logY)) {
+    if (t < y0 || t > y1) continue;
+    ctx.beginPath(); ctx.moveTo(pad.l, sy(t)); ctx.lineTo(W - pad.r, sy(t)); ctx.stroke();
+    ctx.fillText(format(t), 8, sy(t) + 4);
+  }
+  for (const t of niceTicks(x0, x1, true)) {
+    if (t < x0 || t > x1) continue;
+    ctx.beginPath(); ctx.moveTo(sx(t), pad.t); ctx.lineTo(sx(t), H - pad.b); ctx.stroke();
+    ctx.fillText(format(t), sx(t) - 10, H - pad.b + 16);
+  }
+  ctx.fillText("Data size (log scale)", W / 2 - 50, H - 8);
+  ctx.fillText(document.getElementById("metric").selectedOptions[0].text, pad.l + 4, pad.t + 4);
+
+  for (const s of series) {
+    if (band) {
+      const edge = s.points.filter(p => p.lo > 0 && p.hi > 0);
+      if (edge.length) {
+        ctx.globalAlpha = 0.15; ctx.fillStyle = s.color; ctx.beginPath();
+        edge.forEach((p, i) => i ? ctx.lineTo(sx(p.n), sy(p.hi)) : ctx.moveTo(sx(p.n), sy(p.hi)));
+        [...edge].reverse().forEach(p => ctx.lineTo(sx(p.n), sy(p.lo)));
+        ctx.fill(); ctx.globalAlpha = 1;
+      }
+    }
+    ctx.strokeStyle = s.color; ctx.fillStyle = s.color; ctx.lineWidth = 1.5; ctx.beginPath();
+    s.points.forEach((p, i) => i ? ctx.lineTo(sx(p.n), sy(p.y)) : ctx.moveTo(sx(p.n), sy(p.y)));
+    ctx.stroke();
+    for (const p of s.points) {
+      ctx.beginPath(); ctx.arc(sx(p.n), sy(p.y), 2.5, 0, 2 * Math.PI); ctx.fill();
+      drawn.push({x: sx(p.n), y: sy(p.y), s, p});
+    }
+  }
+}
+
+function drawTable(series) {
+  const rows = series.map(s => {
+    const last = s.points[s.points.length - 1];
+    const mean = Math.exp(s.points.reduce((acc, p) => acc + Math.log(p.y), 0) / s.points.length);
+    return {label: s.label, color: s.color, points: s.points.length, size: last.n, last: last.y, mean};
+  });
+  rows.sort((a, b) => (sortColumn === "label" ? a.label.localeCompare(b.label) : a[sortColumn] - b[sortColumn])
+                      * (sortAscending ? 1 : -1));
+  const columns = [["label", "Series"], ["points", "Points"], ["mean", "Geometric mean"], ["size", "Largest size"],
+                   ["last", "At largest size"]];
+  const table = document.getElementById("summary");
+  table.innerHTML = "<tr>" + columns.map(([key, title]) =>
+    `<th class="${key === "label" ? "label" : ""}" data-key="${key}">${title}${key === sortColumn ? (sortAscending ? " ▲" : " ▼") : ""}</th>`
+  ).join("") + "</tr>" + rows.map(r =>
+    `<tr><td class="label"><span class="swatch" style="background:${r.color}"></span>${escapeHtml(r.label)}</td>` +
+    `<td>${r.points}</td><td>${format(r.mean)}</td><td>${r.size.toLocaleString()}</td><td>${format(r.last)}</td></tr>`
+  ).join("");
+  table.querySelectorAll("th").forEach(th => th.onclick = () => {
+    sortAscending = th.dataset.key === sortColumn ? !sortAscending : true;
+    sortColumn = th.dataset.key;
+    render();
+  });
+}
+
+function render() {
+  const series = selectedSeries();
+  drawChart(series);
+  drawTable(series);
+}
+
+const tooltip = document.getElementById("tooltip");
+document.getElementById("chart").addEventListener("mousemove", event => {
+  const rect = event.target.getBoundingClientRect(), x = event.clientX - rect.left, y = event.clientY - rect.top;
+  let best = null, bestDistance = 100;
+  for (const d of drawn) {
+    const distance = (d.x - x) ** 2 + (d.y - y) ** 2;
+    if (distance < bestDistance) { best = d; bestDistance = distance; }
+  }
+  if (!best) { tooltip.style.display = "none"; return; }
+  tooltip.textContent = `${best.s.label}\nsize ${best.p.n.toLocaleString()}: ${format(best.p.y)}` +
+    (best.p.lo != null ? `\nmin ${format(best.p.lo)}, max ${format(best.p.hi)}` : "") +
+    (best.p.count != null ? `\n${best.p.count} timings` : "");
+  tooltip.style.left = event.clientX + 12 + "px";
+  tooltip.style.top = event.clientY + 12 + "px";
+  tooltip.style.display = "block";
+});
+document.getElementById("chart").addEventListener("mouseleave", () => tooltip.style.display = "none");
+window.addEventListener("resize", render);
+buildControls();
+render();
+</script>
+</body>
+</html>
+"""
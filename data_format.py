@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+二进制测试数据格式读写（与 test_data.h 中的 TestDataHeader 对应）
+文件布局: 32字节小端序文件头 + count个定长元素，元素部分可用 numpy.memmap 零拷贝加载
+"""
+
+import os
+import sys
+
+import numpy as np
+
+MAGIC = 0x44545253          # 文件前4个字节为 "SRTD"
+VERSION = 1
+
+# 文件头布局，必须与C端结构体保持一致
+HEADER_DTYPE = np.dtype([
+    ('magic', '<u4'),
+    ('version', '<u2'),
+    ('dtype', '<u2'),
+    ('count', '<u8'),
+    ('seed', '<u8'),
+    ('distribution', '<u4'),
+    ('reserved', '<u4'),
+])
+assert HEADER_DTYPE.itemsize == 32
+
+# 元素类型代码 -> numpy dtype
+DTYPES = {
+    1: np.dtype('<i4'),
+}
+
+# 数据分布代码 -> 名称
+DISTRIBUTIONS = {
+    0: 'Uniform',
+    1: 'Sorted',
+    2: 'Reversed',
+    3: 'FewUnique',
+    4: 'NearlySorted',
+    5: 'OrganPipe',
+    6: 'Zipf',
+}
+
+def read_header(path):
+    """读取并校验文件头，返回字段字典"""
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_DTYPE.itemsize)
+    if len(raw) != HEADER_DTYPE.itemsize:
+        raise ValueError(f"{path}: 文件太短，不是二进制测试数据")
+    header = np.frombuffer(raw, dtype=HEADER_DTYPE)[0]
+    if header['magic'] != MAGIC:
+        raise ValueError(f"{path}: 魔数不匹配")
+    if header['version'] != VERSION:
+        raise ValueError(f"{path}: 不支持的格式版本 {header['version']}")
+    if int(header['dtype']) not in DTYPES:
+        raise ValueError(f"{path}: 未知的元素类型 {header['dtype']}")
+    fields = {name: int(header[name]) for name in HEADER_DTYPE.names}
+    fields['distribution_name'] = DISTRIBUTIONS.get(fields['distribution'], 'unknown')
+    return fields
+
+def load_test_data(path, mode='r'):
+    """零拷贝加载测试数据，返回(文件头字典, numpy.memmap)"""
+    header = read_header(path)
+    dtype = DTYPES[header['dtype']]
+    expected = HEADER_DTYPE.itemsize + header['count'] * dtype.itemsize
+    if os.path.getsize(path) < expected:
+        raise ValueError(f"{path}: 文件被截断，应至少 {expected} 字节")
+    data = np.memmap(path, dtype=dtype, mode=mode,
+                     offset=HEADER_DTYPE.itemsize, shape=(header['count'],))
+    return header, data
+
+def write_test_data(path, values, seed=0, distribution=0):
+    """把一维数组写成二进制测试数据文件"""
+    values = np.asarray(values)
+    codes = [code for code, dt in DTYPES.items() if values.dtype == dt]
+    if not codes:
+        raise ValueError(f"不支持的元素类型: {values.dtype}")
+    dtype_code = codes[0]
+    values = np.ascontiguousarray(values, dtype=DTYPES[dtype_code])
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['dtype'] = dtype_code
+    header['count'] = len(values)
+    header['seed'] = seed
+    header['distribution'] = distribution
+    with open(path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(values.tobytes())
+
+def export_text(path, out_path):
+    """把二进制测试数据导出为文本格式（每行一个整数）"""
+    _, data = load_test_data(path)
+    np.savetxt(out_path, data, fmt='%d')
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("用法: python3 data_format.py <test_data.bin> [导出的文本文件]")
+        sys.exit(1)
+    header, data = load_test_data(sys.argv[1])
+    print(f"元素个数: {header['count']}, 类型: {data.dtype}, 种子: {header['seed']}, "
+          f"分布: {header['distribution_name']}")
+    print(f"前10个元素: {data[:10].tolist()}")
+    if len(sys.argv) == 3:
+        export_text(sys.argv[1], sys.argv[2])
+        print(f"✓ 已导出文本格式: {sys.argv[2]}")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+跨运行历史记录：把每次运行的聚合结果追加到本地SQLite数据库（只用标准库sqlite3）
+每个测试单元每次运行一行（平均时间、中位数及置信区间、最快/最慢时间、计时次数），
+run_ts冗余存储在单元表中，(algorithm, pivot, size, run_ts)索引使单个单元的趋势查询只需毫秒级
+
+analyze_results.py --record-history 分析日志时记录（同一次运行重复分析时覆盖），也可以手动导入:
+    python history_store.py record --log ../results/performance_log.txt
+    python history_store.py query --algorithm "Quick Sort (Iterative)" --pivot Median3 --size 100000 --days 90 --period week
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+DEFAULT_HISTORY_DB = '../results/history.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    run_ts TEXT NOT NULL,
+    commit_id TEXT,
+    opt_level TEXT,
+    cpu_model TEXT,
+    host TEXT,
+    source_log TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS cells (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    run_ts TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    pivot TEXT NOT NULL,
+    distribution TEXT NOT NULL,
+    build TEXT NOT NULL,
+    dtype TEXT NOT NULL DEFAULT 'int32',
+    threads INTEGER NOT NULL,
+    task_depth INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    samples INTEGER,
+    mean_ms REAL,
+    median_ms REAL,
+    ci_low_ms REAL,
+    ci_high_ms REAL,
+    min_ms REAL,
+    max_ms REAL,
+    PRIMARY KEY (run_id, algorithm, pivot, distribution, build, dtype, threads, task_depth, size)
+);
+CREATE INDEX IF NOT EXISTS idx_cells_trend ON cells (algorithm, pivot, size, run_ts);
+CREATE INDEX IF NOT EXISTS idx_runs_ts ON runs (run_ts);
+"""
+SCHEMA_STATEMENTS = [statement.strip() for statement in SCHEMA.split(';') if statement.strip()]
+# 数据库格式版本（PRAGMA user_version）：1 = 单元表增加元素类型列dtype
+SCHEMA_VERSION = 1
+
+# 聚合表列 -> 单元表列
+CELL_COLUMNS = {
+    'Algorithm': 'algorithm',
+    'PivotStrategy': 'pivot',
+    'Distribution': 'distribution',
+    'Build': 'build',
+    'DType': 'dtype',
+    'Threads': 'threads',
+    'TaskDepth': 'task_depth',
+    'Size': 'size',
+    'Count': 'samples',
+    'Time(ms)': 'mean_ms',
+    'Median': 'median_ms',
+    'CILow': 'ci_low_ms',
+    'CIHigh': 'ci_high_ms',
+    'TimeMin': 'min_ms',
+    'TimeMax': 'max_ms',
+}
+
+def _migrate(conn):
+    """把旧格式的数据库升级到SCHEMA_VERSION（旧数据库中的单元都是int32）
+
+    所有DDL和user_version在同一个事务中执行（executescript会先提交当前事务，这里逐条execute），
+    升级中途失败时整体回滚，数据库保持旧格式和旧版本号。
+    """
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(cells)')]
+    conn.execute('BEGIN')
+    with conn:
+        if version < 1 and 'cells' in tables:
+            # 主键改变，SQLite不能直接修改：重命名旧表，按新格式建表后复制
+            conn.execute('DROP INDEX IF EXISTS idx_cells_trend')
+            conn.execute('ALTER TABLE cells RENAME TO cells_v0')
+            for statement in SCHEMA_STATEMENTS:
+                conn.execute(statement)
+            conn.execute(f"INSERT INTO cells ({', '.join(columns)}) SELECT {', '.join(columns)} FROM cells_v0")
+            conn.execute('DROP TABLE cells_v0')
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+def connect(db_path=DEFAULT_HISTORY_DB):
+    """打开（必要时创建或升级）历史数据库"""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    _migrate(conn)
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+def record_run(conn, agg, metadata):
+    """把一次运行的聚合表写入历史（同一run_id已存在时先删除），返回写入的单元数"""
+    import pandas as pd
+    run_ts = metadata['started_at']
+    cells = agg[[col for col in CELL_COLUMNS if col in agg.columns]].rename(columns=CELL_COLUMNS)
+    cells = cells.astype({col: str for col in ('algorithm', 'pivot', 'distribution', 'build', 'dtype') if col in cells})
+    cells = cells.assign(run_id=metadata['run_id'], run_ts=run_ts)
+    columns = list(cells.columns)
+    # pandas的NaN写为SQL NULL
+    rows = [tuple(None if pd.isna(v) else v.item() if hasattr(v, 'item') else v for v in row)
+            for row in cells.itertuples(index=False, name=None)]
+    with conn:
+        conn.execute('DELETE FROM runs WHERE run_id = ?', (metadata['run_id'],))
+        conn.execute('INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                     (metadata['run_id'], run_ts, metadata.get('commit'), metadata.get('opt_level'),
+                      metadata.get('cpu_model'), metadata.get('host'), metadata.get('source_log'),
+                      json.dumps(metadata)))
+        conn.executemany(f"INSERT INTO cells ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows)
+    return len(rows)
+
+def record_log(log_file, db_path=DEFAULT_HISTORY_DB, agg=None, metadata_file=None):
+    """把性能日志（含日志分片）记录为一次运行，agg为已聚合的结果（None时读取日志），返回(单元数, 元数据)"""
+    from results_store import collect_run_metadata
+    if agg is None:
+        from analyze_results import load_performance_aggregates
+        agg = load_performance_aggregates(log_file)
+    metadata = collect_run_metadata(log_file, metadata_file)
+    conn = connect(db_path)
+    try:
+        return record_run(conn, agg, metadata), metadata
+    finally:
+        conn.close()
+
+# 趋势查询的时间段 -> strftime格式（run：每次运行一段）
+PERIOD_FORMATS = {
+    'run': '%Y-%m-%dT%H:%M:%S',
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m',
+}
+# 同一时间段内区分的序列（算法、pivot和规模由查询条件固定）
+SERIES_COLUMNS = 'distribution, build, dtype, threads, task_depth'
+
+def query_cell(conn, algorithm, pivot, size, distribution=None, build=None, since=None, last_runs=None, dtype=None,
+               period='day'):
+    """查询一个单元（算法, Pivot策略, 规模）每个时间段的中位数时间，可按分布、构建、元素类型、起始时间和最近N次运行过滤
+
+    每次运行取该单元的中位数（旧记录没有中位数时取平均时间），在SQL中按时间段和序列（分布、构建、元素类型、
+    线程数、任务深度）求这些值的中位数、最小值和最大值，返回按时间段排序的sqlite3.Row列表；
+    只用标准库，命令行查询不需要导入pandas。
+    """
+    where = 'algorithm = ? AND pivot = ? AND size = ?'
+    params = [algorithm, pivot, int(size)]
+    for column, value in (('distribution', distribution), ('build', build), ('dtype', dtype)):
+        if value is not None:
+            where += f' AND {column} = ?'
+            params.append(value)
+    if since is not None:
+        where += ' AND run_ts >= ?'
+        params.append(since)
+    if last_runs is not None:
+        where += ' AND run_id IN (SELECT run_id FROM runs ORDER BY run_ts DESC LIMIT ?)'
+        params.append(int(last_runs))
+    window = f'PARTITION BY period, {SERIES_COLUMNS}'
+    # SQLite没有中位数聚合：按值排序编号，取中间的一行（偶数个时取中间两行的平均）
+    sql = f"""
+        WITH run_values AS (
+            SELECT strftime(?, run_ts) AS period, {SERIES_COLUMNS}, samples,
+                   COALESCE(median_ms, mean_ms) AS value
+            FROM cells WHERE {where}
+        ), ranked AS (
+            SELECT *, ROW_NUMBER() OVER ({window} ORDER BY value) AS position,
+                   COUNT(*) OVER ({window}) AS runs,
+                   MIN(value) OVER ({window}) AS min_ms,
+                   MAX(value) OVER ({window}) AS max_ms,
+                   SUM(samples) OVER ({window}) AS samples_total
+            FROM run_values WHERE value IS NOT NULL
+        )
+        SELECT period, {SERIES_COLUMNS}, runs, AVG(value) AS median_ms, min_ms, max_ms, samples_total AS samples
+        FROM ranked WHERE position IN ((runs + 1) / 2, (runs + 2) / 2)
+        GROUP BY period, {SERIES_COLUMNS}
+        ORDER BY period, {SERIES_COLUMNS}
+    """
+    cursor = conn.execute(sql, [PERIOD_FORMATS[period]] + params)
+    cursor.row_factory = sqlite3.Row
+    return cursor.fetchall()
+
+def load_recent_cells(conn, last_runs=20):
+    """读取最近last_runs次运行的所有单元，按时间排序"""
+    import pandas as pd
+    sql = ('SELECT * FROM cells WHERE run_id IN '
+           '(SELECT run_id FROM runs ORDER BY run_ts DESC LIMIT ?) ORDER BY run_ts')
+    return pd.read_sql_query(sql, conn, params=[int(last_runs)])
+
+def list_runs(conn):
+    """列出所有运行（按时间排序）及其单元数"""
+    import pandas as pd
+    return pd.read_sql_query(
+        'SELECT r.run_id, r.run_ts, r.commit_id, r.opt_level, r.cpu_model, COUNT(c.size) AS cells '
+        'FROM runs r LEFT JOIN cells c USING (run_id) GROUP BY r.run_id ORDER BY r.run_ts', conn)
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    import argparse
+    parser = argparse.ArgumentParser(description='SQLite history of sorting benchmark runs')
+    parser.add_argument('--db', default=DEFAULT_HISTORY_DB, help='history database (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help='record a performance log (and its shards) as one run')
+    record_parser.add_argument('--log', default='../results/performance_log.txt',
+                               help='performance log to record (default: %(default)s)')
+    record_parser.add_argument('--metadata', default=None,
+                               help='run metadata written by sort_analysis (default: run_metadata.txt next to the log)')
+    commands.add_parser('runs', help='list recorded runs')
+    query_parser = commands.add_parser('query', help='time series of one cell')
+    query_parser.add_argument('--algorithm', required=True)
+    query_parser.add_argument('--pivot', default='N/A')
+    query_parser.add_argument('--size', type=int, required=True)
+    query_parser.add_argument('--distribution', default=None)
+    query_parser.add_argument('--build', default=None)
+    query_parser.add_argument('--dtype', default=None, help='element type (default: all)')
+    query_parser.add_argument('--days', type=int, default=None, help='only runs in the last N days')
+    query_parser.add_argument('--last', type=int, default=None, help='only the last N runs')
+    query_parser.add_argument('--period', choices=list(PERIOD_FORMATS), default='day',
+                              help='median over the runs of each period (default: %(default)s)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """主函数，返回进程退出码"""
+    import time
+    args = parse_args(argv)
+    if args.command == 'record':
+        if not os.path.exists(args.log):
+            print(f"✗ 找不到性能日志: {args.log}")
+            return 1
+        cells, metadata = record_log(args.log, args.db, metadata_file=args.metadata)
+        print(f"✓ 记录运行 {metadata['run_id']}: {cells} 个单元 -> {args.db}")
+        return 0
+    if not os.path.exists(args.db):
+        print(f"✗ 历史数据库不存在: {args.db}")
+        return 1
+    conn = connect(args.db)
+    try:
+        if args.command == 'runs':
+            runs = list_runs(conn)
+            for row in runs.itertuples():
+                print(f"{row.run_id:<32} {row.run_ts}  {str(row.opt_level):<8} {str(row.commit_id):<14} "
+                      f"{row.cells:>6} cells")
+            print(f"共 {len(runs)} 次运行")
+            return 0
+        since = (datetime.now() - timedelta(days=args.days)).strftime('%Y-%m-%dT%H:%M:%S') if args.days else None
+        start = time.perf_counter()
+        history = query_cell(conn, args.algorithm, args.pivot, args.size, args.distribution, args.build,
+                             since, args.last, args.dtype, args.period)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for row in history:
+            print(f"{row['period']:<19} {row['distribution']:<13} {row['build']:<18} {row['dtype']:<8} "
+                  f"{row['threads']:>3}T  median {row['median_ms']:>10.3f} ms  "
+                  f"[{row['min_ms']:.3f}, {row['max_ms']:.3f}]  ({row['runs']} runs)")
+        print(f"共 {len(history)} 条记录（按{args.period}汇总），查询耗时 {elapsed_ms:.2f} ms")
+        return 0
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,32 +4,74 @@
 帮助解决matplotlib中文显示问题
 """
 
-import matplotlib
-import matplotlib.font_manager as fm
+import json
 import os
 import sys
 
+# 中文字体名称关键字
+CHINESE_FONT_KEYWORDS = ['SimHei', 'Microsoft', 'YaHei', 'Kai', 'Song', 'Hei', 'Fang', 'Li', 'YouYuan', 'SimSun']
+
+# 字体查找结果缓存文件（位于matplotlib缓存目录中）
+FONT_CACHE_FILE = 'sort_analysis_chinese_fonts.json'
+
+def _font_cache_key(cachedir):
+    """缓存键：matplotlib版本 + 其字体列表缓存文件的修改时间（字体列表重建后自动失效）"""
+    import matplotlib
+    fontlists = sorted(
+        [name, os.path.getmtime(os.path.join(cachedir, name))]
+        for name in os.listdir(cachedir)
+        if name.startswith('fontlist-') and name.endswith('.json')
+    ) if os.path.isdir(cachedir) else []
+    return [matplotlib.__version__, fontlists]
+
+def find_chinese_fonts(use_cache=True):
+    """查找matplotlib可用的中文字体，结果缓存在磁盘上，避免每次扫描字体列表"""
+    import matplotlib
+    cachedir = matplotlib.get_cachedir()
+    cache_path = os.path.join(cachedir, FONT_CACHE_FILE)
+    
+    if use_cache:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('key') == _font_cache_key(cachedir):
+                return cached['fonts']
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    import matplotlib.font_manager as fm
+    chinese_fonts = []
+    for font in fm.fontManager.ttflist:
+        for keyword in CHINESE_FONT_KEYWORDS:
+            if keyword.lower() in font.name.lower():
+                chinese_fonts.append(font.name)
+                break
+    chinese_fonts = sorted(set(chinese_fonts))
+    
+    # 导入font_manager后字体列表缓存一定已存在，此时再计算缓存键
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': _font_cache_key(cachedir), 'fonts': chinese_fonts}, f)
+    except OSError:
+        pass
+    
+    return chinese_fonts
+
 def check_current_fonts():
     """检查当前可用的字体"""
+    import matplotlib.font_manager as fm
     print("=== 检查当前字体 ===")
     
     # 获取所有字体
     fonts = [f.name for f in fm.fontManager.ttflist]
     print(f"系统中可用的字体数量: {len(fonts)}")
     
-    # 查找中文字体
-    chinese_keywords = ['SimHei', 'Microsoft', 'YaHei', 'Kai', 'Song', 'Hei', 'Fang', 'Li', 'YouYuan', 'SimSun']
-    chinese_fonts = []
-    
-    for font in fonts:
-        for keyword in chinese_keywords:
-            if keyword.lower() in font.lower():
-                chinese_fonts.append(font)
-                break
+    # 查找中文字体（同时刷新分析脚本使用的字体缓存）
+    chinese_fonts = find_chinese_fonts(use_cache=False)
     
     if chinese_fonts:
         print("✓ 发现以下中文字体:")
-        for font in sorted(set(chinese_fonts))[:10]:  # 显示前10个
+        for font in chinese_fonts[:10]:  # 显示前10个
             print(f"  - {font}")
     else:
         print("✗ 未发现中文字体")
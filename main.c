@@ -1,121 +1,768 @@
+#define _GNU_SOURCE   // sched_setaffinity / CPU_SET
 #include "sort_algorithms.h"
 #include "test_data.h"
-#include <sys/time.h>
+#include "perf_counters.h"
+#include <time.h>
+#include <math.h>
 #include <string.h>
+#include <unistd.h>
+#include <glob.h>
+#include <sched.h>
+#include <sys/mman.h>
+#include <sys/wait.h>
 
-// 获取当前时间（微秒）
+// 性能日志文件路径与表头
+#define PERFORMANCE_LOG "results/performance_log.txt"
+#define PERFORMANCE_LOG_HEADER "Algorithm,PivotStrategy,Size,Time(ms),Sorted,Repeat,Distribution,Threads,TaskDepth,AuxBytes,Cycles,Instructions,BranchMisses,LLCMisses,MaxRSSKB,Build,Batch,TimedOut,DType"
+
+// 本次运行的元数据（key=value，每行一项），导入列式结果存储时使用
+#define RUN_METADATA_FILE "results/run_metadata.txt"
+
+// 编译参数（由Makefile通过-D传入，直接用gcc编译时未知）
+#ifndef BUILD_CFLAGS
+#define BUILD_CFLAGS "unknown"
+#endif
+#ifndef BUILD_OPT_LEVEL
+#ifdef __OPTIMIZE__
+#define BUILD_OPT_LEVEL "unknown"
+#else
+#define BUILD_OPT_LEVEL "-O0"
+#endif
+#endif
+// 构建配置标签，写入日志的Build列（编译器变体矩阵中区分各个程序，如 "-O3"、"-O2 -flto"）
+#ifndef BUILD_TAG
+#define BUILD_TAG BUILD_OPT_LEVEL
+#endif
+
+// 工作进程的日志分片：results/performance_log.shard<N>.txt（分析脚本自动合并）
+#define PERFORMANCE_LOG_SHARD_FORMAT "results/performance_log.shard%d.txt"
+#define PERFORMANCE_LOG_SHARD_GLOB "results/performance_log.shard*.txt"
+
+// 线程数/任务深度扫描列表的最大长度
+#define MAX_SWEEP 16
+
+// 并行调度的最大工作进程数
+#define MAX_JOBS 256
+
+// 基准测试配置（由命令行参数设置）
+typedef struct {
+    int warmup;      // 每个测试单元的预热次数（不计时、不记录）
+    int repeat;      // 每个测试单元的正式计时次数
+    int text_data;   // 是否同时导出文本格式的测试数据
+    int distribution_enabled[DIST_COUNT];  // 要测试的数据分布
+    int threads[MAX_SWEEP];      // 并行归并排序扫描的线程数（0个表示只用默认线程数）
+    int num_threads;
+    int task_depths[MAX_SWEEP];  // 并行归并排序扫描的任务深度上限（0个表示自动）
+    int num_task_depths;
+    int weak_base;   // 弱扩展测试中每个线程的元素个数（0表示不做弱扩展测试）
+    int counters;    // 是否测量硬件计数器和峰值RSS（未启用时这些列写-1）
+    int jobs;        // 串行测试单元（快速排序）的并行工作进程数，1为在主进程中顺序执行
+    int adaptive;          // 自适应计时：批量排序、按置信区间决定计时次数、单元限时（repeat为最少计时次数）
+    double min_time_ms;    // 自适应模式下一个样本的最短时间，单次排序更快时批量排序多份拷贝
+    double ci_target;      // 自适应模式下均值95%置信区间半宽的目标（相对均值）
+    int max_repeat;        // 自适应模式下每个单元的最多计时次数
+    double time_limit_s;   // 自适应模式下每个单元的时间上限（秒）
+    ElementType dtypes[ELEMENT_TYPE_COUNT];  // 要测试的元素类型（0个表示只测试int32）
+    int num_dtypes;
+} BenchConfig;
+
+static BenchConfig bench_config = {1, 5, 0, {0}, {0}, 0, {0}, 0, 0, 0, 1, 0, 1.0, 0.02, 100, 10.0, {0}, 0};
+
+// 测试规模
+static const int benchmark_sizes[] = {1000, 5000, 10000, 50000, 100000};
+#define NUM_BENCHMARK_SIZES ((int)(sizeof(benchmark_sizes) / sizeof(benchmark_sizes[0])))
+
+// size是否为常规测试规模之一
+static int is_benchmark_size(int size) {
+    for (int i = 0; i < NUM_BENCHMARK_SIZES; i++) {
+        if (benchmark_sizes[i] == size) return 1;
+    }
+    return 0;
+}
+
+// 所有pivot策略
+static const PivotStrategy all_strategies[] = {
+    PIVOT_FIRST, PIVOT_LAST, PIVOT_MIDDLE, 
+    PIVOT_RANDOM, PIVOT_MEDIAN_OF_THREE,
+    PIVOT_NINTHER, PIVOT_THREE_WAY, PIVOT_INTROSORT
+};
+#define NUM_STRATEGIES ((int)(sizeof(all_strategies) / sizeof(all_strategies[0])))
+
+// 快速排序的两种实现（串行测试单元，可以分给不同的工作进程）
+typedef struct {
+    const char* name;
+    int iterative;   // 使用SortKernels中的非递归实现
+} QuickSortVariant;
+
+static const QuickSortVariant quick_sort_variants[] = {
+    {"Quick Sort (Recursive)", 0},
+    {"Quick Sort (Iterative)", 1}
+};
+#define NUM_QUICK_SORT_VARIANTS ((int)(sizeof(quick_sort_variants) / sizeof(quick_sort_variants[0])))
+
+// 当前进程写入的性能日志（工作进程写各自的分片）
+static const char* current_log_path = PERFORMANCE_LOG;
+
+// 当前正在测试的数据分布（写入日志的Distribution列）
+static const char* current_distribution = "Uniform";
+
+// 当前测试使用的线程数和任务深度上限（写入日志的Threads、TaskDepth列，串行算法为1和0）
+static int current_threads = 1;
+static int current_task_depth = 0;
+
+// 当前测试的元素类型及其排序内核（名称写入日志的DType列）
+static ElementType current_dtype = ELEMENT_INT32;
+static const SortKernels* current_kernels = NULL;
+
+// 获取当前时间（微秒，单调时钟，不受系统时间调整影响）
 double get_current_time() {
-    struct timeval tv;
-    gettimeofday(&tv, NULL);
-    return (double)tv.tv_sec * 1000000 + (double)tv.tv_usec;
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec * 1000000 + (double)ts.tv_nsec / 1000.0;
 }
 
-// 排序算法测试函数
-void test_sort_algorithm(const char* name, 
-                        SortError (*sort_func)(int[], int, int, PivotStrategy), 
-                        int arr[], int n, int* original, 
-                        PivotStrategy strategy) {
-    if (arr == NULL || original == NULL || name == NULL) {
-        printf("错误: 测试参数为空指针\n");
-        return;
+// 计算计时结果的中位数（会对times原地排序，n很小，使用插入排序）
+static double median_time(double times[], int n) {
+    for (int i = 1; i < n; i++) {
+        double key = times[i];
+        int j = i - 1;
+        while (j >= 0 && times[j] > key) {
+            times[j + 1] = times[j];
+            j--;
+        }
+        times[j + 1] = key;
     }
-    
-    // 复制原始数据
-    int* test_arr = (int*)malloc(n * sizeof(int));
-    if (test_arr == NULL) {
-        printf("错误: 无法为测试数组分配内存\n");
-        return;
+    return (n % 2) ? times[n / 2] : (times[n / 2 - 1] + times[n / 2]) / 2.0;
+}
+
+// 记录一次计时结果到性能日志文件
+static void log_result(const char* name, const char* strategy_name, int n,
+                       double elapsed_time, int sorted, int repeat, size_t aux_bytes,
+                       const PerfSample* perf, int batch, int timed_out) {
+    FILE* log_file = fopen(current_log_path, "a");
+    if (log_file) {
+        fprintf(log_file, "%s,%s,%d,%.*f,%d,%d,%s,%d,%d,%zu,%lld,%lld,%lld,%lld,%ld,%s,%d,%d,%s\n", 
+                name, strategy_name, n, batch > 1 ? 6 : 3, elapsed_time, sorted, repeat, current_distribution,
+                current_threads, current_task_depth, aux_bytes,
+                perf->counters[PERF_COUNTER_CYCLES], perf->counters[PERF_COUNTER_INSTRUCTIONS],
+                perf->counters[PERF_COUNTER_BRANCH_MISSES], perf->counters[PERF_COUNTER_LLC_MISSES],
+                perf->max_rss_kb, BUILD_TAG, batch, timed_out, current_kernels->name);
+        fclose(log_file);
     }
-    
-    SortError copy_error = copy_array(test_arr, original, n);
-    if (copy_error != SORT_SUCCESS) {
-        printf("错误: 复制数组失败\n");
-        free(test_arr);
-        return;
+}
+
+// 启用测量时在计时区间外层启动计数器（ioctl开销不计入计时）
+static void measure_begin(void) {
+    if (bench_config.counters) perf_counters_start();
+}
+
+static void measure_end(PerfSample* perf) {
+    if (bench_config.counters) perf_counters_stop(perf);
+    else perf_sample_clear(perf);
+}
+
+// 自适应计时：批量排序缓冲区的上限（字节），95%置信区间的t分布分位数（自由度1-30）
+#define MAX_BATCH_BYTES ((size_t)64 << 20)
+static const double t_quantile_975[] = {
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042
+};
+
+static double t_quantile(int df) {
+    if (df <= 30) return t_quantile_975[df - 1];
+    return df <= 60 ? 2.000 : (df <= 120 ? 1.980 : 1.960);
+}
+
+// 样本均值95%置信区间的半宽相对均值的比例（样本数少于2时返回无穷大）
+static double relative_ci_half_width(const double times[], int n) {
+    if (n < 2) return INFINITY;
+    double mean = 0.0;
+    for (int i = 0; i < n; i++) mean += times[i];
+    mean /= n;
+    if (mean <= 0.0) return INFINITY;
+    double variance = 0.0;
+    for (int i = 0; i < n; i++) variance += (times[i] - mean) * (times[i] - mean);
+    variance /= n - 1;
+    return t_quantile(n - 1) * sqrt(variance / n) / mean;
+}
+
+// 一次排序调用：快速排序（pivot策略）、归并排序（任务深度）或基数/样本排序，数组元素类型由kernels决定
+typedef struct {
+    QuickSortFunc quick_sort;
+    MergeSortFunc merge_sort;
+    RangeSortFunc range_sort;
+    PivotStrategy strategy;
+    int task_depth;
+    const SortKernels* kernels;
+} SortCall;
+
+static SortError run_sort_call(const SortCall* call, void* arr, int n) {
+    if (call->quick_sort) return call->quick_sort(arr, 0, n - 1, call->strategy);
+    if (call->merge_sort) return call->merge_sort(arr, 0, n - 1, call->task_depth);
+    return call->range_sort(arr, 0, n - 1);
+}
+
+// 一个计时样本：batch次排序的平均时间，全部排序成功时sorted为1，计数器为每次排序的平均值
+typedef struct {
+    double time_ms;
+    int sorted;
+    size_t aux_bytes;
+    PerfSample perf;
+} CellSample;
+
+// 对batch份原始数据的拷贝依次排序（拷贝在计时区间之外完成），返回整批耗时（毫秒）；
+// 排序出错时设置*sort_error并停止这一批，调用方据此结束测量
+static double time_batch(const SortCall* call, char buffer[], int batch, int n, const void* original,
+                         CellSample* sample, SortError* sort_error) {
+    size_t bytes = (size_t)n * call->kernels->element_size;
+    for (int b = 0; b < batch; b++) {
+        memcpy(buffer + (size_t)b * bytes, original, bytes);
     }
     
-    // 测量排序时间
+    // 测量排序时间（辅助内存统计和硬件计数器在计时区间之外重置和读取）
+    sort_memory_reset();
+    measure_begin();
     double start_time = get_current_time();
-    SortError sort_error = sort_func(test_arr, 0, n - 1, strategy);
+    for (int b = 0; b < batch && *sort_error == SORT_SUCCESS; b++) {
+        *sort_error = run_sort_call(call, buffer + (size_t)b * bytes, n);
+    }
     double end_time = get_current_time();
+    measure_end(&sample->perf);
+    sample->aux_bytes = sort_memory_peak();
     
     double elapsed_time = (end_time - start_time) / 1000.0; // 转换为毫秒
+    sample->time_ms = elapsed_time / batch;
+    for (int c = 0; c < PERF_COUNTER_COUNT; c++) {
+        if (sample->perf.counters[c] > 0) sample->perf.counters[c] /= batch;
+    }
     
     // 验证排序结果
-    int sorted = (sort_error == SORT_SUCCESS) ? is_sorted(test_arr, n) : 0;
-    
-    // 获取pivot策略名称
-    const char* strategy_name = pivot_strategy_name(strategy);
-    
-    // 输出结果
+    sample->sorted = (*sort_error == SORT_SUCCESS);
+    for (int b = 0; b < batch && sample->sorted; b++) {
+        sample->sorted = call->kernels->is_sorted(buffer + (size_t)b * bytes, n);
+    }
+    return elapsed_time;
+}
+
+// 输出一个测试单元的汇总结果（自适应模式下另外输出置信区间半宽、批量大小和是否超时）
+static void report_result(const char* name, const char* strategy_name,
+                          SortError sort_error, double times[], int runs, int all_sorted,
+                          int batch, int timed_out) {
     if (sort_error != SORT_SUCCESS) {
         printf("%-25s (%-8s): 错误代码 %d\n", name, strategy_name, sort_error);
-    } else {
-        printf("%-25s (%-8s): 时间 = %8.3f ms, 排序 %s\n", 
-               name, strategy_name, elapsed_time, sorted ? "成功" : "失败");
+        return;
+    }
+    double precision = relative_ci_half_width(times, runs);
+    printf("%-25s (%-8s): 中位时间 = %8.3f ms (%d次), 排序 %s",
+           name, strategy_name, median_time(times, runs), runs, all_sorted ? "成功" : "失败");
+    if (bench_config.adaptive) {
+        if (isfinite(precision)) printf(", ±%.1f%%", precision * 100);
+        if (batch > 1) printf(", 每次%d个", batch);
+        if (timed_out) printf(", 超时");
+    }
+    printf("\n");
+}
+
+// 测量一个测试单元并写入日志，返回1表示超出时间上限
+// 
+// 固定模式：预热warmup次，计时repeat次，每次排序一份拷贝。
+// 自适应模式：预热后标定批量大小（单次排序短于min_time_ms时每个样本连续排序多份拷贝），
+// 之后至少计时repeat次，直到均值95%置信区间的半宽不超过ci_target或达到max_repeat次；
+// 单元耗时（含预热）超过time_limit_s时停止，已有的样本照常记录并标记为超时；
+// 预热和标定已经用完时间上限时不计时，单元没有日志行，只标记为超时。单次排序不会被中断。
+static int measure_cell(const char* name, const char* strategy_name, const char* console_name,
+                        const SortCall* call, int n, const void* original) {
+    int max_runs = bench_config.adaptive ? bench_config.max_repeat : bench_config.repeat;
+    size_t bytes = (size_t)n * call->kernels->element_size;
+    double* times = (double*)malloc(max_runs * sizeof(double));
+    CellSample* samples = (CellSample*)malloc(max_runs * sizeof(CellSample));
+    char* buffer = (char*)malloc(bytes);
+    if (times == NULL || samples == NULL || buffer == NULL) {
+        printf("错误: 无法为测试数组分配内存\n");
+        free(times);
+        free(samples);
+        free(buffer);
+        return 0;
     }
     
-    // 记录到性能日志文件
-    FILE* log_file = fopen("results/performance_log.txt", "a");
-    if (log_file) {
-        fprintf(log_file, "%s,%s,%d,%.3f,%d\n", 
-                name, strategy_name, n, elapsed_time, sorted);
-        fclose(log_file);
+    SortError sort_error = SORT_SUCCESS;
+    double limit_ms = bench_config.time_limit_s * 1000.0;
+    double cell_start = get_current_time();
+    int batch = 1;
+    int runs = 0;
+    int timed_out = 0;
+    CellSample warmup;
+    
+    // 预热（自适应模式下至少一次），不计入日志
+    double elapsed = 0.0;
+    int warmups = (bench_config.adaptive && bench_config.warmup == 0) ? 1 : bench_config.warmup;
+    for (int w = 0; w < warmups && sort_error == SORT_SUCCESS; w++) {
+        elapsed = time_batch(call, buffer, 1, n, original, &warmup, &sort_error);
+        if (bench_config.adaptive && (get_current_time() - cell_start) / 1000.0 >= limit_ms) break;
+    }
+    
+    // 标定批量大小：逐步增大（每次最多10倍），直到一批排序不短于min_time_ms；拷贝总量不超过MAX_BATCH_BYTES
+    if (bench_config.adaptive) {
+        size_t max_batch = MAX_BATCH_BYTES / bytes;
+        while (sort_error == SORT_SUCCESS && elapsed < bench_config.min_time_ms &&
+               (size_t)batch < max_batch && (get_current_time() - cell_start) / 1000.0 < limit_ms) {
+            double growth = elapsed > 0.0 ? 1.2 * bench_config.min_time_ms / elapsed : 10.0;
+            double next = ceil(batch * (growth < 10.0 ? growth : 10.0));
+            if (next > (double)max_batch) next = (double)max_batch;
+            char* grown = (char*)realloc(buffer, (size_t)next * bytes);
+            if (grown == NULL) break;
+            buffer = grown;
+            batch = (int)next;
+            elapsed = time_batch(call, buffer, batch, n, original, &warmup, &sort_error);
+        }
     }
     
-    free(test_arr);
+    // 预热和标定已经用完时间上限时不再计时，单元标记为超时
+    if (bench_config.adaptive && (get_current_time() - cell_start) / 1000.0 >= limit_ms) {
+        timed_out = 1;
+    }
+    
+    while (sort_error == SORT_SUCCESS && !timed_out && runs < max_runs) {
+        elapsed = time_batch(call, buffer, batch, n, original, &samples[runs], &sort_error);
+        times[runs] = samples[runs].time_ms;
+        runs++;
+        if (!bench_config.adaptive) continue;
+        
+        if (runs >= bench_config.repeat &&
+            relative_ci_half_width(times, runs) <= bench_config.ci_target) break;
+        // 下一个样本会超出时间上限时停止
+        double spent = (get_current_time() - cell_start) / 1000.0;
+        if (runs < max_runs && spent + elapsed > limit_ms) {
+            timed_out = 1;
+            break;
+        }
+    }
+    
+    int all_sorted = 1;
+    for (int r = 0; r < runs; r++) {
+        all_sorted = all_sorted && samples[r].sorted;
+        log_result(name, strategy_name, n, samples[r].time_ms, samples[r].sorted, r,
+                   samples[r].aux_bytes, &samples[r].perf, batch, timed_out);
+    }
+    
+    if (runs > 0 || sort_error != SORT_SUCCESS) {
+        report_result(name, console_name, sort_error, times, runs, all_sorted, batch, timed_out);
+    } else if (timed_out) {
+        printf("%-25s (%-8s): 超时 (预热和标定已用完时间上限，没有计时样本)\n", name, console_name);
+    }
+    
+    free(times);
+    free(samples);
+    free(buffer);
+    return timed_out;
 }
 
-// 测试归并排序的包装函数（不需要pivot策略）
-void test_merge_sort(const char* name, 
-                    SortError (*sort_func)(int[], int, int), 
-                    int arr[], int n, int* original) {
+// 排序算法测试函数，返回1表示超出时间上限（自适应模式）
+int test_sort_algorithm(const char* name, QuickSortFunc sort_func,
+                        const void* arr, int n, const void* original,
+                        PivotStrategy strategy) {
     if (arr == NULL || original == NULL || name == NULL) {
         printf("错误: 测试参数为空指针\n");
-        return;
+        return 0;
     }
     
-    // 复制原始数据
-    int* test_arr = (int*)malloc(n * sizeof(int));
-    if (test_arr == NULL) {
-        printf("错误: 无法为测试数组分配内存\n");
+    // 获取pivot策略名称
+    const char* strategy_name = pivot_strategy_name(strategy);
+    SortCall call = {sort_func, NULL, NULL, strategy, 0, current_kernels};
+    return measure_cell(name, strategy_name, strategy_name, &call, n, original);
+}
+
+// 测试归并排序的包装函数（不需要pivot策略，task_depth为并行任务深度上限）
+int test_merge_sort(const char* name, MergeSortFunc sort_func,
+                    const void* arr, int n, const void* original, int task_depth) {
+    if (arr == NULL || original == NULL || name == NULL) {
+        printf("错误: 测试参数为空指针\n");
+        return 0;
+    }
+    
+    // 控制台输出中显示线程数和任务深度
+    char config_name[32];
+    snprintf(config_name, sizeof(config_name), "T%d/D%d", current_threads, current_task_depth);
+    SortCall call = {NULL, sort_func, NULL, PIVOT_FIRST, task_depth, current_kernels};
+    return measure_cell(name, "N/A", config_name, &call, n, original);
+}
+
+// 测试基数排序和样本排序的包装函数（没有pivot策略和任务深度，控制台输出中显示线程数）
+int test_range_sort(const char* name, RangeSortFunc sort_func,
+                    const void* arr, int n, const void* original) {
+    if (arr == NULL || original == NULL || name == NULL) {
+        printf("错误: 测试参数为空指针\n");
+        return 0;
+    }
+    
+    char config_name[32];
+    snprintf(config_name, sizeof(config_name), "T%d", current_threads);
+    SortCall call = {NULL, NULL, sort_func, PIVOT_FIRST, 0, current_kernels};
+    return measure_cell(name, "N/A", config_name, &call, n, original);
+}
+
+// 自适应模式下超时的快速排序序列（元素类型 × 分布 × pivot策略 × 实现），同一序列更大的规模直接跳过；
+// 位于共享内存中，并行调度的工作进程之间互相可见（未启用自适应模式时为NULL）
+#define NUM_QUICK_SORT_SERIES (ELEMENT_TYPE_COUNT * DIST_COUNT * NUM_STRATEGIES * NUM_QUICK_SORT_VARIANTS)
+static int* timed_out_series = NULL;
+
+// 测试一个快速排序单元（variant为实现，strategy为all_strategies的下标，data为current_kernels类型的数组），
+// 规模需按从小到大的顺序测试
+static void run_quick_sort_cell(int variant, int strategy, DataDistribution distribution,
+                                const void* data, int size) {
+    const QuickSortVariant* quick_sort = &quick_sort_variants[variant];
+    QuickSortFunc sort_func = quick_sort->iterative ? current_kernels->quick_sort_iterative
+                                                    : current_kernels->quick_sort_recursive;
+    int series = (((int)current_dtype * DIST_COUNT + (int)distribution) * NUM_STRATEGIES + strategy) * NUM_QUICK_SORT_VARIANTS
+                 + variant;
+    if (timed_out_series != NULL && __atomic_load_n(&timed_out_series[series], __ATOMIC_RELAXED)) {
+        printf("%-25s (%-8s): 跳过 %d 个元素（较小规模已超时）\n",
+               quick_sort->name, pivot_strategy_name(all_strategies[strategy]), size);
         return;
     }
+    if (test_sort_algorithm(quick_sort->name, sort_func, data, size, data, all_strategies[strategy])
+        && timed_out_series != NULL) {
+        __atomic_store_n(&timed_out_series[series], 1, __ATOMIC_RELAXED);
+    }
+}
+
+// 设置并行区域使用的线程数（与OMP_NUM_THREADS等效）
+static void set_thread_count(int threads) {
+    #ifdef _OPENMP
+    omp_set_num_threads(threads);
+    #else
+    (void)threads;
+    #endif
+}
+
+// 默认线程数（OMP_NUM_THREADS或CPU核数）
+static int default_thread_count(void) {
+    #ifdef _OPENMP
+    return omp_get_max_threads();
+    #else
+    return 1;
+    #endif
+}
+
+// 按线程数扫描样本排序、按线程数 × 任务深度扫描两种归并排序实现；only_threads > 0 时只测试该线程数（弱扩展测试）
+static void run_parallel_sort_sweep(const void* data, int size, int only_threads) {
+    int saved_threads = default_thread_count();
     
-    SortError copy_error = copy_array(test_arr, original, n);
-    if (copy_error != SORT_SUCCESS) {
-        printf("错误: 复制数组失败\n");
-        free(test_arr);
+    for (int t = 0; t < bench_config.num_threads; t++) {
+        int threads = bench_config.threads[t];
+        if (only_threads > 0 && threads != only_threads) continue;
+        set_thread_count(threads);
+        
+        current_threads = threads;
+        current_task_depth = 0;
+        test_range_sort("Sample Sort (Parallel)", current_kernels->sample_sort, data, size, data);
+        
+        // 不同的任务深度参数可能解析为同一个实际深度（如1线程时 0 与 auto 都是0）：
+        // 同一线程数下每个实际深度只测一次，否则两次测量的样本会合并到同一个日志单元
+        int tested_depths[MAX_SWEEP];
+        int num_tested = 0;
+        for (int d = 0; d < bench_config.num_task_depths; d++) {
+            int depth = merge_sort_effective_task_depth(bench_config.task_depths[d]);
+            int tested = 0;
+            for (int i = 0; i < num_tested; i++) {
+                if (tested_depths[i] == depth) tested = 1;
+            }
+            if (tested) {
+                printf("任务深度 %d (%d 线程): 已测量，跳过重复的任务深度参数\n", depth, threads);
+                continue;
+            }
+            tested_depths[num_tested++] = depth;
+            
+            current_threads = threads;
+            current_task_depth = depth;
+            test_merge_sort("Merge Sort (Parallel)", current_kernels->merge_sort_parallel,
+                           data, size, data, bench_config.task_depths[d]);
+            test_merge_sort("Merge Sort (Buffered)", current_kernels->merge_sort_buffered,
+                           data, size, data, bench_config.task_depths[d]);
+        }
+    }
+    
+    set_thread_count(saved_threads);
+    current_threads = 1;
+    current_task_depth = 0;
+}
+
+// 测试数据文件路径
+static void benchmark_data_path(char* buffer, size_t length, DataDistribution distribution, int size) {
+    snprintf(buffer, length, "data/test_data_%s_%d.bin", distribution_name(distribution), size);
+}
+
+// 生成并内存映射一份测试数据，失败返回-1
+static int load_benchmark_data(DataDistribution distribution, int size, MappedTestData* mapped) {
+    // 生成测试数据（二进制格式，测试时直接内存映射）
+    char filename[256];
+    benchmark_data_path(filename, sizeof(filename), distribution, size);
+    
+    DataError gen_error = generate_test_data_binary(filename, size, distribution);
+    if (gen_error != DATA_SUCCESS) {
+        printf("警告: 生成测试数据失败，跳过规模 %d\n", size);
+        return -1;
+    }
+    
+    DataError map_error = map_test_data(filename, mapped);
+    if (map_error != DATA_SUCCESS) {
+        printf("警告: 读取测试数据失败（错误代码 %d），跳过规模 %d\n", map_error, size);
+        return -1;
+    }
+    
+    if (bench_config.text_data) {
+        snprintf(filename, sizeof(filename), "data/test_data_%s_%d.txt", distribution_name(distribution), size);
+        if (export_test_data_text(filename, mapped->data, (int)mapped->header.count) != DATA_SUCCESS) {
+            printf("警告: 导出文本测试数据失败: %s\n", filename);
+        }
+    }
+    return 0;
+}
+
+// 切换到一种元素类型，返回该类型的测试数据：int32直接使用映射的数据，其他类型转换到新分配的数组
+// （在计时区间之外完成），失败返回NULL；用release_typed_data释放
+static const void* select_typed_data(ElementType dtype, int data[], int size) {
+    current_dtype = dtype;
+    current_kernels = sort_kernels(dtype);
+    if (dtype == ELEMENT_INT32) return data;
+    void* typed = malloc((size_t)size * current_kernels->element_size);
+    if (typed == NULL) {
+        printf("警告: 无法为 %s 测试数据分配内存，跳过规模 %d\n", current_kernels->name, size);
+        return NULL;
+    }
+    current_kernels->from_int(typed, data, size);
+    return typed;
+}
+
+static void release_typed_data(const void* typed, int data[]) {
+    if (typed != data) free((void*)typed);
+}
+
+// ============================================================================
+// 并行调度：串行测试单元分给固定在不同CPU上的工作进程，每个进程写自己的日志分片
+// ============================================================================
+
+// 本进程允许运行的CPU编号，返回个数
+static int allowed_cpus(int cpus[], int max_cpus) {
+    int count = 0;
+    #ifdef __linux__
+    cpu_set_t set;
+    if (sched_getaffinity(0, sizeof(set), &set) == 0) {
+        for (int cpu = 0; cpu < CPU_SETSIZE && count < max_cpus; cpu++) {
+            if (CPU_ISSET(cpu, &set)) cpus[count++] = cpu;
+        }
+    }
+    #endif
+    if (count == 0) {
+        long online = sysconf(_SC_NPROCESSORS_ONLN);
+        for (int cpu = 0; cpu < online && count < max_cpus; cpu++) cpus[count++] = cpu;
+    }
+    return count > 0 ? count : 1;
+}
+
+// 把当前进程固定到一个CPU上（非Linux平台不固定）
+static void pin_to_cpu(int cpu) {
+    #ifdef __linux__
+    cpu_set_t set;
+    CPU_ZERO(&set);
+    CPU_SET(cpu, &set);
+    if (sched_setaffinity(0, sizeof(set), &set) != 0) {
+        printf("警告: 无法把工作进程固定到CPU %d\n", cpu);
+    }
+    #else
+    (void)cpu;
+    #endif
+}
+
+// 创建一个日志文件并写入表头
+static int init_log_file(const char* path) {
+    FILE* log_file = fopen(path, "w");
+    if (log_file == NULL) return -1;
+    fprintf(log_file, "%s\n", PERFORMANCE_LOG_HEADER);
+    fclose(log_file);
+    return 0;
+}
+
+// 写出本次运行的元数据：开始时间、编译器与编译参数、基准测试配置
+static void write_run_metadata(void) {
+    FILE* f = fopen(RUN_METADATA_FILE, "w");
+    if (f == NULL) {
+        printf("警告: 无法写入运行元数据: %s\n", RUN_METADATA_FILE);
         return;
     }
+    char started_at[32];
+    time_t now = time(NULL);
+    strftime(started_at, sizeof(started_at), "%Y-%m-%dT%H:%M:%S", localtime(&now));
+    fprintf(f, "started_at=%s\n", started_at);
+    #ifdef __VERSION__
+    fprintf(f, "compiler=%s\n", __VERSION__);
+    #endif
+    fprintf(f, "cflags=%s\n", BUILD_CFLAGS);
+    fprintf(f, "opt_level=%s\n", BUILD_OPT_LEVEL);
+    fprintf(f, "build=%s\n", BUILD_TAG);
+    #ifdef _OPENMP
+    fprintf(f, "openmp=%d\n", _OPENMP);
+    #else
+    fprintf(f, "openmp=no\n");
+    #endif
+    fprintf(f, "warmup=%d\nrepeat=%d\njobs=%d\ncounters=%d\n",
+            bench_config.warmup, bench_config.repeat, bench_config.jobs, bench_config.counters);
+    fprintf(f, "dtypes=");
+    for (int t = 0; t < bench_config.num_dtypes; t++) {
+        fprintf(f, "%s%s", t > 0 ? "," : "", element_type_name(bench_config.dtypes[t]));
+    }
+    fprintf(f, "\nadaptive=%d\n", bench_config.adaptive);
+    if (bench_config.adaptive) {
+        fprintf(f, "min_time_ms=%g\nci_target=%g\nmax_repeat=%d\ntime_limit_s=%g\n", bench_config.min_time_ms,
+                bench_config.ci_target, bench_config.max_repeat, bench_config.time_limit_s);
+    }
+    fclose(f);
+}
+
+// 删除上一次运行留下的日志分片，避免被分析脚本合并进本次结果
+static void remove_log_shards(void) {
+    glob_t shards;
+    if (glob(PERFORMANCE_LOG_SHARD_GLOB, 0, NULL, &shards) == 0) {
+        for (size_t i = 0; i < shards.gl_pathc; i++) {
+            remove(shards.gl_pathv[i]);
+        }
+    }
+    globfree(&shards);
+}
+
+// 串行测试单元的编号：分布 × 规模 × 元素类型 × pivot策略 × 快速排序实现（与顺序执行的次序相同）
+static int serial_cell_count(int num_distributions) {
+    return num_distributions * NUM_BENCHMARK_SIZES * bench_config.num_dtypes * NUM_STRATEGIES *
+           NUM_QUICK_SORT_VARIANTS;
+}
+
+// 从共享计数器领取测试单元并执行，直到所有单元都被领完（动态分配，耗时不均的单元不会拖慢整体）
+static void process_serial_cells(int* next_cell, int total, const DataDistribution distributions[]) {
+    MappedTestData mapped;
+    int mapped_key = -1;   // 当前映射的(分布, 规模)，-1表示没有映射
+    const void* typed = NULL;
+    int typed_key = -1;    // 当前转换的(分布, 规模, 元素类型)
     
-    // 测量排序时间
-    double start_time = get_current_time();
-    SortError sort_error = sort_func(test_arr, 0, n - 1);
-    double end_time = get_current_time();
+    for (;;) {
+        int cell = __atomic_fetch_add(next_cell, 1, __ATOMIC_RELAXED);
+        if (cell >= total) break;
+        
+        int variant = cell % NUM_QUICK_SORT_VARIANTS;
+        int strategy = (cell / NUM_QUICK_SORT_VARIANTS) % NUM_STRATEGIES;
+        int dtype_key = cell / (NUM_QUICK_SORT_VARIANTS * NUM_STRATEGIES);
+        int key = dtype_key / bench_config.num_dtypes;
+        DataDistribution distribution = distributions[key / NUM_BENCHMARK_SIZES];
+        int size = benchmark_sizes[key % NUM_BENCHMARK_SIZES];
+        
+        if (dtype_key != typed_key && typed != NULL) {
+            release_typed_data(typed, mapped.data);
+            typed = NULL;
+        }
+        if (key != mapped_key) {
+            if (mapped_key >= 0) unmap_test_data(&mapped);
+            mapped_key = -1;
+            char filename[256];
+            benchmark_data_path(filename, sizeof(filename), distribution, size);
+            if (map_test_data(filename, &mapped) != DATA_SUCCESS) {
+                printf("警告: 读取测试数据失败，跳过: %s\n", filename);
+                continue;
+            }
+            mapped_key = key;
+        }
+        if (typed == NULL) {
+            typed = select_typed_data(bench_config.dtypes[dtype_key % bench_config.num_dtypes], mapped.data,
+                                      (int)mapped.header.count);
+            if (typed == NULL) continue;
+            typed_key = dtype_key;
+        }
+        
+        current_distribution = distribution_name(distribution);
+        run_quick_sort_cell(variant, strategy, distribution, typed, (int)mapped.header.count);
+        fflush(stdout);
+    }
     
-    double elapsed_time = (end_time - start_time) / 1000.0; // 转换为毫秒
+    if (typed != NULL) release_typed_data(typed, mapped.data);
+    if (mapped_key >= 0) unmap_test_data(&mapped);
+}
+
+// 工作进程：固定到cpu，打开自己的计数器，结果写入第worker个日志分片
+static void run_worker(int worker, int cpu, int* next_cell, int total, const DataDistribution distributions[]) {
+    pin_to_cpu(cpu);
     
-    // 验证排序结果
-    int sorted = (sort_error == SORT_SUCCESS) ? is_sorted(test_arr, n) : 0;
+    static char shard_path[256];
+    snprintf(shard_path, sizeof(shard_path), PERFORMANCE_LOG_SHARD_FORMAT, worker);
+    if (init_log_file(shard_path) != 0) {
+        printf("错误: 无法创建日志分片 %s\n", shard_path);
+        _exit(1);
+    }
+    current_log_path = shard_path;
     
-    // 输出结果
-    if (sort_error != SORT_SUCCESS) {
-        printf("%-25s (%-8s): 错误代码 %d\n", name, "N/A", sort_error);
-    } else {
-        printf("%-25s (%-8s): 时间 = %8.3f ms, 排序 %s\n", 
-               name, "N/A", elapsed_time, sorted ? "成功" : "失败");
+    // 从父进程继承的计数器统计的是父进程，工作进程重新打开自己的
+    if (bench_config.counters) {
+        perf_counters_close();
+        perf_counters_open();
     }
     
-    // 记录到性能日志文件
-    FILE* log_file = fopen("results/performance_log.txt", "a");
-    if (log_file) {
-        fprintf(log_file, "%s,%s,%d,%.3f,%d\n", 
-                name, "N/A", n, elapsed_time, sorted);
-        fclose(log_file);
+    process_serial_cells(next_cell, total, distributions);
+    perf_counters_close();
+    fflush(stdout);
+    _exit(0);
+}
+
+// 用bench_config.jobs个工作进程执行所有串行测试单元（测试数据需已生成）
+static void run_serial_cells_parallel(const DataDistribution distributions[], int num_distributions) {
+    int total = serial_cell_count(num_distributions);
+    int cpus[MAX_JOBS];
+    int num_cpus = allowed_cpus(cpus, MAX_JOBS);
+    int jobs = bench_config.jobs;
+    if (jobs > num_cpus) {
+        printf("警告: 工作进程数 %d 超过可用CPU数 %d，部分进程将共用CPU，计时会互相干扰\n", jobs, num_cpus);
+    }
+    
+    // 进程间共享的下一个待领取单元编号
+    int* next_cell = mmap(NULL, sizeof(int), PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    if (next_cell == MAP_FAILED) {
+        printf("错误: 无法创建共享内存，改为顺序执行\n");
+        int local_next = 0;
+        process_serial_cells(&local_next, total, distributions);
+        return;
+    }
+    *next_cell = 0;
+    
+    printf("\n======== 并行调度: %d 个串行测试单元, %d 个工作进程 ========\n", total, jobs);
+    fflush(stdout);   // 避免缓冲区中的输出被子进程重复写出
+    
+    pid_t pids[MAX_JOBS];
+    int started = 0;
+    for (int w = 0; w < jobs; w++) {
+        pid_t pid = fork();
+        if (pid == 0) {
+            run_worker(w, cpus[w % num_cpus], next_cell, total, distributions);
+        }
+        if (pid < 0) {
+            printf("警告: 只启动了 %d 个工作进程\n", started);
+            break;
+        }
+        pids[started++] = pid;
     }
     
-    free(test_arr);
+    // 一个工作进程也没有启动时由主进程自己执行（写入主日志）
+    if (started == 0) {
+        process_serial_cells(next_cell, total, distributions);
+    }
+    
+    int failed = 0;
+    for (int w = 0; w < started; w++) {
+        int status;
+        if (waitpid(pids[w], &status, 0) < 0 || !WIFEXITED(status) || WEXITSTATUS(status) != 0) {
+            failed++;
+        }
+    }
+    if (failed > 0) {
+        printf("警告: %d 个工作进程异常退出，部分测试单元可能缺失\n", failed);
+    }
+    munmap(next_cell, sizeof(int));
 }
 
 // 小规模测试（验证算法正确性）
@@ -131,10 +778,12 @@ void run_small_test() {
     // 测试不同pivot策略的快速排序
     PivotStrategy strategies[] = {
         PIVOT_FIRST, PIVOT_LAST, PIVOT_MIDDLE, 
-        PIVOT_RANDOM, PIVOT_MEDIAN_OF_THREE
+        PIVOT_RANDOM, PIVOT_MEDIAN_OF_THREE,
+        PIVOT_NINTHER, PIVOT_THREE_WAY, PIVOT_INTROSORT
     };
     const char* strategy_names[] = {
-        "First", "Last", "Middle", "Random", "Median3"
+        "First", "Last", "Middle", "Random", "Median3",
+        "Ninther", "ThreeWay", "Introsort"
     };
     int num_strategies = sizeof(strategies) / sizeof(strategies[0]);
     
@@ -158,14 +807,272 @@ void run_small_test() {
         printf("归并排序(并行):   ");
         print_array(ms_data, size);
         printf("排序%s\n", is_sorted(ms_data, size) ? "成功" : "失败");
+        
+        copy_array(ms_data, test_data, size);
+        merge_sort_buffered(ms_data, 0, size - 1);
+        printf("归并排序(单缓冲): ");
+        print_array(ms_data, size);
+        printf("排序%s\n", is_sorted(ms_data, size) ? "成功" : "失败");
         free(ms_data);
     }
     
+    // 测试基数排序和样本排序
+    int* rs_data = (int*)malloc(size * sizeof(int));
+    if (rs_data) {
+        copy_array(rs_data, test_data, size);
+        radix_sort(rs_data, 0, size - 1);
+        printf("基数排序(LSD):    ");
+        print_array(rs_data, size);
+        printf("排序%s\n", is_sorted(rs_data, size) ? "成功" : "失败");
+        
+        copy_array(rs_data, test_data, size);
+        sample_sort(rs_data, 0, size - 1);
+        printf("样本排序(并行):   ");
+        print_array(rs_data, size);
+        printf("排序%s\n", is_sorted(rs_data, size) ? "成功" : "失败");
+        free(rs_data);
+    }
+    
+    // 测试其他元素类型的排序内核（由同一份int数据转换）
+    for (int t = ELEMENT_INT64; t < ELEMENT_TYPE_COUNT; t++) {
+        const SortKernels* kernels = sort_kernels((ElementType)t);
+        KeyIndexRecord typed[sizeof(test_data) / sizeof(test_data[0])];   // 足够容纳任一元素类型
+        int passed = 0;
+        for (int k = 0; k < 6; k++) {
+            kernels->from_int(typed, test_data, size);
+            SortError error = k == 0 ? kernels->quick_sort_recursive(typed, 0, size - 1, PIVOT_INTROSORT)
+                            : k == 1 ? kernels->quick_sort_iterative(typed, 0, size - 1, PIVOT_MEDIAN_OF_THREE)
+                            : k == 2 ? kernels->merge_sort_parallel(typed, 0, size - 1, MERGE_TASK_DEPTH_AUTO)
+                            : k == 3 ? kernels->merge_sort_buffered(typed, 0, size - 1, MERGE_TASK_DEPTH_AUTO)
+                            : k == 4 ? kernels->radix_sort(typed, 0, size - 1)
+                                     : kernels->sample_sort(typed, 0, size - 1);
+            passed += error == SORT_SUCCESS && kernels->is_sorted(typed, size);
+        }
+        printf("元素类型 %-8s: 快速、归并、基数和样本排序 %d/6 排序成功\n", kernels->name, passed);
+    }
+    
     printf("=== 小规模测试完成 ===\n");
 }
 
-int main() {
+// 打印命令行用法
+static void print_usage(const char* prog) {
+    printf("用法: %s [--warmup N] [--repeat N] [--text-data] [--distributions A,B,...]\n"
+           "       [--threads N,N,...] [--task-depths D,D,...] [--weak-base N] [--counters] [--jobs N]\n"
+           "       [--adaptive [--min-time MS] [--ci-target PCT] [--max-repeat N] [--time-limit S]]\n"
+           "       [--dtypes T,T,...]\n", prog);
+    printf("  --warmup N   每个测试单元的预热次数，不计入日志 (默认 %d)\n", bench_config.warmup);
+    printf("  --repeat N   每个测试单元的计时次数，每次一行日志 (默认 %d)\n", bench_config.repeat);
+    printf("  --text-data  同时把测试数据导出为文本格式 data/test_data_<分布>_N.txt\n");
+    printf("  --distributions A,B,...  只测试这些数据分布 (默认全部):");
+    for (int d = 0; d < DIST_COUNT; d++) {
+        printf(" %s", distribution_name((DataDistribution)d));
+    }
+    printf("\n");
+    printf("  --threads N,N,...      样本排序和并行归并排序扫描的线程数 (默认 %d，即OMP_NUM_THREADS)\n", default_thread_count());
+    printf("  --task-depths D,D,...  并行归并排序的任务深度上限，0为串行，auto为按线程数自动选择 (默认 auto)\n");
+    printf("  --weak-base N          额外进行弱扩展测试：每个线程 N 个元素的均匀分布数据 (默认不测试)\n");
+    printf("  --counters             记录硬件计数器（周期、指令、分支预测失败、LLC缺失）和峰值RSS\n");
+    printf("  --jobs N               快速排序测试单元分给N个固定在不同CPU上的工作进程，基数、样本和归并排序仍在主进程中逐个执行 (默认 1)\n");
+    printf("  --adaptive             自适应计时：每个单元至少计时 --repeat 次，直到均值的95%%置信区间足够窄\n");
+    printf("  --min-time MS          自适应模式下一个样本的最短时间，更快的排序批量执行多份拷贝 (默认 %g)\n",
+           bench_config.min_time_ms);
+    printf("  --ci-target PCT        自适应模式下置信区间半宽的目标，占均值的百分比 (默认 %g)\n",
+           bench_config.ci_target * 100);
+    printf("  --max-repeat N         自适应模式下每个单元最多计时次数 (默认 %d)\n", bench_config.max_repeat);
+    printf("  --time-limit S         自适应模式下每个单元的时间上限（秒），超时的快速排序序列跳过更大的规模 (默认 %g)\n",
+           bench_config.time_limit_s);
+    printf("  --dtypes T,T,...       测试的元素类型 (默认 int32):");
+    for (int t = 0; t < ELEMENT_TYPE_COUNT; t++) {
+        printf(" %s", element_type_name((ElementType)t));
+    }
+    printf("\n");
+}
+
+// 解析逗号分隔的整数列表（allow_auto时接受auto），返回元素个数，出错返回-1
+static int parse_int_list(const char* list, int values[], int min_value, int allow_auto) {
+    char buffer[256];
+    snprintf(buffer, sizeof(buffer), "%s", list);
+    int count = 0;
+    for (char* token = strtok(buffer, ","); token != NULL; token = strtok(NULL, ",")) {
+        if (count == MAX_SWEEP) {
+            printf("错误: 扫描列表最多 %d 项\n", MAX_SWEEP);
+            return -1;
+        }
+        if (allow_auto && strcmp(token, "auto") == 0) {
+            values[count++] = MERGE_TASK_DEPTH_AUTO;
+            continue;
+        }
+        char* end;
+        long value = strtol(token, &end, 10);
+        if (*end != '\0' || value < min_value || value > 1024) {
+            printf("错误: 无效的取值 %s\n", token);
+            return -1;
+        }
+        values[count++] = (int)value;
+    }
+    return count;
+}
+
+// 解析逗号分隔的数据分布列表，未知名称返回-1
+static int parse_distributions(const char* list) {
+    char buffer[256];
+    snprintf(buffer, sizeof(buffer), "%s", list);
+    for (char* token = strtok(buffer, ","); token != NULL; token = strtok(NULL, ",")) {
+        int found = 0;
+        for (int d = 0; d < DIST_COUNT; d++) {
+            if (strcmp(token, distribution_name((DataDistribution)d)) == 0) {
+                bench_config.distribution_enabled[d] = 1;
+                found = 1;
+            }
+        }
+        if (!found) {
+            printf("错误: 未知的数据分布 %s\n", token);
+            return -1;
+        }
+    }
+    return 0;
+}
+
+// 解析逗号分隔的元素类型列表，未知名称或重复返回-1
+static int parse_dtypes(const char* list) {
+    char buffer[256];
+    snprintf(buffer, sizeof(buffer), "%s", list);
+    bench_config.num_dtypes = 0;
+    for (char* token = strtok(buffer, ","); token != NULL; token = strtok(NULL, ",")) {
+        int found = -1;
+        for (int t = 0; t < ELEMENT_TYPE_COUNT; t++) {
+            if (strcmp(token, element_type_name((ElementType)t)) == 0) found = t;
+        }
+        for (int t = 0; t < bench_config.num_dtypes && found >= 0; t++) {
+            if (bench_config.dtypes[t] == (ElementType)found) found = -1;
+        }
+        if (found < 0) {
+            printf("错误: 未知或重复的元素类型 %s\n", token);
+            return -1;
+        }
+        bench_config.dtypes[bench_config.num_dtypes++] = (ElementType)found;
+    }
+    return 0;
+}
+
+// 解析命令行参数，失败返回-1
+static int parse_arguments(int argc, char* argv[]) {
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--warmup") == 0 && i + 1 < argc) {
+            bench_config.warmup = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "--repeat") == 0 && i + 1 < argc) {
+            bench_config.repeat = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "--text-data") == 0) {
+            bench_config.text_data = 1;
+        } else if (strcmp(argv[i], "--distributions") == 0 && i + 1 < argc) {
+            if (parse_distributions(argv[++i]) != 0) return -1;
+        } else if (strcmp(argv[i], "--threads") == 0 && i + 1 < argc) {
+            bench_config.num_threads = parse_int_list(argv[++i], bench_config.threads, 1, 0);
+            if (bench_config.num_threads <= 0) return -1;
+        } else if (strcmp(argv[i], "--task-depths") == 0 && i + 1 < argc) {
+            bench_config.num_task_depths = parse_int_list(argv[++i], bench_config.task_depths, 0, 1);
+            if (bench_config.num_task_depths <= 0) return -1;
+        } else if (strcmp(argv[i], "--weak-base") == 0 && i + 1 < argc) {
+            bench_config.weak_base = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "--counters") == 0) {
+            bench_config.counters = 1;
+        } else if (strcmp(argv[i], "--jobs") == 0 && i + 1 < argc) {
+            bench_config.jobs = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "--adaptive") == 0) {
+            bench_config.adaptive = 1;
+        } else if (strcmp(argv[i], "--min-time") == 0 && i + 1 < argc) {
+            bench_config.min_time_ms = atof(argv[++i]);
+        } else if (strcmp(argv[i], "--ci-target") == 0 && i + 1 < argc) {
+            bench_config.ci_target = atof(argv[++i]) / 100.0;
+        } else if (strcmp(argv[i], "--max-repeat") == 0 && i + 1 < argc) {
+            bench_config.max_repeat = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "--time-limit") == 0 && i + 1 < argc) {
+            bench_config.time_limit_s = atof(argv[++i]);
+        } else if (strcmp(argv[i], "--dtypes") == 0 && i + 1 < argc) {
+            if (parse_dtypes(argv[++i]) != 0) return -1;
+        } else {
+            print_usage(argv[0]);
+            return -1;
+        }
+    }
+    if (bench_config.warmup < 0 || bench_config.repeat < 1) {
+        printf("错误: 预热次数不能为负，计时次数至少为1\n");
+        return -1;
+    }
+    if (bench_config.jobs < 1 || bench_config.jobs > MAX_JOBS) {
+        printf("错误: 工作进程数必须在1到%d之间\n", MAX_JOBS);
+        return -1;
+    }
+    if (bench_config.adaptive && (bench_config.min_time_ms < 0 || bench_config.ci_target <= 0 ||
+                                  bench_config.time_limit_s <= 0 || bench_config.max_repeat < bench_config.repeat)) {
+        printf("错误: 自适应参数无效（最多计时次数不能少于 --repeat，置信区间目标和时间上限必须为正）\n");
+        return -1;
+    }
+    if (bench_config.weak_base < 0) {
+        printf("错误: 弱扩展测试的每线程元素个数不能为负\n");
+        return -1;
+    }
+    
+    // 未指定扫描列表时使用默认线程数和自动任务深度
+    if (bench_config.num_threads == 0) {
+        bench_config.threads[bench_config.num_threads++] = default_thread_count();
+    }
+    if (bench_config.num_task_depths == 0) {
+        bench_config.task_depths[bench_config.num_task_depths++] = MERGE_TASK_DEPTH_AUTO;
+    }
+    if (bench_config.num_dtypes == 0) {
+        bench_config.dtypes[bench_config.num_dtypes++] = ELEMENT_INT32;
+    }
+    
+    // 未指定分布时测试全部分布
+    int any_enabled = 0;
+    for (int d = 0; d < DIST_COUNT; d++) {
+        any_enabled |= bench_config.distribution_enabled[d];
+    }
+    if (!any_enabled) {
+        for (int d = 0; d < DIST_COUNT; d++) {
+            bench_config.distribution_enabled[d] = 1;
+        }
+    }
+    return 0;
+}
+
+int main(int argc, char* argv[]) {
+    if (parse_arguments(argc, argv) != 0) {
+        return 1;
+    }
+    
     printf("=== 排序算法性能分析（Pivot策略比较 + 并行归并） ===\n");
+    printf("预热次数: %d, 计时次数: %d\n", bench_config.warmup, bench_config.repeat);
+    if (bench_config.adaptive) {
+        printf("自适应计时: 样本最短 %g ms, 置信区间半宽目标 %g%%, 最多 %d 次, 单元时间上限 %g s\n",
+               bench_config.min_time_ms, bench_config.ci_target * 100, bench_config.max_repeat,
+               bench_config.time_limit_s);
+    }
+    printf("归并排序线程数扫描:");
+    for (int t = 0; t < bench_config.num_threads; t++) printf(" %d", bench_config.threads[t]);
+    printf(", 任务深度扫描:");
+    for (int d = 0; d < bench_config.num_task_depths; d++) {
+        if (bench_config.task_depths[d] == MERGE_TASK_DEPTH_AUTO) printf(" auto");
+        else printf(" %d", bench_config.task_depths[d]);
+    }
+    printf("\n");
+    if (bench_config.num_dtypes > 1 || bench_config.dtypes[0] != ELEMENT_INT32) {
+        printf("元素类型:");
+        for (int t = 0; t < bench_config.num_dtypes; t++) printf(" %s", element_type_name(bench_config.dtypes[t]));
+        printf("\n");
+    }
+    
+    // 计数器必须在第一个并行区域（创建OpenMP线程池）之前打开，工作线程才会被计入
+    if (bench_config.counters) {
+        int opened = perf_counters_open();
+        if (opened == PERF_COUNTER_COUNT) {
+            printf("硬件计数器: 全部可用\n");
+        } else {
+            printf("硬件计数器: %d/%d 可用（内核不允许的计数器记为-1，峰值RSS照常记录）\n",
+                   opened, PERF_COUNTER_COUNT);
+        }
+    }
     
     // 显示当前工作目录
     char cwd[1024];
@@ -180,79 +1087,123 @@ int main() {
     // 先运行小规模测试
     run_small_test();
     
-    // 定义测试规模
-    const int sizes[] = {1000, 5000, 10000, 50000, 100000};
-    const int num_sizes = sizeof(sizes) / sizeof(sizes[0]);
-    
-    // 清空性能日志
-    FILE* log_file = fopen("results/performance_log.txt", "w");
-    if (log_file) {
-        fprintf(log_file, "Algorithm,PivotStrategy,Size,Time(ms),Sorted\n");
-        fclose(log_file);
-        printf("已初始化性能日志: results/performance_log.txt\n");
+    // 清空性能日志（并删除上一次运行留下的日志分片）
+    remove_log_shards();
+    write_run_metadata();
+    if (init_log_file(PERFORMANCE_LOG) == 0) {
+        printf("已初始化性能日志: %s\n", PERFORMANCE_LOG);
     } else {
         printf("错误: 无法初始化性能日志文件\n");
     }
     
-    // 生成和测试不同规模的数据
-    printf("\n生成测试数据...\n");
-    for (int i = 0; i < num_sizes; i++) {
-        char filename[256];
-        snprintf(filename, sizeof(filename), "data/test_data_%d.txt", sizes[i]);
-        
-        DataError gen_error = generate_test_data(filename, sizes[i]);
-        if (gen_error != DATA_SUCCESS) {
-            printf("警告: 生成测试数据失败，跳过规模 %d\n", sizes[i]);
-            continue;
-        }
+    // 超时序列标记放在共享内存中，fork出的工作进程也能看到
+    if (bench_config.adaptive) {
+        void* flags = mmap(NULL, NUM_QUICK_SORT_SERIES * sizeof(int), PROT_READ | PROT_WRITE,
+                           MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+        if (flags != MAP_FAILED) timed_out_series = (int*)flags;
     }
     
-    printf("\n测试排序算法...\n");
+    DataDistribution distributions[DIST_COUNT];
+    int num_distributions = 0;
+    for (int d = 0; d < DIST_COUNT; d++) {
+        if (bench_config.distribution_enabled[d]) distributions[num_distributions++] = (DataDistribution)d;
+    }
     
-    // 定义所有pivot策略
-    PivotStrategy all_strategies[] = {
-        PIVOT_FIRST, PIVOT_LAST, PIVOT_MIDDLE, 
-        PIVOT_RANDOM, PIVOT_MEDIAN_OF_THREE
-    };
-    int num_strategies = sizeof(all_strategies) / sizeof(all_strategies[0]);
+    // 并行调度：先生成全部测试数据，再把快速排序单元分给工作进程（工作进程只映射，不写数据文件）
+    if (bench_config.jobs > 1) {
+        for (int d = 0; d < num_distributions; d++) {
+            for (int i = 0; i < NUM_BENCHMARK_SIZES; i++) {
+                MappedTestData mapped;
+                if (load_benchmark_data(distributions[d], benchmark_sizes[i], &mapped) == 0) {
+                    unmap_test_data(&mapped);
+                }
+            }
+        }
+        run_serial_cells_parallel(distributions, num_distributions);
+    }
     
-    // 测试不同规模的数据
-    for (int i = 0; i < num_sizes; i++) {
-        char filename[256];
-        snprintf(filename, sizeof(filename), "data/test_data_%d.txt", sizes[i]);
-        
-        int size;
-        DataError read_error;
-        int* data = read_test_data(filename, &size, &read_error);
+    // 遍历数据分布 × 数据规模；并行调度时这里只剩基数排序、样本排序和归并排序，逐个在主进程中执行以免与其他测试争用CPU
+    for (int d = 0; d < num_distributions; d++) {
+        DataDistribution distribution = distributions[d];
+        current_distribution = distribution_name(distribution);
+        printf("\n======== 数据分布: %s ========\n", current_distribution);
         
-        if (data == NULL) {
-            printf("警告: 读取测试数据失败，跳过规模 %d\n", sizes[i]);
-            continue;
+        for (int i = 0; i < NUM_BENCHMARK_SIZES; i++) {
+            MappedTestData mapped;
+            if (load_benchmark_data(distribution, benchmark_sizes[i], &mapped) != 0) {
+                continue;
+            }
+            int size = (int)mapped.header.count;
+            
+            printf("\n--- 测试规模: %d 个元素 (%s) ---\n", size, current_distribution);
+            
+            for (int t = 0; t < bench_config.num_dtypes; t++) {
+                const void* data = select_typed_data(bench_config.dtypes[t], mapped.data, size);
+                if (data == NULL) continue;
+                if (bench_config.num_dtypes > 1) {
+                    printf("元素类型: %s (%zu 字节)\n", current_kernels->name, current_kernels->element_size);
+                }
+                
+                // 测试所有pivot策略的快速排序
+                if (bench_config.jobs <= 1) {
+                    for (int s = 0; s < NUM_STRATEGIES; s++) {
+                        for (int v = 0; v < NUM_QUICK_SORT_VARIANTS; v++) {
+                            run_quick_sort_cell(v, s, distribution, data, size);
+                        }
+                    }
+                }
+                
+                // 测试基数排序（串行，不比较元素）
+                test_range_sort("Radix Sort (LSD)", current_kernels->radix_sort, data, size, data);
+                
+                // 测试样本排序和并行归并排序（线程数 × 任务深度扫描）
+                run_parallel_sort_sweep(data, size, 0);
+                
+                release_typed_data(data, mapped.data);
+            }
+            
+            unmap_test_data(&mapped);
         }
+    }
+    
+    // 弱扩展测试：每个线程处理固定数量的元素，规模随线程数增长
+    // 规模恰好落在常规规模上时，该线程数的单元已在上面的均匀分布扫描中用同一份数据测过：
+    // 不再重复测量（否则两次测量的样本会合并到同一个日志单元），弱扩展分析直接使用那个单元
+    if (bench_config.weak_base > 0) {
+        current_distribution = distribution_name(DIST_UNIFORM);
+        printf("\n======== 弱扩展测试: 每线程 %d 个元素 (%s) ========\n",
+               bench_config.weak_base, current_distribution);
         
-        printf("\n--- 测试规模: %d 个元素 ---\n", size);
-        
-        // 测试所有pivot策略的快速排序
-        for (int s = 0; s < num_strategies; s++) {
-            test_sort_algorithm("Quick Sort (Recursive)", quick_sort_recursive, 
-                               data, size, data, all_strategies[s]);
-            test_sort_algorithm("Quick Sort (Iterative)", quick_sort_iterative, 
-                               data, size, data, all_strategies[s]);
+        for (int t = 0; t < bench_config.num_threads; t++) {
+            MappedTestData mapped;
+            int size = bench_config.weak_base * bench_config.threads[t];
+            if (bench_config.distribution_enabled[DIST_UNIFORM] && is_benchmark_size(size)) {
+                printf("\n--- 测试规模: %d 个元素 (%d 线程): 已在常规测试中测量，跳过 ---\n",
+                       size, bench_config.threads[t]);
+                continue;
+            }
+            if (load_benchmark_data(DIST_UNIFORM, size, &mapped) != 0) {
+                continue;
+            }
+            printf("\n--- 测试规模: %d 个元素 (%d 线程) ---\n", size, bench_config.threads[t]);
+            for (int e = 0; e < bench_config.num_dtypes; e++) {
+                const void* data = select_typed_data(bench_config.dtypes[e], mapped.data, size);
+                if (data == NULL) continue;
+                run_parallel_sort_sweep(data, (int)mapped.header.count, bench_config.threads[t]);
+                release_typed_data(data, mapped.data);
+            }
+            unmap_test_data(&mapped);
         }
-        
-        // 测试并行归并排序
-        test_merge_sort("Merge Sort (Parallel)", merge_sort_parallel, 
-                       data, size, data);
-        
-        free_test_data(data);
     }
     
+    perf_counters_close();
+    if (timed_out_series != NULL) munmap(timed_out_series, NUM_QUICK_SORT_SERIES * sizeof(int));
     printf("\n=== 性能测试完成 ===\n");
-    printf("结果已保存到: results/performance_log.txt\n");
+    printf("结果已保存到: %s\n", PERFORMANCE_LOG);
     
     // 验证文件确实存在
     printf("\n生成的文件清单:\n");
-    system("find . -name \"*.txt\" -o -name \"*.csv\" 2>/dev/null | head -10");
+    system("find . -name \"*.txt\" -o -name \"*.csv\" -o -name \"*.bin\" 2>/dev/null | head -10");
     
     return 0;
 }
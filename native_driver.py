@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+进程内基准测试驱动：通过ctypes直接调用共享库 libsortalgo.so 中的排序函数
+输入数据由C端 fill_test_data 直接写入NumPy缓冲区（与 sort_analysis 生成的数据完全相同），
+排序在NumPy缓冲区上原地进行（零拷贝，ctypes.CDLL调用期间释放GIL），
+计时结果收集为列式内存表后直接交给 analyze_results 聚合、绘图和生成报告，不经过 data/ 和日志文件
+
+先编译共享库: make shared
+"""
+
+import ctypes
+import os
+import sys
+import time
+
+# 共享库查找路径（可用环境变量SORT_LIB覆盖）
+LIBRARY_NAME = 'libsortalgo.so'
+LIBRARY_PATHS = ['../' + LIBRARY_NAME, './' + LIBRARY_NAME]
+
+# 与 main.c 相同的默认测试规模
+DEFAULT_SIZES = [1000, 5000, 10000, 50000, 100000]
+
+# 与C端 MERGE_TASK_DEPTH_AUTO 一致
+MERGE_TASK_DEPTH_AUTO = -1
+
+# 列式结果表的列（与性能日志 PERFORMANCE_LOG_HEADER 的前10列及DType列一致，其余列由分析脚本补默认值）
+RESULT_COLUMNS = ['Algorithm', 'PivotStrategy', 'Size', 'Time(ms)', 'Sorted', 'Repeat',
+                  'Distribution', 'Threads', 'TaskDepth', 'AuxBytes', 'DType']
+
+# 元素类型 -> (C函数名后缀, NumPy类型)，名称与C端 element_type_name 一致
+ELEMENT_TYPES = {
+    'int32': ('', 'int32'),
+    'int64': ('_i64', 'int64'),
+    'float64': ('_f64', 'float64'),
+    'record': ('_kv', [('key', '<i8'), ('index', '<i8')]),
+}
+
+def find_library(lib_path=None):
+    """查找共享库，显式指定路径或SORT_LIB时只检查该路径"""
+    lib_path = lib_path or os.environ.get('SORT_LIB')
+    candidates = [lib_path] if lib_path else LIBRARY_PATHS
+    for path in candidates:
+        if os.path.exists(path):
+            return os.path.abspath(path)
+    return None
+
+class SortLibrary:
+    """libsortalgo.so 的ctypes封装，数组参数直接传NumPy缓冲区的指针"""
+
+    def __init__(self, path):
+        import numpy as np
+        # CDLL（而不是PyDLL）在每次外部调用期间释放GIL
+        self._lib = ctypes.CDLL(path)
+        int_array = np.ctypeslib.ndpointer(dtype=np.int32, ndim=1, flags='C_CONTIGUOUS,WRITEABLE')
+        c_int = ctypes.c_int
+
+        # 每种元素类型的六个排序函数，参数为对应NumPy类型的缓冲区
+        for suffix, dtype in ELEMENT_TYPES.values():
+            array = np.ctypeslib.ndpointer(dtype=np.dtype(dtype), ndim=1, flags='C_CONTIGUOUS,WRITEABLE')
+            for name in ('quick_sort_recursive', 'quick_sort_iterative',
+                         'merge_sort_parallel_depth', 'merge_sort_buffered_depth'):
+                func = getattr(self._lib, name + suffix)
+                func.argtypes = [array, c_int, c_int, c_int]
+                func.restype = c_int
+            for name in ('radix_sort', 'sample_sort'):
+                func = getattr(self._lib, name + suffix)
+                func.argtypes = [array, c_int, c_int]
+                func.restype = c_int
+        self._lib.merge_sort_effective_task_depth.argtypes = [c_int]
+        self._lib.merge_sort_effective_task_depth.restype = c_int
+        self._lib.fill_test_data.argtypes = [int_array, c_int, c_int]
+        self._lib.fill_test_data.restype = c_int
+        self._lib.sort_memory_reset.argtypes = []
+        self._lib.sort_memory_reset.restype = None
+        self._lib.sort_memory_peak.argtypes = []
+        self._lib.sort_memory_peak.restype = ctypes.c_size_t
+        for name in ('pivot_strategy_name', 'distribution_name'):
+            getattr(self._lib, name).argtypes = [c_int]
+            getattr(self._lib, name).restype = ctypes.c_char_p
+
+        # 编译时启用了OpenMP才有线程数控制（符号来自共享库依赖的libgomp）
+        self.has_openmp = hasattr(self._lib, 'omp_set_num_threads')
+        if self.has_openmp:
+            self._lib.omp_set_num_threads.argtypes = [c_int]
+            self._lib.omp_get_max_threads.restype = c_int
+
+        self.pivot_strategies = self._enum_names(self._lib.pivot_strategy_name)
+        self.distributions = self._enum_names(self._lib.distribution_name)
+
+    @staticmethod
+    def _enum_names(name_func):
+        """按枚举值顺序取出C端的名称表，遇到"Unknown"为止"""
+        names = []
+        while (name := name_func(len(names)).decode()) != 'Unknown':
+            names.append(name)
+        return names
+
+    def sort_functions(self, dtype='int32'):
+        """[(算法名, 排序函数, 扫描方式)]，算法名与 main.c 写入日志的名称一致
+
+        扫描方式：'pivot'为pivot策略，'serial'不扫描，'threads'为线程数，'depth'为线程数 × 任务深度
+        """
+        suffix = ELEMENT_TYPES[dtype][0]
+        return [
+            ('Quick Sort (Recursive)', getattr(self._lib, 'quick_sort_recursive' + suffix), 'pivot'),
+            ('Quick Sort (Iterative)', getattr(self._lib, 'quick_sort_iterative' + suffix), 'pivot'),
+            ('Radix Sort (LSD)', getattr(self._lib, 'radix_sort' + suffix), 'serial'),
+            ('Sample Sort (Parallel)', getattr(self._lib, 'sample_sort' + suffix), 'threads'),
+            ('Merge Sort (Parallel)', getattr(self._lib, 'merge_sort_parallel_depth' + suffix), 'depth'),
+            ('Merge Sort (Buffered)', getattr(self._lib, 'merge_sort_buffered_depth' + suffix), 'depth'),
+        ]
+
+    def fill(self, out, distribution):
+        """按分布把测试数据直接写入out（int32缓冲区）"""
+        error = self._lib.fill_test_data(out, len(out), self.distributions.index(distribution))
+        if error != 0:
+            raise ValueError(f"生成测试数据失败（错误代码 {error}）")
+
+    def set_threads(self, threads):
+        if self.has_openmp:
+            self._lib.omp_set_num_threads(threads)
+
+    def max_threads(self):
+        return self._lib.omp_get_max_threads() if self.has_openmp else 1
+
+    def effective_task_depth(self, task_depth):
+        return self._lib.merge_sort_effective_task_depth(task_depth)
+
+    def memory_reset(self):
+        self._lib.sort_memory_reset()
+
+    def memory_peak(self):
+        return self._lib.sort_memory_peak()
+
+def typed_data(original, dtype):
+    """把int32测试数据保序转换为dtype类型（与C端各类型的from_int相同，结果和 sort_analysis --dtypes 一致）"""
+    import numpy as np
+    if dtype == 'int32':
+        return original
+    keys = original.astype(np.int64) * 2**31
+    if dtype == 'int64':
+        return keys
+    if dtype == 'float64':
+        return original / 1024.0
+    records = np.empty(len(original), dtype=np.dtype(ELEMENT_TYPES['record'][1]))
+    records['key'] = keys
+    records['index'] = np.arange(len(original))
+    return records
+
+class ResultTable:
+    """列式结果表：每列一个Python列表，最后一次性转换为DataFrame"""
+
+    def __init__(self):
+        self.columns = {col: [] for col in RESULT_COLUMNS}
+
+    def append(self, *values):
+        for col, value in zip(RESULT_COLUMNS, values):
+            self.columns[col].append(value)
+
+    def __len__(self):
+        return len(self.columns['Time(ms)'])
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
+def _time_sort(lib, func, work, original, args, warmup, repeat):
+    """在work上重复排序original的副本，返回[(毫秒, 是否有序, 辅助内存字节)]，预热轮次不返回"""
+    import numpy as np
+    results = []
+    for r in range(-warmup, repeat):
+        np.copyto(work, original)
+        lib.memory_reset()
+        start = time.perf_counter_ns()   # 与C端相同的单调时钟
+        error = func(work, 0, len(work) - 1, *args)
+        elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+        aux_bytes = lib.memory_peak()
+        keys = work['key'] if work.dtype.names else work
+        sorted_ok = error == 0 and bool(np.all(keys[:-1] <= keys[1:]))
+        if r >= 0:
+            results.append((elapsed_ms, sorted_ok, aux_bytes))
+    return results
+
+def run_benchmark(lib, sizes=DEFAULT_SIZES, distributions=None, warmup=1, repeat=5,
+                  threads=None, task_depths=(MERGE_TASK_DEPTH_AUTO,), dtypes=('int32',)):
+    """按 分布 × 规模 × 元素类型 × 算法 运行基准测试，返回列式结果表"""
+    import numpy as np
+    distributions = distributions or lib.distributions
+    threads = threads or [lib.max_threads()]
+    saved_threads = lib.max_threads()
+    table = ResultTable()
+
+    for distribution in distributions:
+        print(f"\n======== 数据分布: {distribution} ========")
+        for size in sizes:
+            int_data = np.empty(size, dtype=np.int32)
+            lib.fill(int_data, distribution)
+            print(f"--- 测试规模: {size} 个元素 ({distribution}) ---")
+
+            for dtype in dtypes:
+                original = typed_data(int_data, dtype)
+                work = np.empty_like(original)
+                if len(dtypes) > 1:
+                    print(f"元素类型: {dtype} ({original.itemsize} 字节)")
+                _run_dtype(lib, table, dtype, original, work, distribution, warmup, repeat, threads, task_depths)
+            lib.set_threads(saved_threads)
+    return table
+
+def _run_dtype(lib, table, dtype, original, work, distribution, warmup, repeat, threads, task_depths):
+    """测试一种元素类型的全部排序函数，结果追加到table"""
+    import numpy as np
+    size = len(original)
+    for name, func, sweep in lib.sort_functions(dtype):
+        if sweep == 'pivot':
+            # 串行快速排序：扫描pivot策略
+            configs = [(strategy, 1, 0, (index,))
+                       for index, strategy in enumerate(lib.pivot_strategies)]
+        elif sweep == 'serial':
+            # 基数排序：串行，没有参数
+            configs = [('N/A', 1, 0, ())]
+        elif sweep == 'threads':
+            # 样本排序：扫描线程数
+            configs = [('N/A', t, 0, ()) for t in threads]
+        else:
+            # 归并排序：扫描线程数 × 任务深度（auto按线程数解析）；不同的参数解析为同一个实际深度时
+            # （如1线程时 0 与 auto 都是0）只测一次，否则两次测量的样本会合并到同一个日志单元
+            configs = []
+            for t in threads:
+                lib.set_threads(t)
+                tested = set()
+                for depth in task_depths:
+                    effective = lib.effective_task_depth(depth)
+                    if effective in tested:
+                        continue
+                    tested.add(effective)
+                    configs.append(('N/A', t, effective, (depth,)))
+
+        for strategy, t, depth, args in configs:
+            if sweep != 'pivot':
+                lib.set_threads(t)
+            results = _time_sort(lib, func, work, original, args, warmup, repeat)
+            for r, (elapsed_ms, sorted_ok, aux_bytes) in enumerate(results):
+                table.append(name, strategy, size, elapsed_ms, int(sorted_ok), r, distribution,
+                             t, depth, aux_bytes, dtype)
+            median = float(np.median([res[0] for res in results]))
+            status = "成功" if all(res[1] for res in results) else "失败"
+            config = (strategy if sweep == 'pivot' else f"T{t}/D{depth}" if sweep == 'depth'
+                      else f"T{t}")
+            print(f"{name:<25} ({config:<8}): 中位时间 = {median:8.3f} ms ({repeat}次), 排序 {status}")
+
+def _parse_list(text, convert=int):
+    return [convert(item) for item in text.split(',') if item]
+
+def _parse_depth(item):
+    return MERGE_TASK_DEPTH_AUTO if item == 'auto' else int(item)
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    import argparse
+    from analyze_results import CHART_NAMES
+    parser = argparse.ArgumentParser(
+        description='In-process sorting benchmark driver (ctypes + NumPy) feeding the analysis directly')
+    parser.add_argument('--lib', default=None,
+                        help=f'path to {LIBRARY_NAME} (default: $SORT_LIB or the usual locations; build with make shared)')
+    parser.add_argument('--sizes', type=_parse_list, default=DEFAULT_SIZES,
+                        help='comma separated data sizes (default: %(default)s)')
+    parser.add_argument('--distributions', type=lambda text: _parse_list(text, str), default=None,
+                        help='comma separated input distributions (default: all)')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs per cell (default: 1)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per cell (default: 5)')
+    parser.add_argument('--threads', type=_parse_list, default=None,
+                        help='comma separated thread counts for the sample sort and merge sorts (default: OpenMP default)')
+    parser.add_argument('--task-depths', type=lambda text: _parse_list(text, _parse_depth),
+                        default=[MERGE_TASK_DEPTH_AUTO],
+                        help='comma separated merge sort task depths, "auto" allowed (default: auto)')
+    parser.add_argument('--dtypes', type=lambda text: _parse_list(text, str), default=['int32'],
+                        help=f'comma separated element types: {",".join(ELEMENT_TYPES)} (default: int32)')
+    parser.add_argument('--out', default='../results',
+                        help='directory for charts and the report (default: ../results)')
+    parser.add_argument('--save-log', default=None, metavar='PATH',
+                        help='also write the raw results as a performance log (for --compare)')
+    chart_group = parser.add_mutually_exclusive_group()
+    chart_group.add_argument('--charts', nargs='+', choices=CHART_NAMES, metavar='CHART',
+                             help='render only these charts')
+    chart_group.add_argument('--no-charts', action='store_true',
+                             help='report-only mode: skip charts and never import matplotlib')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes used to render charts (default: CPU count)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """主函数，返回进程退出码"""
+    import analyze_results as analysis
+    args = parse_args(argv)
+    charts = [] if args.no_charts else args.charts
+    if args.warmup < 0 or args.repeat < 1:
+        print("✗ 预热次数不能为负，计时次数至少为1")
+        return 1
+    if not analysis.check_dependencies(need_charts=charts != []):
+        return 1
+
+    lib_path = find_library(args.lib)
+    if lib_path is None:
+        print(f"✗ 找不到共享库 {LIBRARY_NAME}，请先运行: make shared")
+        return 1
+    lib = SortLibrary(lib_path)
+    print(f"✓ 加载共享库: {lib_path} (OpenMP: {'yes' if lib.has_openmp else 'no'})")
+
+    unknown = [d for d in (args.distributions or []) if d not in lib.distributions]
+    if unknown:
+        print(f"✗ 未知的数据分布: {', '.join(unknown)}（可选: {', '.join(lib.distributions)}）")
+        return 1
+    unknown = [t for t in args.dtypes if t not in ELEMENT_TYPES]
+    if unknown:
+        print(f"✗ 未知的元素类型: {', '.join(unknown)}（可选: {', '.join(ELEMENT_TYPES)}）")
+        return 1
+
+    table = run_benchmark(lib, args.sizes, args.distributions, args.warmup, args.repeat,
+                          args.threads, args.task_depths, args.dtypes)
+    raw = table.to_frame()
+    print(f"\n✓ 完成 {len(table)} 次计时")
+    if args.save_log:
+        raw.to_csv(args.save_log, index=False, float_format='%.3f')
+        print(f"✓ 原始结果已保存到: {args.save_log}")
+
+    if charts != []:
+        analysis.install_chinese_fonts()
+        analysis.setup_plot_style()
+    df = analysis.aggregate_performance_frame(raw)
+    print(f"✓ 聚合: {len(raw)} 条记录 -> {len(df)} 个聚合单元")
+    analysis.run_analysis(df, args.out, charts, n_jobs=args.jobs)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#include "perf_counters.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/resource.h>
+
+#ifdef __linux__
+#include <linux/perf_event.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif
+
+// 每个计数器的文件描述符，-1表示不可用
+static int counter_fds[PERF_COUNTER_COUNT] = {-1, -1, -1, -1};
+
+static const char* counter_names[PERF_COUNTER_COUNT] = {
+    "Cycles", "Instructions", "BranchMisses", "LLCMisses"
+};
+
+const char* perf_counter_name(PerfCounter counter) {
+    if (counter < 0 || counter >= PERF_COUNTER_COUNT) return "Unknown";
+    return counter_names[counter];
+}
+
+void perf_sample_clear(PerfSample* sample) {
+    for (int i = 0; i < PERF_COUNTER_COUNT; i++) {
+        sample->counters[i] = -1;
+    }
+    sample->max_rss_kb = -1;
+}
+
+#ifdef __linux__
+
+// 通用硬件事件；PERF_COUNT_HW_CACHE_MISSES在主流CPU上对应末级缓存缺失
+static const unsigned long long counter_configs[PERF_COUNTER_COUNT] = {
+    PERF_COUNT_HW_CPU_CYCLES,
+    PERF_COUNT_HW_INSTRUCTIONS,
+    PERF_COUNT_HW_BRANCH_MISSES,
+    PERF_COUNT_HW_CACHE_MISSES
+};
+
+// 读出的格式：计数值 + 启用时间 + 实际运行时间（计数器被复用时按比例放大）
+typedef struct {
+    unsigned long long value;
+    unsigned long long time_enabled;
+    unsigned long long time_running;
+} CounterReading;
+
+static int open_counter(unsigned long long config) {
+    struct perf_event_attr attr;
+    memset(&attr, 0, sizeof(attr));
+    attr.size = sizeof(attr);
+    attr.type = PERF_TYPE_HARDWARE;
+    attr.config = config;
+    attr.disabled = 1;
+    attr.inherit = 1;           // 计入之后创建的子线程（OpenMP工作线程）
+    attr.exclude_kernel = 1;    // perf_event_paranoid=2时普通用户只能统计用户态
+    attr.exclude_hv = 1;
+    attr.read_format = PERF_FORMAT_TOTAL_TIME_ENABLED | PERF_FORMAT_TOTAL_TIME_RUNNING;
+    return (int)syscall(SYS_perf_event_open, &attr, 0, -1, -1, 0);
+}
+
+int perf_counters_open(void) {
+    int opened = 0;
+    for (int i = 0; i < PERF_COUNTER_COUNT; i++) {
+        if (counter_fds[i] < 0) {
+            counter_fds[i] = open_counter(counter_configs[i]);
+        }
+        if (counter_fds[i] >= 0) opened++;
+    }
+    return opened;
+}
+
+void perf_counters_close(void) {
+    for (int i = 0; i < PERF_COUNTER_COUNT; i++) {
+        if (counter_fds[i] >= 0) close(counter_fds[i]);
+        counter_fds[i] = -1;
+    }
+}
+
+// 重置进程的峰值RSS（Linux 4.0+），失败时读到的是整个进程生命周期的峰值
+static void reset_peak_rss(void) {
+    FILE* f = fopen("/proc/self/clear_refs", "w");
+    if (f) {
+        fputs("5", f);
+        fclose(f);
+    }
+}
+
+// 读取/proc/self/status中的VmHWM（KB），失败返回-1
+// getrusage的ru_maxrss还包含exec之前父进程的峰值，小规模测试时会被它掩盖，因此优先使用VmHWM
+static long read_vm_hwm_kb(void) {
+    FILE* f = fopen("/proc/self/status", "r");
+    if (f == NULL) return -1;
+    char line[256];
+    long kb = -1;
+    while (fgets(line, sizeof(line), f)) {
+        if (strncmp(line, "VmHWM:", 6) == 0) {
+            kb = strtol(line + 6, NULL, 10);
+            break;
+        }
+    }
+    fclose(f);
+    return kb;
+}
+
+void perf_counters_start(void) {
+    reset_peak_rss();
+    for (int i = 0; i < PERF_COUNTER_COUNT; i++) {
+        if (counter_fds[i] < 0) continue;
+        ioctl(counter_fds[i], PERF_EVENT_IOC_RESET, 0);
+        ioctl(counter_fds[i], PERF_EVENT_IOC_ENABLE, 0);
+    }
+}
+
+void perf_counters_stop(PerfSample* sample) {
+    for (int i = 0; i < PERF_COUNTER_COUNT; i++) {
+        if (counter_fds[i] >= 0) ioctl(counter_fds[i], PERF_EVENT_IOC_DISABLE, 0);
+    }
+
+    perf_sample_clear(sample);
+    for (int i = 0; i < PERF_COUNTER_COUNT; i++) {
+        CounterReading reading;
+        if (counter_fds[i] < 0 || read(counter_fds[i], &reading, sizeof(reading)) != sizeof(reading)) {
+            continue;
+        }
+        if (reading.time_running == 0) continue;   // 计数器一直没有被调度到
+        double scale = (double)reading.time_enabled / (double)reading.time_running;
+        sample->counters[i] = (long long)((double)reading.value * scale);
+    }
+
+    sample->max_rss_kb = read_vm_hwm_kb();
+    struct rusage usage;
+    if (sample->max_rss_kb < 0 && getrusage(RUSAGE_SELF, &usage) == 0) {
+        sample->max_rss_kb = usage.ru_maxrss;
+    }
+}
+
+#else
+
+// 非Linux平台没有perf_event_open，只记录峰值RSS
+int perf_counters_open(void) {
+    return 0;
+}
+
+void perf_counters_close(void) {
+}
+
+void perf_counters_start(void) {
+}
+
+void perf_counters_stop(PerfSample* sample) {
+    perf_sample_clear(sample);
+    struct rusage usage;
+    if (getrusage(RUSAGE_SELF, &usage) == 0) {
+        #ifdef __APPLE__
+        sample->max_rss_kb = usage.ru_maxrss / 1024;   // macOS以字节为单位
+        #else
+        sample->max_rss_kb = usage.ru_maxrss;
+        #endif
+    }
+}
+
+#endif
@@ -0,0 +1,36 @@
+#ifndef PERF_COUNTERS_H
+#define PERF_COUNTERS_H
+
+#include <stddef.h>
+
+// 硬件计数器（perf_event_open），下标与日志列顺序一致
+typedef enum {
+    PERF_COUNTER_CYCLES = 0,        // CPU周期
+    PERF_COUNTER_INSTRUCTIONS,      // 退休指令数
+    PERF_COUNTER_BRANCH_MISSES,     // 分支预测失败次数
+    PERF_COUNTER_LLC_MISSES,        // 末级缓存（LLC）缺失次数
+    PERF_COUNTER_COUNT
+} PerfCounter;
+
+// 一次测量的结果，不可用的计数器为-1
+typedef struct {
+    long long counters[PERF_COUNTER_COUNT];
+    long max_rss_kb;                // 进程峰值常驻内存（KB，VmHWM或getrusage），不可用时为-1
+} PerfSample;
+
+// 打开所有可用的计数器（应在创建OpenMP线程池之前调用，之后创建的线程才会被继承计数）
+// 返回成功打开的计数器个数；内核不允许时返回0，测量退化为只记录峰值RSS
+int perf_counters_open(void);
+void perf_counters_close(void);
+
+// 计数器名称（日志列名）
+const char* perf_counter_name(PerfCounter counter);
+
+// 清零并启动计数器，尽量重置峰值RSS（/proc/self/clear_refs）
+void perf_counters_start(void);
+// 停止计数器并读出结果
+void perf_counters_stop(PerfSample* sample);
+// 所有字段置为-1（未启用测量时写入日志）
+void perf_sample_clear(PerfSample* sample);
+
+#endif
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+列式结果存储：把性能日志导入按运行日期和算法分区的Parquet数据集
+目录布局（hive分区）: <store>/RunDate=YYYY-MM-DD/Algorithm=<算法>/<RunId>-<N>.parquet
+每个文件带有固定的列类型和本次运行的元数据（提交、编译参数、优化级别、CPU型号），
+读取时把过滤条件下推到分区和Parquet行组统计，只读取需要的分区和列
+
+pyarrow 是可选依赖，只在用到存储的函数内部导入: pip install pyarrow
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+DEFAULT_STORE = '../results/store'
+DEFAULT_METADATA_FILE = 'run_metadata.txt'   # C程序写在日志旁边的运行元数据
+
+# 分区列（目录名），其余列写入Parquet文件
+PARTITION_COLUMNS = ['RunDate', 'Algorithm']
+# 每个文件schema元数据中保存运行元数据的键
+METADATA_KEY = b'sort_run'
+
+def _require_pyarrow():
+    """检查pyarrow是否已安装（不导入），未安装时给出安装提示"""
+    from importlib.util import find_spec
+    if find_spec('pyarrow') is None:
+        raise RuntimeError("列式结果存储需要pyarrow，请运行: pip install pyarrow")
+
+def store_schema():
+    """数据集的列类型（与analyze_results.LOG_DTYPES一致，另加RunId和分区列）"""
+    import pyarrow as pa
+    return pa.schema([
+        ('RunId', pa.string()),
+        ('PivotStrategy', pa.string()),
+        ('Distribution', pa.string()),
+        ('Size', pa.int32()),
+        ('Time(ms)', pa.float32()),
+        ('Sorted', pa.bool_()),
+        ('Repeat', pa.int32()),
+        ('Threads', pa.int32()),
+        ('TaskDepth', pa.int32()),
+        ('AuxBytes', pa.int64()),
+        ('Cycles', pa.int64()),
+        ('Instructions', pa.int64()),
+        ('BranchMisses', pa.int64()),
+        ('LLCMisses', pa.int64()),
+        ('MaxRSSKB', pa.int64()),
+        ('Build', pa.string()),
+        ('Batch', pa.int32()),
+        ('TimedOut', pa.bool_()),
+        ('DType', pa.string()),
+        ('RunDate', pa.string()),
+        ('Algorithm', pa.string()),
+    ])
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([(col, pa.string()) for col in PARTITION_COLUMNS]), flavor='hive')
+
+def read_metadata_file(path):
+    """读取C程序写出的key=value格式运行元数据，文件不存在时返回空字典"""
+    metadata = {}
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                key, sep, value = line.rstrip('\n').partition('=')
+                if sep:
+                    metadata[key] = value
+    return metadata
+
+def _git_commit():
+    """当前仓库的提交（有未提交修改时加-dirty），不在git仓库中时返回unknown"""
+    repo = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repo,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def _cpu_model():
+    """CPU型号（Linux读/proc/cpuinfo，其他平台用platform.processor）"""
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or 'unknown'
+
+def collect_run_metadata(log_file, metadata_file=None):
+    """汇总一次运行的元数据：C程序写出的编译参数和配置 + 提交、CPU型号、主机名"""
+    if metadata_file is None:
+        metadata_file = os.path.join(os.path.dirname(log_file), DEFAULT_METADATA_FILE)
+    metadata = read_metadata_file(metadata_file)
+    if 'started_at' not in metadata:
+        # 没有元数据文件（旧日志）时用日志的修改时间
+        metadata['started_at'] = datetime.fromtimestamp(os.path.getmtime(log_file)).isoformat(timespec='seconds')
+    metadata.setdefault('opt_level', 'unknown')
+    metadata.setdefault('cflags', 'unknown')
+    metadata['commit'] = _git_commit()
+    metadata['cpu_model'] = _cpu_model()
+    metadata['host'] = platform.node()
+    metadata['source_log'] = os.path.abspath(log_file)
+    started = datetime.fromisoformat(metadata['started_at'])
+    metadata['run_date'] = started.strftime('%Y-%m-%d')
+    metadata['run_id'] = f"{started:%Y%m%dT%H%M%S}-{metadata['host'] or 'local'}"
+    return metadata
+
+def _delete_run_files(store_dir, run_id):
+    """删除数据集中属于run_id的所有文件（<RunId>-<N>.parquet，可能分布在任意分区），返回删除的文件数"""
+    import re
+    pattern = re.compile(re.escape(run_id) + r'-\d+\.parquet')
+    deleted = 0
+    for root, _, files in os.walk(store_dir):
+        for name in files:
+            if pattern.fullmatch(name):
+                os.remove(os.path.join(root, name))
+                deleted += 1
+    return deleted
+
+def write_run(raw, store_dir, metadata):
+    """把一次运行的原始结果表（每次计时一行）写入数据集，返回写入的行数
+
+    同一RunId重复导入时先删除该运行已有的全部文件再写入（新的导入可能少了某些算法分区或文件），
+    不影响其他运行。
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    schema = store_schema()
+    data = raw.assign(RunId=metadata['run_id'], RunDate=metadata['run_date'])
+    for col in ('Algorithm', 'PivotStrategy', 'Distribution', 'Build', 'DType'):
+        data[col] = data[col].astype(str)
+    table = pa.Table.from_pandas(data[schema.names], schema=schema, preserve_index=False)
+    table = table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata).encode()})
+    if os.path.isdir(store_dir):
+        _delete_run_files(store_dir, metadata['run_id'])
+    ds.write_dataset(table, store_dir, format='parquet', partitioning=_partitioning(),
+                     basename_template=f"{metadata['run_id']}-{{i}}.parquet",
+                     existing_data_behavior='overwrite_or_ignore')
+    return table.num_rows
+
+def import_log(log_file, store_dir=DEFAULT_STORE, metadata_file=None):
+    """把性能日志（含日志分片）导入数据集，返回(行数, 运行元数据)"""
+    from analyze_results import read_log_frame
+    metadata = collect_run_metadata(log_file, metadata_file)
+    rows = write_run(read_log_frame(log_file), store_dir, metadata)
+    return rows, metadata
+
+def _filter_expression(algorithms=None, since=None, until=None, run_ids=None, distributions=None):
+    """把过滤条件组合为pyarrow表达式：分区列用于裁剪目录，其余列下推到行组统计"""
+    import pyarrow.dataset as ds
+    conditions = []
+    if algorithms:
+        conditions.append(ds.field('Algorithm').isin(list(algorithms)))
+    if since:
+        conditions.append(ds.field('RunDate') >= since)
+    if until:
+        conditions.append(ds.field('RunDate') <= until)
+    if run_ids:
+        conditions.append(ds.field('RunId').isin(list(run_ids)))
+    if distributions:
+        conditions.append(ds.field('Distribution').isin(list(distributions)))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def open_dataset(store_dir=DEFAULT_STORE):
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+    if not os.path.isdir(store_dir):
+        raise FileNotFoundError(f"结果存储不存在: {store_dir}")
+    return ds.dataset(store_dir, format='parquet', partitioning=_partitioning(), schema=store_schema())
+
+def load_results(store_dir=DEFAULT_STORE, columns=None, **filters):
+    """按过滤条件读取原始结果表（只读取匹配的分区和columns列），返回带类型的DataFrame"""
+    from analyze_results import LOG_COLUMN_DEFAULTS
+    dataset = open_dataset(store_dir)
+    table = dataset.to_table(columns=columns, filter=_filter_expression(**filters))
+    df = table.to_pandas()
+    # 某列加入日志格式之前导入的运行中该列为空，按旧日志的默认值补齐
+    for col, default in LOG_COLUMN_DEFAULTS.items():
+        if col in df.columns and df[col].isna().any():
+            df[col] = df[col].fillna(default)
+    for col in ('Algorithm', 'PivotStrategy', 'Distribution', 'Build', 'DType', 'RunDate', 'RunId'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+def list_runs(store_dir=DEFAULT_STORE, **filters):
+    """读取每次运行的元数据（只读文件尾部的schema，不读数据），按开始时间排序"""
+    dataset = open_dataset(store_dir)
+    runs = {}
+    for fragment in dataset.get_fragments(filter=_filter_expression(**filters)):
+        metadata = fragment.physical_schema.metadata or {}
+        if METADATA_KEY in metadata:
+            run = json.loads(metadata[METADATA_KEY])
+            runs.setdefault(run['run_id'], run)
+    return sorted(runs.values(), key=lambda run: run['started_at'])
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Partitioned Parquet store for sorting benchmark results')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='dataset directory (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help='import a performance log (and its shards) as one run')
+    import_parser.add_argument('--log', default='../results/performance_log.txt',
+                               help='performance log to import (default: %(default)s)')
+    import_parser.add_argument('--metadata', default=None,
+                               help=f'run metadata written by sort_analysis (default: {DEFAULT_METADATA_FILE} '
+                                    'next to the log)')
+    runs_parser = commands.add_parser('runs', help='list stored runs with their metadata')
+    runs_parser.add_argument('--since', default=None, help='only runs on or after this date (YYYY-MM-DD)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """主函数，返回进程退出码"""
+    args = parse_args(argv)
+    try:
+        if args.command == 'import':
+            rows, metadata = import_log(args.log, args.store, args.metadata)
+            print(f"✓ 导入 {rows} 条记录: 运行 {metadata['run_id']} ({metadata['opt_level']}, "
+                  f"提交 {metadata['commit']}) -> {args.store}")
+        else:
+            for run in list_runs(args.store, since=args.since):
+                print(f"{run['run_id']:<32} {run['started_at']}  {run['opt_level']:<6} {run['commit']:<14} "
+                      f"{run['cpu_model']}")
+                print(f"    cflags: {run['cflags']}")
+    except (RuntimeError, FileNotFoundError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
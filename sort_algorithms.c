@@ -1,4 +1,6 @@
 #include "sort_algorithms.h"
+#include <stdint.h>
+#include <string.h>
 
 // ============================================================================
 // 基础辅助函数
@@ -12,18 +14,6 @@ void swap_elements(int* a, int* b) {
     *b = temp;
 }
 
-// 验证数组是否已排序
-int is_sorted(int arr[], int n) {
-    if (arr == NULL || n <= 0) return 0;
-    
-    for (int i = 1; i < n; i++) {
-        if (arr[i] < arr[i - 1]) {
-            return 0;
-        }
-    }
-    return 1;
-}
-
 // 复制数组
 SortError copy_array(int dest[], int src[], int n) {
     if (dest == NULL || src == NULL) return SORT_ERROR_NULL_POINTER;
@@ -48,6 +38,62 @@ void print_array(int arr[], int n) {
     printf("]\n");
 }
 
+// ============================================================================
+// 辅助内存统计
+// ============================================================================
+
+static size_t aux_heap_current = 0;   // 当前仍在使用的临时缓冲区字节数
+static size_t aux_heap_peak = 0;      // 临时缓冲区峰值
+static size_t aux_stack_peak = 0;     // 递归/显式栈峰值
+static uintptr_t aux_stack_base = 0;   // 最外层栈帧的地址
+
+void sort_memory_reset(void) {
+    aux_heap_current = 0;
+    aux_heap_peak = 0;
+    aux_stack_peak = 0;
+    aux_stack_base = 0;
+}
+
+size_t sort_memory_peak(void) {
+    return aux_heap_peak + aux_stack_peak;
+}
+
+// 分配临时缓冲区并计入统计（并行归并的多个任务会同时调用，使用原子操作）
+static void* aux_malloc(size_t bytes) {
+    void* ptr = malloc(bytes);
+    if (ptr == NULL) return NULL;
+    size_t current = __atomic_add_fetch(&aux_heap_current, bytes, __ATOMIC_RELAXED);
+    size_t peak = __atomic_load_n(&aux_heap_peak, __ATOMIC_RELAXED);
+    while (current > peak &&
+           !__atomic_compare_exchange_n(&aux_heap_peak, &peak, current, 1, __ATOMIC_RELAXED, __ATOMIC_RELAXED)) {
+    }
+    return ptr;
+}
+
+static void aux_free(void* ptr, size_t bytes) {
+    if (ptr == NULL) return;
+    __atomic_sub_fetch(&aux_heap_current, bytes, __ATOMIC_RELAXED);
+    free(ptr);
+}
+
+// 记录显式栈的使用量（样本排序的各个桶在不同线程中排序，使用原子操作）
+static void aux_note_stack_bytes(size_t bytes) {
+    size_t peak = __atomic_load_n(&aux_stack_peak, __ATOMIC_RELAXED);
+    while (bytes > peak &&
+           !__atomic_compare_exchange_n(&aux_stack_peak, &peak, bytes, 1, __ATOMIC_RELAXED, __ATOMIC_RELAXED)) {
+    }
+}
+
+// 记录递归调用栈的深度：marker为当前栈帧中局部变量的地址（栈向低地址增长）
+static void aux_note_stack_frame(const char* marker) {
+    uintptr_t address = (uintptr_t)marker;
+    if (aux_stack_base == 0) {
+        aux_stack_base = address;
+    } else if (address < aux_stack_base) {
+        aux_note_stack_bytes((size_t)(aux_stack_base - address));
+    }
+}
+
 // 获取pivot策略名称
 const char* pivot_strategy_name(PivotStrategy strategy) {
     switch(strategy) {
@@ -56,270 +102,197 @@ const char* pivot_strategy_name(PivotStrategy strategy) {
         case PIVOT_MIDDLE: return "Middle";
         case PIVOT_RANDOM: return "Random";
         case PIVOT_MEDIAN_OF_THREE: return "Median3";
+        case PIVOT_NINTHER: return "Ninther";
+        case PIVOT_THREE_WAY: return "ThreeWay";
+        case PIVOT_INTROSORT: return "Introsort";
         default: return "Unknown";
     }
 }
 
 // ============================================================================
-// Pivot选择函数
+// 各元素类型共用的常量和辅助函数
 // ============================================================================
 
-// 选择pivot元素
-int select_pivot(int arr[], int low, int high, PivotStrategy strategy) {
-    if (low > high) return low;
-    
-    switch(strategy) {
-        case PIVOT_FIRST:
-            return low;
-            
-        case PIVOT_LAST:
-            return high;
-            
-        case PIVOT_MIDDLE:
-            return low + (high - low) / 2;
-            
-        case PIVOT_RANDOM:
-            // 使用简单的伪随机数生成（不依赖stdlib的rand）
-            static unsigned int seed = 123456789;
-            seed = (seed * 1103515245 + 12345) & 0x7fffffff;
-            return low + (seed % (high - low + 1));
-            
-        case PIVOT_MEDIAN_OF_THREE:
-            {
-                int mid = low + (high - low) / 2;
-                
-                // 对三个元素进行排序，取中值
-                if (arr[low] > arr[mid]) 
-                    swap_elements(&arr[low], &arr[mid]);
-                if (arr[low] > arr[high]) 
-                    swap_elements(&arr[low], &arr[high]);
-                if (arr[mid] > arr[high]) 
-                    swap_elements(&arr[mid], &arr[high]);
-                
-                return mid;
-            }
-            
-        default:
-            return low;
+// 区间长度不小于该值时九数取中，否则退化为三数取中
+#define NINTHER_THRESHOLD 40
+
+// 内省排序的递归深度上限：2 * floor(log2(n))
+static int introsort_depth_limit(int n) {
+    int depth = 0;
+    while (n > 1) {
+        n >>= 1;
+        depth++;
     }
+    return 2 * depth;
 }
 
-// ============================================================================
-// 快速排序分区函数
-// ============================================================================
+// 非递归快速排序显式栈的容量
+#define QUICK_SORT_STACK_CAPACITY 64
 
-// 分区函数
-int partition_array(int arr[], int low, int high, PivotStrategy strategy) {
-    if (low >= high) return low;
-    
-    // 选择pivot
-    int pivot_index = select_pivot(arr, low, high, strategy);
-    int pivot_value = arr[pivot_index];
-    
-    // 将pivot移到末尾
-    swap_elements(&arr[pivot_index], &arr[high]);
-    
-    int i = low - 1;
-    
-    for (int j = low; j < high; j++) {
-        if (arr[j] <= pivot_value) {
-            i++;
-            swap_elements(&arr[i], &arr[j]);
-        }
+typedef struct {
+    int low;
+    int high;
+    int depth_limit;  // 内省排序剩余的划分深度
+} StackItem;
+
+// 小于该长度的子数组不再创建并行任务
+#define MERGE_PARALLEL_THRESHOLD 1000
+
+// 子数组长度不超过该值时改用插入排序
+#define MERGE_INSERTION_CUTOFF 32
+
+// 基数排序每趟处理的位数和桶数（按字节分配）
+#define RADIX_BITS 8
+#define RADIX_BUCKETS (1 << RADIX_BITS)
+
+// 样本排序：每个线程的桶数（多于线程数，动态调度时负载更均衡）、每个桶的样本数，小于阈值的数组直接内省排序
+#define SAMPLE_SORT_BUCKETS_PER_THREAD 4
+#define SAMPLE_SORT_OVERSAMPLING 32
+#define SAMPLE_SORT_THRESHOLD 4096
+
+// 有符号整数翻转符号位后按无符号比较，顺序不变
+#define SIGNED_RADIX_KEY_32(x) ((uint32_t)(x) ^ UINT32_C(0x80000000))
+#define SIGNED_RADIX_KEY_64(x) ((uint64_t)(x) ^ UINT64_C(0x8000000000000000))
+
+// 双精度浮点的基数排序键：正数翻转符号位，负数翻转全部位，无符号顺序与数值顺序一致（不考虑NaN）
+static inline uint64_t double_radix_key(double value) {
+    uint64_t bits;
+    memcpy(&bits, &value, sizeof(bits));
+    return (bits & UINT64_C(0x8000000000000000)) ? ~bits : bits ^ UINT64_C(0x8000000000000000);
+}
+
+// 解析任务深度上限：自动时取 ceil(log2(线程数)) + 2，任务数约为线程数的4倍以便负载均衡
+int merge_sort_effective_task_depth(int task_depth) {
+    if (task_depth != MERGE_TASK_DEPTH_AUTO) {
+        return task_depth < 0 ? 0 : task_depth;
     }
     
-    // 将pivot放到正确位置
-    swap_elements(&arr[i + 1], &arr[high]);
-    return i + 1;
+    int threads = 1;
+    #ifdef _OPENMP
+    threads = omp_get_max_threads();
+    #endif
+    if (threads <= 1) return 0;
+    
+    int depth = 0;
+    while ((1 << depth) < threads) depth++;
+    return depth + 2;
 }
 
 // ============================================================================
-// 快速排序实现
+// 按元素类型实例化排序内核（sort_template.h）
+// 测试数据统一生成为int，其他类型由int值保序转换得到：重复值和有序性与int数据完全一致
 // ============================================================================
 
-// 递归快速排序
-SortError quick_sort_recursive(int arr[], int low, int high, PivotStrategy strategy) {
-    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
-    if (low < 0 || high < 0 || low > high) return SORT_ERROR_INVALID_SIZE;
-    
-    if (low < high) {
-        int pivot_index = partition_array(arr, low, high, strategy);
-        
-        // 递归排序左半部分
-        SortError left_error = quick_sort_recursive(arr, low, pivot_index - 1, strategy);
-        if (left_error != SORT_SUCCESS) return left_error;
-        
-        // 递归排序右半部分
-        SortError right_error = quick_sort_recursive(arr, pivot_index + 1, high, strategy);
-        if (right_error != SORT_SUCCESS) return right_error;
-    }
-    
-    return SORT_SUCCESS;
-}
+// 32位整数
+#define SORT_TYPE int
+#define SORT_SUFFIX i32
+#define SORT_LESS(a, b) ((a) < (b))
+#define SORT_FROM_INT(dest, value, position) ((dest) = (value))
+#define SORT_RADIX_KEY(x) SIGNED_RADIX_KEY_32(x)
+#define SORT_RADIX_KEY_BYTES 4
+#include "sort_template.h"
 
-// 非递归快速排序（使用栈）
-typedef struct {
-    int low;
-    int high;
-} StackItem;
+// 64位整数：值放大2^31倍，占满64位键的高位
+#define SORT_TYPE int64_t
+#define SORT_SUFFIX i64
+#define SORT_LESS(a, b) ((a) < (b))
+#define SORT_FROM_INT(dest, value, position) ((dest) = (int64_t)(value) * 2147483648LL)
+#define SORT_RADIX_KEY(x) SIGNED_RADIX_KEY_64(x)
+#define SORT_RADIX_KEY_BYTES 8
+#include "sort_template.h"
 
-SortError quick_sort_iterative(int arr[], int low, int high, PivotStrategy strategy) {
-    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
-    if (low < 0 || high < 0 || low > high) return SORT_ERROR_INVALID_SIZE;
-    
-    // 创建栈
-    int stack_size = high - low + 1;
-    StackItem* stack = (StackItem*)malloc(stack_size * sizeof(StackItem));
-    if (stack == NULL) return SORT_ERROR_MEMORY_ALLOC;
-    
-    int top = -1;
-    
-    // 初始区间入栈
-    stack[++top].low = low;
-    stack[top].high = high;
-    
-    while (top >= 0) {
-        // 弹出区间
-        int current_low = stack[top].low;
-        int current_high = stack[top--].high;
-        
-        if (current_low < current_high) {
-            int pivot_index = partition_array(arr, current_low, current_high, strategy);
-            
-            // 将左区间入栈
-            if (pivot_index - 1 > current_low) {
-                stack[++top].low = current_low;
-                stack[top].high = pivot_index - 1;
-            }
-            
-            // 将右区间入栈
-            if (pivot_index + 1 < current_high) {
-                stack[++top].low = pivot_index + 1;
-                stack[top].high = current_high;
-            }
-        }
-    }
-    
-    free(stack);
-    return SORT_SUCCESS;
+// 双精度浮点：值除以1024，带小数部分且可精确表示
+#define SORT_TYPE double
+#define SORT_SUFFIX f64
+#define SORT_LESS(a, b) ((a) < (b))
+#define SORT_FROM_INT(dest, value, position) ((dest) = (double)(value) / 1024.0)
+#define SORT_RADIX_KEY(x) double_radix_key(x)
+#define SORT_RADIX_KEY_BYTES 8
+#include "sort_template.h"
+
+// 16字节键值记录：只按键比较，index记录元素在原数组中的位置
+#define SORT_TYPE KeyIndexRecord
+#define SORT_SUFFIX kv
+#define SORT_LESS(a, b) ((a).key < (b).key)
+#define SORT_FROM_INT(dest, value, position) \
+    ((dest).key = (int64_t)(value) * 2147483648LL, (dest).index = (position))
+#define SORT_RADIX_KEY(x) SIGNED_RADIX_KEY_64((x).key)
+#define SORT_RADIX_KEY_BYTES 8
+#include "sort_template.h"
+
+// ============================================================================
+// 元素类型函数表
+// ============================================================================
+
+#define SORT_KERNELS(type_name, type, suffix) \
+    { type_name, sizeof(type), quick_sort_recursive_any_##suffix, quick_sort_iterative_any_##suffix, \
+      merge_sort_parallel_any_##suffix, merge_sort_buffered_any_##suffix, radix_sort_any_##suffix, \
+      sample_sort_any_##suffix, is_sorted_any_##suffix, from_int_##suffix }
+
+static const SortKernels sort_kernel_table[ELEMENT_TYPE_COUNT] = {
+    [ELEMENT_INT32] = SORT_KERNELS("int32", int, i32),
+    [ELEMENT_INT64] = SORT_KERNELS("int64", int64_t, i64),
+    [ELEMENT_FLOAT64] = SORT_KERNELS("float64", double, f64),
+    [ELEMENT_RECORD] = SORT_KERNELS("record", KeyIndexRecord, kv),
+};
+
+// 获取元素类型的排序函数表，类型无效时返回NULL
+const SortKernels* sort_kernels(ElementType type) {
+    if (type < 0 || type >= ELEMENT_TYPE_COUNT) return NULL;
+    return &sort_kernel_table[type];
+}
+
+// 获取元素类型名称（与日志DType列一致）
+const char* element_type_name(ElementType type) {
+    const SortKernels* kernels = sort_kernels(type);
+    return kernels != NULL ? kernels->name : "Unknown";
 }
 
 // ============================================================================
-// 归并排序实现
+// int接口（32位整数实例）
 // ============================================================================
 
-// 合并两个有序数组
-void merge_arrays(int arr[], int left, int mid, int right) {
-    int left_size = mid - left + 1;
-    int right_size = right - mid;
-    
-    // 创建临时数组
-    int* left_arr = (int*)malloc(left_size * sizeof(int));
-    int* right_arr = (int*)malloc(right_size * sizeof(int));
-    
-    if (left_arr == NULL || right_arr == NULL) {
-        if (left_arr) free(left_arr);
-        if (right_arr) free(right_arr);
-        return;
-    }
-    
-    // 复制数据到临时数组
-    for (int i = 0; i < left_size; i++)
-        left_arr[i] = arr[left + i];
-    for (int j = 0; j < right_size; j++)
-        right_arr[j] = arr[mid + 1 + j];
-    
-    // 合并临时数组回原数组
-    int i = 0, j = 0, k = left;
-    while (i < left_size && j < right_size) {
-        if (left_arr[i] <= right_arr[j]) {
-            arr[k] = left_arr[i];
-            i++;
-        } else {
-            arr[k] = right_arr[j];
-            j++;
-        }
-        k++;
-    }
-    
-    // 复制剩余元素
-    while (i < left_size) {
-        arr[k] = left_arr[i];
-        i++;
-        k++;
-    }
-    
-    while (j < right_size) {
-        arr[k] = right_arr[j];
-        j++;
-        k++;
-    }
-    
-    free(left_arr);
-    free(right_arr);
+// 验证数组是否已排序
+int is_sorted(int arr[], int n) {
+    return is_sorted_i32(arr, n);
 }
 
-// 串行归并排序（内部使用）
-static SortError merge_sort_serial(int arr[], int left, int right) {
-    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
-    if (left < 0 || right < 0 || left > right) return SORT_ERROR_INVALID_SIZE;
-    
-    if (left < right) {
-        int mid = left + (right - left) / 2;
-        
-        // 递归排序左半部分
-        SortError left_error = merge_sort_serial(arr, left, mid);
-        if (left_error != SORT_SUCCESS) return left_error;
-        
-        // 递归排序右半部分
-        SortError right_error = merge_sort_serial(arr, mid + 1, right);
-        if (right_error != SORT_SUCCESS) return right_error;
-        
-        // 合并两个有序部分
-        merge_arrays(arr, left, mid, right);
-    }
-    
-    return SORT_SUCCESS;
+// 递归快速排序
+SortError quick_sort_recursive(int arr[], int low, int high, PivotStrategy strategy) {
+    return quick_sort_recursive_i32(arr, low, high, strategy);
+}
+
+// 非递归快速排序（使用固定容量的显式栈）
+SortError quick_sort_iterative(int arr[], int low, int high, PivotStrategy strategy) {
+    return quick_sort_iterative_i32(arr, low, high, strategy);
 }
 
-// 并行归并排序
+// 并行归并排序（指定任务深度上限，0表示完全串行）
+SortError merge_sort_parallel_depth(int arr[], int left, int right, int task_depth) {
+    return merge_sort_parallel_depth_i32(arr, left, right, task_depth);
+}
+
+// 并行归并排序（自动选择任务深度）
 SortError merge_sort_parallel(int arr[], int left, int right) {
-    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
-    if (left < 0 || right < 0 || left > right) return SORT_ERROR_INVALID_SIZE;
-    
-    // 设置阈值，小数组使用串行版本
-    const int PARALLEL_THRESHOLD = 1000;
-    
-    if (right - left < PARALLEL_THRESHOLD) {
-        return merge_sort_serial(arr, left, right);
-    }
-    
-    if (left < right) {
-        int mid = left + (right - left) / 2;
-        
-        #ifdef _OPENMP
-        // 使用OpenMP并行处理两个子数组
-        #pragma omp parallel sections
-        {
-            #pragma omp section
-            {
-                merge_sort_parallel(arr, left, mid);
-            }
-            
-            #pragma omp section
-            {
-                merge_sort_parallel(arr, mid + 1, right);
-            }
-        }
-        #else
-        // 如果没有OpenMP支持，使用串行版本
-        merge_sort_parallel(arr, left, mid);
-        merge_sort_parallel(arr, mid + 1, right);
-        #endif
-        
-        // 合并结果
-        merge_arrays(arr, left, mid, right);
-    }
-    
-    return SORT_SUCCESS;
+    return merge_sort_parallel_depth(arr, left, right, MERGE_TASK_DEPTH_AUTO);
+}
+
+// 单缓冲区归并排序（指定任务深度上限，0表示完全串行）
+SortError merge_sort_buffered_depth(int arr[], int left, int right, int task_depth) {
+    return merge_sort_buffered_depth_i32(arr, left, right, task_depth);
+}
+
+// 单缓冲区归并排序（自动选择任务深度）
+SortError merge_sort_buffered(int arr[], int left, int right) {
+    return merge_sort_buffered_depth(arr, left, right, MERGE_TASK_DEPTH_AUTO);
+}
+
+// LSD基数排序
+SortError radix_sort(int arr[], int left, int right) {
+    return radix_sort_i32(arr, left, right);
+}
+
+// 并行样本排序（线程数取OpenMP的最大线程数）
+SortError sample_sort(int arr[], int left, int right) {
+    return sample_sort_i32(arr, left, right);
 }
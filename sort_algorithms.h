@@ -3,6 +3,7 @@
 
 #include <stdio.h>
 #include <stdlib.h>
+#include <stdint.h>
 #include <time.h>
 
 #ifdef _OPENMP
@@ -23,7 +24,10 @@ typedef enum {
     PIVOT_LAST,            // 最后一个元素  
     PIVOT_MIDDLE,          // 中间元素
     PIVOT_RANDOM,          // 随机元素
-    PIVOT_MEDIAN_OF_THREE  // 三数取中
+    PIVOT_MEDIAN_OF_THREE, // 三数取中
+    PIVOT_NINTHER,         // Tukey九数取中（三组三数中值的中值）
+    PIVOT_THREE_WAY,       // 三数取中 + 三路划分（荷兰国旗），重复元素不再退化
+    PIVOT_INTROSORT        // 九数取中 + 三路划分，递归深度超过2*log2(n)时改用堆排序
 } PivotStrategy;
 
 // 函数声明
@@ -32,19 +36,96 @@ typedef enum {
 SortError quick_sort_recursive(int arr[], int low, int high, PivotStrategy strategy);
 SortError quick_sort_iterative(int arr[], int low, int high, PivotStrategy strategy);
 
+// 并行归并排序的任务深度上限：自动按线程数选择
+#define MERGE_TASK_DEPTH_AUTO -1
+
 // 归并排序函数
 SortError merge_sort_parallel(int arr[], int left, int right);
+SortError merge_sort_parallel_depth(int arr[], int left, int right, int task_depth);
+int merge_sort_effective_task_depth(int task_depth);
+SortError merge_sort_buffered(int arr[], int left, int right);
+SortError merge_sort_buffered_depth(int arr[], int left, int right, int task_depth);
+
+// 非比较排序和样本排序
+SortError radix_sort(int arr[], int left, int right);   // LSD基数排序（8位一趟，单块辅助缓冲区）
+SortError sample_sort(int arr[], int left, int right);  // OpenMP并行样本排序
 
 // 辅助函数
+void swap_elements(int* a, int* b);
 int is_sorted(int arr[], int n);
 SortError copy_array(int dest[], int src[], int n);
 void print_array(int arr[], int n);
 const char* pivot_strategy_name(PivotStrategy strategy);
 
-// 内部使用的辅助函数（不暴露给外部）
-void swap_elements(int* a, int* b);
-int select_pivot(int arr[], int low, int high, PivotStrategy strategy);
-int partition_array(int arr[], int low, int high, PivotStrategy strategy);
-void merge_arrays(int arr[], int left, int mid, int right);
+// 辅助内存统计：排序前调用sort_memory_reset，排序后sort_memory_peak返回本次排序的
+// 辅助内存峰值（字节）= 堆上临时缓冲区的峰值 + 快速排序记录区间所用的栈空间峰值
+void sort_memory_reset(void);
+size_t sort_memory_peak(void);
+
+// ============================================================================
+// 多种元素类型的排序内核（由sort_template.h按类型生成）
+// ============================================================================
+
+// 元素类型（测试数据文件始终为int32，其他类型在内存中由int值保序转换得到）
+typedef enum {
+    ELEMENT_INT32,    // 32位整数
+    ELEMENT_INT64,    // 64位整数
+    ELEMENT_FLOAT64,  // 双精度浮点
+    ELEMENT_RECORD,   // 16字节键值记录（按key排序）
+    ELEMENT_TYPE_COUNT
+} ElementType;
+
+// 16字节记录：64位键 + 元素在原数组中的下标
+typedef struct {
+    int64_t key;
+    int64_t index;
+} KeyIndexRecord;
+
+// 类型无关的排序函数（arr指向对应元素类型的数组）
+typedef SortError (*QuickSortFunc)(void* arr, int low, int high, PivotStrategy strategy);
+typedef SortError (*MergeSortFunc)(void* arr, int left, int right, int task_depth);
+typedef SortError (*RangeSortFunc)(void* arr, int left, int right);
+
+// 一种元素类型的全部排序内核
+typedef struct {
+    const char* name;                     // 类型名称（日志DType列）
+    size_t element_size;                  // 每个元素的字节数
+    QuickSortFunc quick_sort_recursive;
+    QuickSortFunc quick_sort_iterative;
+    MergeSortFunc merge_sort_parallel;    // 并行归并排序（每次合并分配临时数组）
+    MergeSortFunc merge_sort_buffered;    // 单缓冲区归并排序
+    RangeSortFunc radix_sort;             // LSD基数排序
+    RangeSortFunc sample_sort;            // 并行样本排序
+    int (*is_sorted)(const void* arr, int n);
+    void (*from_int)(void* dest, const int src[], int n);  // 由int测试数据生成n个元素
+} SortKernels;
+
+const SortKernels* sort_kernels(ElementType type);
+const char* element_type_name(ElementType type);
+
+// 各类型的排序函数（int版本即上面的int接口）
+SortError quick_sort_recursive_i64(int64_t arr[], int low, int high, PivotStrategy strategy);
+SortError quick_sort_iterative_i64(int64_t arr[], int low, int high, PivotStrategy strategy);
+SortError merge_sort_parallel_depth_i64(int64_t arr[], int left, int right, int task_depth);
+SortError merge_sort_buffered_depth_i64(int64_t arr[], int left, int right, int task_depth);
+SortError radix_sort_i64(int64_t arr[], int left, int right);
+SortError sample_sort_i64(int64_t arr[], int left, int right);
+int is_sorted_i64(const int64_t arr[], int n);
+
+SortError quick_sort_recursive_f64(double arr[], int low, int high, PivotStrategy strategy);
+SortError quick_sort_iterative_f64(double arr[], int low, int high, PivotStrategy strategy);
+SortError merge_sort_parallel_depth_f64(double arr[], int left, int right, int task_depth);
+SortError merge_sort_buffered_depth_f64(double arr[], int left, int right, int task_depth);
+SortError radix_sort_f64(double arr[], int left, int right);
+SortError sample_sort_f64(double arr[], int left, int right);
+int is_sorted_f64(const double arr[], int n);
+
+SortError quick_sort_recursive_kv(KeyIndexRecord arr[], int low, int high, PivotStrategy strategy);
+SortError quick_sort_iterative_kv(KeyIndexRecord arr[], int low, int high, PivotStrategy strategy);
+SortError merge_sort_parallel_depth_kv(KeyIndexRecord arr[], int left, int right, int task_depth);
+SortError merge_sort_buffered_depth_kv(KeyIndexRecord arr[], int left, int right, int task_depth);
+SortError radix_sort_kv(KeyIndexRecord arr[], int left, int right);
+SortError sample_sort_kv(KeyIndexRecord arr[], int left, int right);
+int is_sorted_kv(const KeyIndexRecord arr[], int n);
 
 #endif
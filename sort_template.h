@@ -0,0 +1,730 @@
+// ============================================================================
+// 排序内核模板：由 sort_algorithms.c 按元素类型多次包含，没有头文件保护
+//
+// 包含前定义：
+//   SORT_TYPE          元素类型
+//   SORT_SUFFIX        函数名后缀（i32、i64、f64、kv）
+//   SORT_LESS(a, b)    严格小于比较（记录类型只比较键）
+//   SORT_FROM_INT(dest, value, position)  由int测试数据（position为元素下标）生成一个元素，保持大小关系和重复
+//   SORT_RADIX_KEY(x)  基数排序的键：与SORT_LESS顺序一致的无符号整数
+//   SORT_RADIX_KEY_BYTES  键的字节数（基数排序的趟数上限）
+// 每次包含后这些宏会被取消定义。
+// ============================================================================
+
+#define SORT_CONCAT_(name, suffix) name##_##suffix
+#define SORT_CONCAT(name, suffix) SORT_CONCAT_(name, suffix)
+#define SORT_NAME(name) SORT_CONCAT(name, SORT_SUFFIX)
+
+// 交换两个元素
+static inline void SORT_NAME(swap)(SORT_TYPE* a, SORT_TYPE* b) {
+    SORT_TYPE temp = *a;
+    *a = *b;
+    *b = temp;
+}
+
+// 验证数组是否已排序
+int SORT_NAME(is_sorted)(const SORT_TYPE arr[], int n) {
+    if (arr == NULL || n <= 0) return 0;
+
+    for (int i = 1; i < n; i++) {
+        if (SORT_LESS(arr[i], arr[i - 1])) {
+            return 0;
+        }
+    }
+    return 1;
+}
+
+// ----------------------------------------------------------------------------
+// Pivot选择与划分
+// ----------------------------------------------------------------------------
+
+// 返回arr[a]、arr[b]、arr[c]中值的下标（不移动元素）
+static int SORT_NAME(median_of_three_index)(const SORT_TYPE arr[], int a, int b, int c) {
+    if (SORT_LESS(arr[a], arr[b])) {
+        if (SORT_LESS(arr[b], arr[c])) return b;
+        return SORT_LESS(arr[a], arr[c]) ? c : a;
+    }
+    if (SORT_LESS(arr[a], arr[c])) return a;
+    return SORT_LESS(arr[b], arr[c]) ? c : b;
+}
+
+// Tukey九数取中：在区间内等距取9个元素，分三组各取中值，再取三个中值的中值
+static int SORT_NAME(ninther_index)(const SORT_TYPE arr[], int low, int high) {
+    int mid = low + (high - low) / 2;
+    if (high - low + 1 < NINTHER_THRESHOLD) {
+        return SORT_NAME(median_of_three_index)(arr, low, mid, high);
+    }
+    int step = (high - low + 1) / 8;
+    int m1 = SORT_NAME(median_of_three_index)(arr, low, low + step, low + 2 * step);
+    int m2 = SORT_NAME(median_of_three_index)(arr, mid - step, mid, mid + step);
+    int m3 = SORT_NAME(median_of_three_index)(arr, high - 2 * step, high - step, high);
+    return SORT_NAME(median_of_three_index)(arr, m1, m2, m3);
+}
+
+// 选择pivot元素
+static int SORT_NAME(select_pivot)(SORT_TYPE arr[], int low, int high, PivotStrategy strategy) {
+    if (low > high) return low;
+
+    switch(strategy) {
+        case PIVOT_FIRST:
+            return low;
+
+        case PIVOT_LAST:
+            return high;
+
+        case PIVOT_MIDDLE:
+            return low + (high - low) / 2;
+
+        case PIVOT_RANDOM:
+            {
+                // 使用简单的伪随机数生成（不依赖stdlib的rand）
+                static unsigned int seed = 123456789;
+                seed = (seed * 1103515245 + 12345) & 0x7fffffff;
+                return low + (seed % (high - low + 1));
+            }
+
+        case PIVOT_NINTHER:
+        case PIVOT_INTROSORT:
+            return SORT_NAME(ninther_index)(arr, low, high);
+
+        case PIVOT_MEDIAN_OF_THREE:
+        case PIVOT_THREE_WAY:
+            {
+                int mid = low + (high - low) / 2;
+
+                // 对三个元素进行排序，取中值
+                if (SORT_LESS(arr[mid], arr[low]))
+                    SORT_NAME(swap)(&arr[low], &arr[mid]);
+                if (SORT_LESS(arr[high], arr[low]))
+                    SORT_NAME(swap)(&arr[low], &arr[high]);
+                if (SORT_LESS(arr[high], arr[mid]))
+                    SORT_NAME(swap)(&arr[mid], &arr[high]);
+
+                return mid;
+            }
+
+        default:
+            return low;
+    }
+}
+
+// 分区函数
+static int SORT_NAME(partition_array)(SORT_TYPE arr[], int low, int high, PivotStrategy strategy) {
+    if (low >= high) return low;
+
+    // 选择pivot并移到末尾
+    int pivot_index = SORT_NAME(select_pivot)(arr, low, high, strategy);
+    SORT_NAME(swap)(&arr[pivot_index], &arr[high]);
+    SORT_TYPE pivot_value = arr[high];
+
+    int i = low - 1;
+
+    for (int j = low; j < high; j++) {
+        if (!SORT_LESS(pivot_value, arr[j])) {
+            i++;
+            SORT_NAME(swap)(&arr[i], &arr[j]);
+        }
+    }
+
+    // 将pivot放到正确位置
+    SORT_NAME(swap)(&arr[i + 1], &arr[high]);
+    return i + 1;
+}
+
+// 三路划分（Dijkstra荷兰国旗）：划分后 [low, *lt) < pivot，[*lt, *gt] == pivot，(*gt, high] > pivot
+static void SORT_NAME(partition_three_way)(SORT_TYPE arr[], int low, int high, PivotStrategy strategy,
+                                           int* lt, int* gt) {
+    SORT_TYPE pivot_value = arr[SORT_NAME(select_pivot)(arr, low, high, strategy)];
+    int less = low, i = low, greater = high;
+
+    while (i <= greater) {
+        if (SORT_LESS(arr[i], pivot_value)) {
+            SORT_NAME(swap)(&arr[less++], &arr[i++]);
+        } else if (SORT_LESS(pivot_value, arr[i])) {
+            SORT_NAME(swap)(&arr[i], &arr[greater--]);
+        } else {
+            i++;
+        }
+    }
+
+    *lt = less;
+    *gt = greater;
+}
+
+// 对一个区间做一次划分，返回左右两个待排序子区间 [low, *left_high]、[*right_low, high]
+static void SORT_NAME(partition_range)(SORT_TYPE arr[], int low, int high, PivotStrategy strategy,
+                                       int* left_high, int* right_low) {
+    if (strategy == PIVOT_THREE_WAY || strategy == PIVOT_INTROSORT) {
+        int lt, gt;
+        SORT_NAME(partition_three_way)(arr, low, high, strategy, &lt, &gt);
+        *left_high = lt - 1;
+        *right_low = gt + 1;
+    } else {
+        int pivot_index = SORT_NAME(partition_array)(arr, low, high, strategy);
+        *left_high = pivot_index - 1;
+        *right_low = pivot_index + 1;
+    }
+}
+
+// ----------------------------------------------------------------------------
+// 堆排序（内省排序的兜底算法）
+// ----------------------------------------------------------------------------
+
+// 以arr[low]为堆底起点，对下标root做下沉，堆中共有n个元素
+static void SORT_NAME(sift_down)(SORT_TYPE arr[], int low, int root, int n) {
+    while (2 * root + 1 < n) {
+        int child = 2 * root + 1;
+        if (child + 1 < n && SORT_LESS(arr[low + child], arr[low + child + 1])) child++;
+        if (!SORT_LESS(arr[low + root], arr[low + child])) return;
+        SORT_NAME(swap)(&arr[low + root], &arr[low + child]);
+        root = child;
+    }
+}
+
+// 对arr[low..high]做堆排序，最坏O(n log n)
+static void SORT_NAME(heap_sort_range)(SORT_TYPE arr[], int low, int high) {
+    int n = high - low + 1;
+    for (int root = n / 2 - 1; root >= 0; root--) {
+        SORT_NAME(sift_down)(arr, low, root, n);
+    }
+    for (int end = n - 1; end > 0; end--) {
+        SORT_NAME(swap)(&arr[low], &arr[low + end]);
+        SORT_NAME(sift_down)(arr, low, 0, end);
+    }
+}
+
+// ----------------------------------------------------------------------------
+// 快速排序
+// ----------------------------------------------------------------------------
+
+// 递归排序[low, high]：对较小的子区间递归，较大的子区间在循环中继续处理，递归深度为O(log n)
+// depth_limit只对内省排序生效，耗尽后剩余区间改用堆排序
+static void SORT_NAME(quick_sort_range)(SORT_TYPE arr[], int low, int high, PivotStrategy strategy,
+                                        int depth_limit) {
+    char marker = 0;
+    aux_note_stack_frame(&marker);
+
+    while (low < high) {
+        if (strategy == PIVOT_INTROSORT && depth_limit-- <= 0) {
+            SORT_NAME(heap_sort_range)(arr, low, high);
+            return;
+        }
+
+        int left_high, right_low;
+        SORT_NAME(partition_range)(arr, low, high, strategy, &left_high, &right_low);
+
+        if (left_high - low < high - right_low) {
+            SORT_NAME(quick_sort_range)(arr, low, left_high, strategy, depth_limit);
+            low = right_low;
+        } else {
+            SORT_NAME(quick_sort_range)(arr, right_low, high, strategy, depth_limit);
+            high = left_high;
+        }
+    }
+}
+
+// 递归快速排序
+SortError SORT_NAME(quick_sort_recursive)(SORT_TYPE arr[], int low, int high, PivotStrategy strategy) {
+    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
+    if (low < 0 || high < 0 || low > high) return SORT_ERROR_INVALID_SIZE;
+
+    // 参数校验只在入口做一次；划分产生的空区间是正常情况，不是错误
+    char marker = 0;
+    aux_note_stack_frame(&marker);
+    SORT_NAME(quick_sort_range)(arr, low, high, strategy, introsort_depth_limit(high - low + 1));
+    return SORT_SUCCESS;
+}
+
+// 非递归快速排序（使用固定容量的显式栈）
+SortError SORT_NAME(quick_sort_iterative)(SORT_TYPE arr[], int low, int high, PivotStrategy strategy) {
+    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
+    if (low < 0 || high < 0 || low > high) return SORT_ERROR_INVALID_SIZE;
+
+    // 较大的子区间入栈、继续处理较小的子区间，栈中每一项的区间长度至少是其上一项的两倍，
+    // 栈深度不超过log2(n)，固定大小的数组放在C栈上即可，不需要按n分配
+    StackItem stack[QUICK_SORT_STACK_CAPACITY];
+    int top = -1;
+    int max_top = -1;
+
+    int current_low = low;
+    int current_high = high;
+    int depth_limit = introsort_depth_limit(high - low + 1);
+
+    for (;;) {
+        if (current_low < current_high &&
+            !(strategy == PIVOT_INTROSORT && depth_limit <= 0)) {
+            int left_high, right_low;
+            SORT_NAME(partition_range)(arr, current_low, current_high, strategy, &left_high, &right_low);
+            depth_limit--;
+
+            // 较大的子区间入栈，较小的子区间在下一轮循环中处理
+            int larger_low = right_low, larger_high = current_high;
+            if (left_high - current_low > current_high - right_low) {
+                larger_low = current_low;
+                larger_high = left_high;
+                current_low = right_low;
+            } else {
+                current_high = left_high;
+            }
+
+            if (larger_low < larger_high) {
+                if (top + 1 == QUICK_SORT_STACK_CAPACITY) {
+                    return SORT_ERROR_MEMORY_ALLOC;  // 不会发生：深度上限为log2(INT_MAX)
+                }
+                stack[++top].low = larger_low;
+                stack[top].high = larger_high;
+                stack[top].depth_limit = depth_limit;
+                if (top > max_top) max_top = top;
+            }
+            continue;
+        }
+
+        // 内省排序深度耗尽：剩余区间改用堆排序
+        if (current_low < current_high) {
+            SORT_NAME(heap_sort_range)(arr, current_low, current_high);
+        }
+
+        // 弹出区间
+        if (top < 0) break;
+        current_low = stack[top].low;
+        current_high = stack[top].high;
+        depth_limit = stack[top--].depth_limit;
+    }
+
+    aux_note_stack_bytes((size_t)(max_top + 1) * sizeof(StackItem));
+    return SORT_SUCCESS;
+}
+
+// ----------------------------------------------------------------------------
+// 归并排序（每次合并分配临时数组）
+// ----------------------------------------------------------------------------
+
+// 合并两个有序数组（相等时先取左侧元素，排序是稳定的）
+static void SORT_NAME(merge_arrays)(SORT_TYPE arr[], int left, int mid, int right) {
+    int left_size = mid - left + 1;
+    int right_size = right - mid;
+
+    // 创建临时数组
+    SORT_TYPE* left_arr = (SORT_TYPE*)aux_malloc(left_size * sizeof(SORT_TYPE));
+    SORT_TYPE* right_arr = (SORT_TYPE*)aux_malloc(right_size * sizeof(SORT_TYPE));
+
+    if (left_arr == NULL || right_arr == NULL) {
+        aux_free(left_arr, left_size * sizeof(SORT_TYPE));
+        aux_free(right_arr, right_size * sizeof(SORT_TYPE));
+        return;
+    }
+
+    // 复制数据到临时数组
+    for (int i = 0; i < left_size; i++)
+        left_arr[i] = arr[left + i];
+    for (int j = 0; j < right_size; j++)
+        right_arr[j] = arr[mid + 1 + j];
+
+    // 合并临时数组回原数组
+    int i = 0, j = 0, k = left;
+    while (i < left_size && j < right_size) {
+        if (!SORT_LESS(right_arr[j], left_arr[i])) {
+            arr[k] = left_arr[i];
+            i++;
+        } else {
+            arr[k] = right_arr[j];
+            j++;
+        }
+        k++;
+    }
+
+    // 复制剩余元素
+    while (i < left_size) {
+        arr[k] = left_arr[i];
+        i++;
+        k++;
+    }
+
+    while (j < right_size) {
+        arr[k] = right_arr[j];
+        j++;
+        k++;
+    }
+
+    aux_free(left_arr, left_size * sizeof(SORT_TYPE));
+    aux_free(right_arr, right_size * sizeof(SORT_TYPE));
+}
+
+// 串行归并排序（内部使用）
+static SortError SORT_NAME(merge_sort_serial)(SORT_TYPE arr[], int left, int right) {
+    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
+    if (left < 0 || right < 0 || left > right) return SORT_ERROR_INVALID_SIZE;
+
+    if (left < right) {
+        int mid = left + (right - left) / 2;
+
+        // 递归排序左半部分
+        SortError left_error = SORT_NAME(merge_sort_serial)(arr, left, mid);
+        if (left_error != SORT_SUCCESS) return left_error;
+
+        // 递归排序右半部分
+        SortError right_error = SORT_NAME(merge_sort_serial)(arr, mid + 1, right);
+        if (right_error != SORT_SUCCESS) return right_error;
+
+        // 合并两个有序部分
+        SORT_NAME(merge_arrays)(arr, left, mid, right);
+    }
+
+    return SORT_SUCCESS;
+}
+
+// 递归创建OpenMP任务，depth降为0后转为串行归并
+static void SORT_NAME(merge_sort_tasks)(SORT_TYPE arr[], int left, int right, int depth) {
+    if (depth <= 0 || right - left < MERGE_PARALLEL_THRESHOLD) {
+        SORT_NAME(merge_sort_serial)(arr, left, right);
+        return;
+    }
+
+    int mid = left + (right - left) / 2;
+
+    #ifdef _OPENMP
+    // 左半部分交给其他线程，当前线程继续处理右半部分
+    #pragma omp task
+    SORT_NAME(merge_sort_tasks)(arr, left, mid, depth - 1);
+    SORT_NAME(merge_sort_tasks)(arr, mid + 1, right, depth - 1);
+    #pragma omp taskwait
+    #else
+    SORT_NAME(merge_sort_tasks)(arr, left, mid, depth - 1);
+    SORT_NAME(merge_sort_tasks)(arr, mid + 1, right, depth - 1);
+    #endif
+
+    // 合并结果
+    SORT_NAME(merge_arrays)(arr, left, mid, right);
+}
+
+// 并行归并排序（指定任务深度上限，0表示完全串行）
+SortError SORT_NAME(merge_sort_parallel_depth)(SORT_TYPE arr[], int left, int right, int task_depth) {
+    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
+    if (left < 0 || right < 0 || left > right) return SORT_ERROR_INVALID_SIZE;
+
+    int depth = merge_sort_effective_task_depth(task_depth);
+
+    // 小数组或深度上限为0时使用串行版本
+    if (depth == 0 || right - left < MERGE_PARALLEL_THRESHOLD) {
+        return SORT_NAME(merge_sort_serial)(arr, left, right);
+    }
+
+    #ifdef _OPENMP
+    // 只创建一个并行区域，由单个线程递归生成任务（避免每层递归都嵌套parallel sections）
+    #pragma omp parallel
+    #pragma omp single
+    SORT_NAME(merge_sort_tasks)(arr, left, right, depth);
+    #else
+    SORT_NAME(merge_sort_tasks)(arr, left, right, depth);
+    #endif
+
+    return SORT_SUCCESS;
+}
+
+// ----------------------------------------------------------------------------
+// 单缓冲区归并排序（排序期间只分配一次辅助空间）
+// ----------------------------------------------------------------------------
+
+// 对arr[left..right]做插入排序
+static void SORT_NAME(insertion_sort_range)(SORT_TYPE arr[], int left, int right) {
+    for (int i = left + 1; i <= right; i++) {
+        SORT_TYPE key = arr[i];
+        int j = i - 1;
+        while (j >= left && SORT_LESS(key, arr[j])) {
+            arr[j + 1] = arr[j];
+            j--;
+        }
+        arr[j + 1] = key;
+    }
+}
+
+// 把src中两个相邻的有序区间[left..mid]、[mid+1..right]合并到dst的同一位置
+static void SORT_NAME(merge_into)(const SORT_TYPE src[], SORT_TYPE dst[], int left, int mid, int right) {
+    int i = left, j = mid + 1, k = left;
+    while (i <= mid && j <= right) {
+        dst[k++] = !SORT_LESS(src[j], src[i]) ? src[i++] : src[j++];
+    }
+    while (i <= mid) dst[k++] = src[i++];
+    while (j <= right) dst[k++] = src[j++];
+}
+
+// 将[left..right]排序后写入dst；调用前src与dst在该区间内容相同
+// 子区间排序结果写入src，再合并回dst，源和目标逐层交替，不需要额外复制
+// 每个任务只访问自己负责的区间，即共享缓冲区中互不重叠的一段
+static void SORT_NAME(merge_sort_pingpong)(SORT_TYPE src[], SORT_TYPE dst[], int left, int right, int depth) {
+    if (right - left < MERGE_INSERTION_CUTOFF) {
+        SORT_NAME(insertion_sort_range)(dst, left, right);
+        return;
+    }
+
+    int mid = left + (right - left) / 2;
+
+    #ifdef _OPENMP
+    if (depth > 0 && right - left >= MERGE_PARALLEL_THRESHOLD) {
+        #pragma omp task
+        SORT_NAME(merge_sort_pingpong)(dst, src, left, mid, depth - 1);
+        SORT_NAME(merge_sort_pingpong)(dst, src, mid + 1, right, depth - 1);
+        #pragma omp taskwait
+    } else {
+        SORT_NAME(merge_sort_pingpong)(dst, src, left, mid, 0);
+        SORT_NAME(merge_sort_pingpong)(dst, src, mid + 1, right, 0);
+    }
+    #else
+    (void)depth;
+    SORT_NAME(merge_sort_pingpong)(dst, src, left, mid, 0);
+    SORT_NAME(merge_sort_pingpong)(dst, src, mid + 1, right, 0);
+    #endif
+
+    SORT_NAME(merge_into)(src, dst, left, mid, right);
+}
+
+// 单缓冲区归并排序（指定任务深度上限，0表示完全串行）
+SortError SORT_NAME(merge_sort_buffered_depth)(SORT_TYPE arr[], int left, int right, int task_depth) {
+    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
+    if (left < 0 || right < 0 || left > right) return SORT_ERROR_INVALID_SIZE;
+
+    int n = right - left + 1;
+    int depth = merge_sort_effective_task_depth(task_depth);
+
+    // 整个排序只分配这一块辅助空间，按下标偏移使用
+    SORT_TYPE* scratch = (SORT_TYPE*)aux_malloc(n * sizeof(SORT_TYPE));
+    if (scratch == NULL) return SORT_ERROR_MEMORY_ALLOC;
+    SORT_TYPE* buffer = scratch - left;
+    for (int i = left; i <= right; i++) buffer[i] = arr[i];
+
+    #ifdef _OPENMP
+    if (depth > 0 && right - left >= MERGE_PARALLEL_THRESHOLD) {
+        #pragma omp parallel
+        #pragma omp single
+        SORT_NAME(merge_sort_pingpong)(buffer, arr, left, right, depth);
+    } else {
+        SORT_NAME(merge_sort_pingpong)(buffer, arr, left, right, 0);
+    }
+    #else
+    SORT_NAME(merge_sort_pingpong)(buffer, arr, left, right, depth);
+    #endif
+
+    aux_free(scratch, n * sizeof(SORT_TYPE));
+    return SORT_SUCCESS;
+}
+
+// ----------------------------------------------------------------------------
+// LSD基数排序（排序期间只分配一块辅助空间）
+// ----------------------------------------------------------------------------
+
+// 从最低字节到最高字节逐趟稳定分配，每趟在原数组和辅助缓冲区之间交替；不比较元素，时间为O(字节数 · n)
+SortError SORT_NAME(radix_sort)(SORT_TYPE arr[], int left, int right) {
+    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
+    if (left < 0 || right < 0 || left > right) return SORT_ERROR_INVALID_SIZE;
+
+    int n = right - left + 1;
+    SORT_TYPE* src = arr + left;
+
+    // 直方图遍历：读一遍数组，同时统计每一趟（每个字节）各数字的个数
+    int counts[SORT_RADIX_KEY_BYTES][RADIX_BUCKETS];
+    memset(counts, 0, sizeof(counts));
+    aux_note_stack_bytes(sizeof(counts));
+    for (int i = 0; i < n; i++) {
+        uint64_t key = SORT_RADIX_KEY(src[i]);
+        for (int pass = 0; pass < SORT_RADIX_KEY_BYTES; pass++) {
+            counts[pass][(key >> (pass * RADIX_BITS)) & (RADIX_BUCKETS - 1)]++;
+        }
+    }
+
+    SORT_TYPE* scratch = (SORT_TYPE*)aux_malloc(n * sizeof(SORT_TYPE));
+    if (scratch == NULL) return SORT_ERROR_MEMORY_ALLOC;
+
+    SORT_TYPE* from = src;
+    SORT_TYPE* to = scratch;
+    for (int pass = 0; pass < SORT_RADIX_KEY_BYTES; pass++) {
+        int shift = pass * RADIX_BITS;
+        int* count = counts[pass];
+        // 所有元素这个字节都相同（如[0, 1000000)的int32键的最高字节）时这一趟不改变顺序，跳过
+        if (count[(SORT_RADIX_KEY(from[0]) >> shift) & (RADIX_BUCKETS - 1)] == n) continue;
+
+        // 前缀和：每个数字在输出中的起始位置
+        int offset = 0;
+        for (int digit = 0; digit < RADIX_BUCKETS; digit++) {
+            int digit_count = count[digit];
+            count[digit] = offset;
+            offset += digit_count;
+        }
+        for (int i = 0; i < n; i++) {
+            to[count[(SORT_RADIX_KEY(from[i]) >> shift) & (RADIX_BUCKETS - 1)]++] = from[i];
+        }
+
+        SORT_TYPE* swap = from;
+        from = to;
+        to = swap;
+    }
+
+    // 奇数趟时结果在辅助缓冲区中
+    if (from != src) memcpy(src, from, n * sizeof(SORT_TYPE));
+
+    aux_free(scratch, n * sizeof(SORT_TYPE));
+    return SORT_SUCCESS;
+}
+
+// ----------------------------------------------------------------------------
+// 并行样本排序
+// ----------------------------------------------------------------------------
+
+// 返回不大于value的分隔值个数，即value所属桶的编号（二分查找，与分隔值相等的元素落在同一个桶）
+static inline int SORT_NAME(sample_bucket)(const SORT_TYPE splitters[], int count, SORT_TYPE value) {
+    int low = 0, high = count;
+    while (low < high) {
+        int mid = low + (high - low) / 2;
+        if (SORT_LESS(value, splitters[mid])) {
+            high = mid;
+        } else {
+            low = mid + 1;
+        }
+    }
+    return low;
+}
+
+// 取样选出分隔值，把数组分到 线程数 × SAMPLE_SORT_BUCKETS_PER_THREAD 个桶中，各桶再并行做内省排序
+// 每个线程负责数组的一个分块：直方图遍历统计各桶的元素数，前缀和得到每个分块在每个桶中的写入位置，
+// 分配时各线程写入辅助缓冲区中互不重叠的区间，不需要加锁
+SortError SORT_NAME(sample_sort)(SORT_TYPE arr[], int left, int right) {
+    if (arr == NULL) return SORT_ERROR_NULL_POINTER;
+    if (left < 0 || right < 0 || left > right) return SORT_ERROR_INVALID_SIZE;
+
+    int n = right - left + 1;
+    int threads = 1;
+    #ifdef _OPENMP
+    threads = omp_get_max_threads();
+    #endif
+    int buckets = threads * SAMPLE_SORT_BUCKETS_PER_THREAD;
+    int samples = buckets * SAMPLE_SORT_OVERSAMPLING;
+
+    // 小数组取样和分配的开销得不偿失，直接内省排序
+    if (n < SAMPLE_SORT_THRESHOLD || n < 2 * samples) {
+        return SORT_NAME(quick_sort_iterative)(arr, left, right, PIVOT_INTROSORT);
+    }
+
+    SORT_TYPE* src = arr + left;
+    size_t scratch_bytes = ((size_t)n + samples) * sizeof(SORT_TYPE);
+    size_t count_bytes = ((size_t)threads * buckets + buckets + 1) * sizeof(int);
+    SORT_TYPE* scratch = (SORT_TYPE*)aux_malloc(scratch_bytes);
+    int* counts = (int*)aux_malloc(count_bytes);
+    if (scratch == NULL || counts == NULL) {
+        aux_free(scratch, scratch_bytes);
+        aux_free(counts, count_bytes);
+        return SORT_ERROR_MEMORY_ALLOC;
+    }
+
+    // 等间隔取样并排序，每SAMPLE_SORT_OVERSAMPLING个样本取一个分隔值，共buckets - 1个（原地压缩到样本开头）
+    SORT_TYPE* splitters = scratch + n;
+    for (int s = 0; s < samples; s++) {
+        splitters[s] = src[(int)((int64_t)s * n / samples) + n / samples / 2];
+    }
+    SORT_NAME(heap_sort_range)(splitters, 0, samples - 1);
+    for (int b = 0; b < buckets - 1; b++) {
+        splitters[b] = splitters[(b + 1) * SAMPLE_SORT_OVERSAMPLING - 1];
+    }
+
+    // 直方图遍历：每个分块统计落入各桶的元素数
+    #ifdef _OPENMP
+    #pragma omp parallel for schedule(static)
+    #endif
+    for (int c = 0; c < threads; c++) {
+        int* count = counts + (size_t)c * buckets;
+        int begin = (int)((int64_t)n * c / threads);
+        int end = (int)((int64_t)n * (c + 1) / threads);
+        for (int b = 0; b < buckets; b++) count[b] = 0;
+        for (int i = begin; i < end; i++) {
+            count[SORT_NAME(sample_bucket)(splitters, buckets - 1, src[i])]++;
+        }
+    }
+
+    // 前缀和：桶按顺序排列，同一个桶内按分块顺序排列
+    int* bucket_start = counts + (size_t)threads * buckets;
+    int offset = 0;
+    for (int b = 0; b < buckets; b++) {
+        bucket_start[b] = offset;
+        for (int c = 0; c < threads; c++) {
+            int count = counts[(size_t)c * buckets + b];
+            counts[(size_t)c * buckets + b] = offset;
+            offset += count;
+        }
+    }
+    bucket_start[buckets] = n;
+
+    // 分配：每个分块把元素写入各桶中属于自己的区间
+    #ifdef _OPENMP
+    #pragma omp parallel for schedule(static)
+    #endif
+    for (int c = 0; c < threads; c++) {
+        int* position = counts + (size_t)c * buckets;
+        int begin = (int)((int64_t)n * c / threads);
+        int end = (int)((int64_t)n * (c + 1) / threads);
+        for (int i = begin; i < end; i++) {
+            scratch[position[SORT_NAME(sample_bucket)(splitters, buckets - 1, src[i])]++] = src[i];
+        }
+    }
+
+    // 各桶独立排序后写回原数组；重复值多时桶的大小不均，动态调度
+    #ifdef _OPENMP
+    #pragma omp parallel for schedule(dynamic, 1)
+    #endif
+    for (int b = 0; b < buckets; b++) {
+        int low = bucket_start[b];
+        int high = bucket_start[b + 1] - 1;
+        if (low < high) SORT_NAME(quick_sort_iterative)(scratch, low, high, PIVOT_INTROSORT);
+        if (low <= high) memcpy(src + low, scratch + low, (size_t)(high - low + 1) * sizeof(SORT_TYPE));
+    }
+
+    aux_free(counts, count_bytes);
+    aux_free(scratch, scratch_bytes);
+    return SORT_SUCCESS;
+}
+
+// ----------------------------------------------------------------------------
+// 类型无关的入口（SortKernels函数表）
+// ----------------------------------------------------------------------------
+
+static SortError SORT_NAME(quick_sort_recursive_any)(void* arr, int low, int high, PivotStrategy strategy) {
+    return SORT_NAME(quick_sort_recursive)((SORT_TYPE*)arr, low, high, strategy);
+}
+
+static SortError SORT_NAME(quick_sort_iterative_any)(void* arr, int low, int high, PivotStrategy strategy) {
+    return SORT_NAME(quick_sort_iterative)((SORT_TYPE*)arr, low, high, strategy);
+}
+
+static SortError SORT_NAME(merge_sort_parallel_any)(void* arr, int left, int right, int task_depth) {
+    return SORT_NAME(merge_sort_parallel_depth)((SORT_TYPE*)arr, left, right, task_depth);
+}
+
+static SortError SORT_NAME(merge_sort_buffered_any)(void* arr, int left, int right, int task_depth) {
+    return SORT_NAME(merge_sort_buffered_depth)((SORT_TYPE*)arr, left, right, task_depth);
+}
+
+static SortError SORT_NAME(radix_sort_any)(void* arr, int left, int right) {
+    return SORT_NAME(radix_sort)((SORT_TYPE*)arr, left, right);
+}
+
+static SortError SORT_NAME(sample_sort_any)(void* arr, int left, int right) {
+    return SORT_NAME(sample_sort)((SORT_TYPE*)arr, left, right);
+}
+
+static int SORT_NAME(is_sorted_any)(const void* arr, int n) {
+    return SORT_NAME(is_sorted)((const SORT_TYPE*)arr, n);
+}
+
+static void SORT_NAME(from_int)(void* dest, const int src[], int n) {
+    SORT_TYPE* out = (SORT_TYPE*)dest;
+    for (int i = 0; i < n; i++) {
+        SORT_FROM_INT(out[i], src[i], i);
+    }
+}
+
+#undef SORT_NAME
+#undef SORT_CONCAT
+#undef SORT_CONCAT_
+#undef SORT_TYPE
+#undef SORT_SUFFIX
+#undef SORT_LESS
+#undef SORT_FROM_INT
+#undef SORT_RADIX_KEY
+#undef SORT_RADIX_KEY_BYTES
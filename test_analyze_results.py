@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+analyze_results.py 的回归测试: python -m pytest -q
+"""
+
+import pandas as pd
+
+from analyze_results import relative_to_fastest
+
+
+def test_relative_to_fastest_aligns_with_shuffled_rows():
+    """打乱行顺序、规模交错时，每行的比值仍与该行自己的索引对齐"""
+    sizes = [1000, 5000, 10000]
+    rows = [{'Algorithm': f'algo{a}', 'Size': size, 'Time(ms)': (a + 1) * size / 1000}
+            for a in range(4) for size in sizes]
+    df = pd.DataFrame(rows).sample(frac=1, random_state=7)
+    df.index = [f'row{i}' for i in range(len(df))]
+    ratio = relative_to_fastest(df)
+
+    assert list(ratio.index) == list(df.index)
+    # algo{a}在每个规模下都是最快算法（algo0）的 a+1 倍
+    expected = df['Algorithm'].str[4:].astype(int) + 1
+    pd.testing.assert_series_equal(ratio, expected.astype('float64'), check_names=False)
+    df = df.assign(PerformanceRatio=ratio)
+    fastest = df[df['Algorithm'] == 'algo0']
+    assert (fastest['PerformanceRatio'] == 1.0).all()
+
+
+def test_relative_to_fastest_zero_time_counts_as_fastest():
+    """同组最快时间为0时无法比较，比值记为1"""
+    df = pd.DataFrame({'Size': [10, 10, 20], 'Time(ms)': [0.0, 0.5, 2.0]}, index=[5, 3, 9])
+    ratio = relative_to_fastest(df)
+    assert ratio.loc[5] == 1.0 and ratio.loc[3] == 1.0 and ratio.loc[9] == 1.0
+
+
+def test_relative_to_fastest_among_subset():
+    """among只限定最快值的候选行，其余行同样得到相对该最快值的比值"""
+    df = pd.DataFrame({'Size': [10, 10, 10, 20, 20], 'Time(ms)': [1.0, 4.0, 2.0, 3.0, 6.0]}, index=[4, 2, 0, 1, 3])
+    ratio = relative_to_fastest(df, among=pd.Series([False, True, True, True, False], index=df.index))
+    assert list(ratio) == [0.5, 2.0, 1.0, 1.0, 2.0]
+
+
+def _cells(counts):
+    """构造样本表：第i个单元有counts[i]个样本，时间为1..n"""
+    from analyze_results import AGGREGATE_KEYS
+    rows = []
+    for size, n in enumerate(counts, 1):
+        key = dict(zip(AGGREGATE_KEYS, ['Quick Sort (Iterative)', 'Median3', 'Uniform', '-O2', 'int32', 1, 0, size]))
+        rows += [{**key, 'Time(ms)': float(t)} for t in range(1, n + 1)]
+    return pd.DataFrame(rows)
+
+
+def test_sample_statistics_quartiles_and_minimum_samples():
+    """分位数与逐单元计算一致；样本数少于BOOTSTRAP_MIN_SAMPLES的单元没有置信区间"""
+    import numpy as np
+    from analyze_results import BOOTSTRAP_MIN_SAMPLES, _sample_statistics
+    counts = [1, 2, BOOTSTRAP_MIN_SAMPLES - 1, BOOTSTRAP_MIN_SAMPLES, 9, 9, 30]
+    stats = _sample_statistics(_cells(counts).sample(frac=1, random_state=1)).set_index('Size')
+    for size, n in enumerate(counts, 1):
+        q1, median, q3 = np.percentile(np.arange(1, n + 1), [25, 50, 75])
+        row = stats.loc[size]
+        assert row['Samples'] == n
+        assert (row['Q1'], row['Median'], row['Q3']) == (q1, median, q3)
+        if n < BOOTSTRAP_MIN_SAMPLES:
+            assert np.isnan(row['CILow']) and np.isnan(row['CIHigh'])
+        else:
+            assert row['CILow'] <= median <= row['CIHigh']
+
+
+def test_fit_amdahl_no_speedup_has_no_usable_threads():
+    """多线程没有加速（f = 0）时可用线程数为0，而不是公式给出的1/e = 2"""
+    from analyze_results import fit_amdahl
+    scaling = pd.DataFrame({'Distribution': 'Uniform', 'Size': 100000, 'Threads': [1, 2, 4],
+                            'Speedup': [1.0, 0.9, 0.8]})
+    fit = fit_amdahl(scaling).iloc[0]
+    assert fit['ParallelFraction'] == 0.0 and fit['UsefulThreads'] == 0 and fit['MaxSpeedup'] == 1.0
@@ -1,13 +1,193 @@
 #include "test_data.h"
+#include <math.h>
+#include <string.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+
+// 文件头必须正好32字节，与Python端的numpy dtype保持一致
+typedef char test_data_header_size_check[(sizeof(TestDataHeader) == 32) ? 1 : -1];
+
+// 默认随机种子
+#define DEFAULT_SEED 123456789u
 
 // 简单的伪随机数生成器（不依赖stdlib的rand）
-static unsigned int random_seed = 123456789;
+static unsigned int random_seed = DEFAULT_SEED;
 
 static int simple_rand() {
     random_seed = (random_seed * 1103515245 + 12345) & 0x7fffffff;
     return (int)(random_seed >> 16) & 0x7fff;
 }
 
+// 返回[0, bound)内的伪随机整数（拼接两次simple_rand得到30位随机数）
+static int rand_below(int bound) {
+    int r = (simple_rand() << 15) | simple_rand();
+    return r % bound;
+}
+
+// 获取数据分布名称（与性能日志中的Distribution列一致）
+const char* distribution_name(DataDistribution distribution) {
+    switch(distribution) {
+        case DIST_UNIFORM: return "Uniform";
+        case DIST_SORTED: return "Sorted";
+        case DIST_REVERSED: return "Reversed";
+        case DIST_FEW_UNIQUE: return "FewUnique";
+        case DIST_NEARLY_SORTED: return "NearlySorted";
+        case DIST_ORGAN_PIPE: return "OrganPipe";
+        case DIST_ZIPF: return "Zipf";
+        default: return "Unknown";
+    }
+}
+
+// ============================================================================
+// 分块生成：按顺序逐块产生一个分布的数据，不需要一次分配整个数组
+// ============================================================================
+
+// 生成状态：下一个元素的位置；近乎有序分布只保存被交换过的位置及其最终取值（按位置升序）
+typedef struct {
+    DataDistribution distribution;
+    int size;
+    int position;
+    int* touched_positions;
+    int* touched_values;
+    int num_touched;
+    int next_touched;
+} DataStream;
+
+static int compare_ints(const void* a, const void* b) {
+    int x = *(const int*)a, y = *(const int*)b;
+    return (x > y) - (x < y);
+}
+
+// 升序排列的第i个元素（有序、近乎有序分布）
+static int sorted_value(long long i, int size) {
+    return (int)(i * 1000000 / size);
+}
+
+// 近乎有序分布：先抽取全部交换（与在整个数组上交换时的随机数顺序相同），
+// 再在"被交换过的位置 -> 取值"的稀疏表上重放，内存只与交换次数成正比
+static DataError plan_nearly_sorted_swaps(DataStream* stream) {
+    int size = stream->size;
+    int swaps = (int)((long long)size * NEARLY_SORTED_SWAP_PERCENT / 100);
+    if (swaps < 1) swaps = 1;
+    int* pairs = (int*)malloc((size_t)swaps * 2 * sizeof(int));
+    int* positions = (int*)malloc((size_t)swaps * 2 * sizeof(int));
+    int* values = (int*)malloc((size_t)swaps * 2 * sizeof(int));
+    if (pairs == NULL || positions == NULL || values == NULL) {
+        free(pairs);
+        free(positions);
+        free(values);
+        return DATA_ERROR_MEMORY;
+    }
+    for (int k = 0; k < swaps; k++) {
+        pairs[2 * k] = rand_below(size);
+        pairs[2 * k + 1] = rand_below(size);
+    }
+    
+    // 去重后的被交换位置（升序），初始取值为有序序列中的值
+    memcpy(positions, pairs, (size_t)swaps * 2 * sizeof(int));
+    qsort(positions, (size_t)swaps * 2, sizeof(int), compare_ints);
+    int count = 0;
+    for (int k = 0; k < swaps * 2; k++) {
+        if (count == 0 || positions[count - 1] != positions[k]) positions[count++] = positions[k];
+    }
+    for (int k = 0; k < count; k++) values[k] = sorted_value(positions[k], size);
+    
+    for (int k = 0; k < swaps; k++) {
+        int* a = (int*)bsearch(&pairs[2 * k], positions, count, sizeof(int), compare_ints);
+        int* b = (int*)bsearch(&pairs[2 * k + 1], positions, count, sizeof(int), compare_ints);
+        int temp = values[a - positions];
+        values[a - positions] = values[b - positions];
+        values[b - positions] = temp;
+    }
+    free(pairs);
+    stream->touched_positions = positions;
+    stream->touched_values = values;
+    stream->num_touched = count;
+    return DATA_SUCCESS;
+}
+
+// 开始生成size个元素（每次都从固定种子开始，结果可复现）
+static DataError data_stream_begin(DataStream* stream, int size, DataDistribution distribution) {
+    if (size <= 0) return DATA_ERROR_INVALID_SIZE;
+    if (distribution < 0 || distribution >= DIST_COUNT) return DATA_ERROR_INVALID_SIZE;
+    memset(stream, 0, sizeof(*stream));
+    stream->distribution = distribution;
+    stream->size = size;
+    
+    // 重置随机种子
+    random_seed = DEFAULT_SEED;
+    if (distribution == DIST_NEARLY_SORTED) return plan_nearly_sorted_swaps(stream);
+    return DATA_SUCCESS;
+}
+
+// 生成接下来的count个元素，取值范围均为[0, 1000000)
+static void data_stream_fill(DataStream* stream, int out[], int count) {
+    int size = stream->size;
+    int first = stream->position;
+    for (int j = 0; j < count; j++) {
+        long long i = first + j;
+        switch (stream->distribution) {
+            case DIST_UNIFORM:
+                out[j] = simple_rand() % 1000000;
+                break;
+            case DIST_SORTED:
+            case DIST_NEARLY_SORTED:
+                out[j] = sorted_value(i, size);
+                break;
+            case DIST_REVERSED:
+                out[j] = sorted_value(size - 1 - i, size);
+                break;
+            case DIST_FEW_UNIQUE:
+                out[j] = (simple_rand() % FEW_UNIQUE_VALUES) * (1000000 / FEW_UNIQUE_VALUES);
+                break;
+            case DIST_ORGAN_PIPE: {
+                int half = (size + 1) / 2;
+                long long rank = (i < half) ? i : size - 1 - i;
+                out[j] = (int)(rank * 1000000 / half);
+                break;
+            }
+            case DIST_ZIPF: {
+                // 取 k = floor(N^u)，u均匀分布于[0,1)，则P(k)近似正比于1/k
+                double u = (double)rand_below(1 << 30) / (double)(1 << 30);
+                out[j] = (int)pow(1000000.0, u) - 1;
+                break;
+            }
+            default:
+                out[j] = 0;
+                break;
+        }
+    }
+    // 近乎有序：覆盖本块中被交换过的位置
+    while (stream->next_touched < stream->num_touched &&
+           stream->touched_positions[stream->next_touched] < first + count) {
+        out[stream->touched_positions[stream->next_touched] - first] =
+            stream->touched_values[stream->next_touched];
+        stream->next_touched++;
+    }
+    stream->position += count;
+}
+
+static void data_stream_end(DataStream* stream) {
+    free(stream->touched_positions);
+    free(stream->touched_values);
+    stream->touched_positions = NULL;
+    stream->touched_values = NULL;
+}
+
+// 按指定分布填充数据，取值范围均为[0, 1000000)
+DataError fill_test_data(int data[], int size, DataDistribution distribution) {
+    if (data == NULL) return DATA_ERROR_MEMORY;
+    
+    DataStream stream;
+    DataError error = data_stream_begin(&stream, size, distribution);
+    if (error != DATA_SUCCESS) return error;
+    data_stream_fill(&stream, data, size);
+    data_stream_end(&stream);
+    return DATA_SUCCESS;
+}
+
 // 生成测试数据
 DataError generate_test_data(const char* filename, int size) {
     if (filename == NULL) return DATA_ERROR_FILE;
@@ -19,7 +199,7 @@ DataError generate_test_data(const char* filename, int size) {
     }
     
     // 重置随机种子
-    random_seed = 123456789;
+    random_seed = DEFAULT_SEED;
     
     for (int i = 0; i < size; i++) {
         int value = simple_rand() % 1000000;
@@ -33,7 +213,7 @@ DataError generate_test_data(const char* filename, int size) {
     return DATA_SUCCESS;
 }
 
-// 读取测试数据
+// 读取测试数据（文本格式，单遍读取，缓冲区按需倍增）
 int* read_test_data(const char* filename, int* size, DataError* error) {
     if (filename == NULL || size == NULL) {
         if (error) *error = DATA_ERROR_FILE;
@@ -46,40 +226,39 @@ int* read_test_data(const char* filename, int* size, DataError* error) {
         return NULL;
     }
     
-    // 第一遍：计算数据量
-    *size = 0;
-    int temp;
-    while (fscanf(file, "%d", &temp) == 1) {
-        (*size)++;
-    }
-    
-    if (*size <= 0) {
-        fclose(file);
-        if (error) *error = DATA_ERROR_INVALID_SIZE;
-        return NULL;
-    }
-    
-    // 第二遍：读取数据
-    rewind(file);
-    int* data = (int*)malloc(*size * sizeof(int));
+    int capacity = 1024;
+    int* data = (int*)malloc(capacity * sizeof(int));
     if (data == NULL) {
         fclose(file);
         if (error) *error = DATA_ERROR_MEMORY;
         return NULL;
     }
     
-    for (int i = 0; i < *size; i++) {
-        if (fscanf(file, "%d", &data[i]) != 1) {
-            free(data);
-            fclose(file);
-            if (error) *error = DATA_ERROR_FILE;
-            return NULL;
+    *size = 0;
+    int value;
+    while (fscanf(file, "%d", &value) == 1) {
+        if (*size == capacity) {
+            capacity *= 2;
+            int* grown = (int*)realloc(data, capacity * sizeof(int));
+            if (grown == NULL) {
+                free(data);
+                fclose(file);
+                if (error) *error = DATA_ERROR_MEMORY;
+                return NULL;
+            }
+            data = grown;
         }
+        data[(*size)++] = value;
     }
-    
     fclose(file);
-    if (error) *error = DATA_SUCCESS;
     
+    if (*size <= 0) {
+        free(data);
+        if (error) *error = DATA_ERROR_INVALID_SIZE;
+        return NULL;
+    }
+    
+    if (error) *error = DATA_SUCCESS;
     return data;
 }
 
@@ -89,3 +268,112 @@ void free_test_data(int* data) {
         free(data);
     }
 }
+
+// ============================================================================
+// 二进制格式（文件头 + 定长元素，可直接内存映射）
+// ============================================================================
+
+// 生成二进制测试数据（均匀分布与文本格式使用相同的随机序列）
+// 分块生成并写入，不一次性分配整个数组；内容与fill_test_data填充的数组完全相同
+DataError generate_test_data_binary(const char* filename, int size, DataDistribution distribution) {
+    if (filename == NULL) return DATA_ERROR_FILE;
+    
+    DataStream stream;
+    DataError error = data_stream_begin(&stream, size, distribution);
+    if (error != DATA_SUCCESS) return error;
+    
+    FILE* file = fopen(filename, "wb");
+    if (!file) {
+        data_stream_end(&stream);
+        return DATA_ERROR_FILE;
+    }
+    
+    TestDataHeader header;
+    memset(&header, 0, sizeof(header));
+    header.magic = TEST_DATA_MAGIC;
+    header.version = TEST_DATA_VERSION;
+    header.dtype = DTYPE_INT32;
+    header.count = (uint64_t)size;
+    header.seed = DEFAULT_SEED;
+    header.distribution = (uint32_t)distribution;
+    
+    int ok = fwrite(&header, sizeof(header), 1, file) == 1;
+    
+    // 分块写入，避免一次性分配整个数组
+    enum { CHUNK = 65536 };
+    static int32_t buffer[CHUNK];
+    for (int written = 0; ok && written < size; ) {
+        int count = (size - written < CHUNK) ? size - written : CHUNK;
+        data_stream_fill(&stream, buffer, count);
+        ok = fwrite(buffer, sizeof(int32_t), count, file) == (size_t)count;
+        written += count;
+    }
+    data_stream_end(&stream);
+    
+    if (fclose(file) != 0 || !ok) return DATA_ERROR_FILE;
+    return DATA_SUCCESS;
+}
+
+// 以只读方式内存映射二进制测试数据，并校验文件头
+DataError map_test_data(const char* filename, MappedTestData* mapped) {
+    if (filename == NULL || mapped == NULL) return DATA_ERROR_FILE;
+    memset(mapped, 0, sizeof(*mapped));
+    
+    int fd = open(filename, O_RDONLY);
+    if (fd < 0) return DATA_ERROR_FILE;
+    
+    struct stat st;
+    if (fstat(fd, &st) != 0 || (size_t)st.st_size < sizeof(TestDataHeader)) {
+        close(fd);
+        return DATA_ERROR_FORMAT;
+    }
+    
+    void* mapping = mmap(NULL, (size_t)st.st_size, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);
+    if (mapping == MAP_FAILED) return DATA_ERROR_MEMORY;
+    
+    TestDataHeader header;
+    memcpy(&header, mapping, sizeof(header));
+    size_t expected = sizeof(TestDataHeader) + header.count * sizeof(int32_t);
+    if (header.magic != TEST_DATA_MAGIC || header.version != TEST_DATA_VERSION ||
+        header.dtype != DTYPE_INT32 || header.count == 0 || header.count > INT32_MAX ||
+        (size_t)st.st_size < expected) {
+        munmap(mapping, (size_t)st.st_size);
+        return DATA_ERROR_FORMAT;
+    }
+    
+    mapped->header = header;
+    mapped->data = (int*)((char*)mapping + sizeof(TestDataHeader));
+    mapped->mapping = mapping;
+    mapped->mapping_size = (size_t)st.st_size;
+    return DATA_SUCCESS;
+}
+
+// 解除内存映射
+void unmap_test_data(MappedTestData* mapped) {
+    if (mapped && mapped->mapping) {
+        munmap(mapped->mapping, mapped->mapping_size);
+        memset(mapped, 0, sizeof(*mapped));
+    }
+}
+
+// 导出为文本格式（每行一个整数），便于人工查看或与旧工具交换
+DataError export_test_data_text(const char* filename, const int* data, int size) {
+    if (filename == NULL || data == NULL) return DATA_ERROR_FILE;
+    if (size <= 0) return DATA_ERROR_INVALID_SIZE;
+    
+    FILE* file = fopen(filename, "w");
+    if (!file) {
+        return DATA_ERROR_FILE;
+    }
+    
+    for (int i = 0; i < size; i++) {
+        if (fprintf(file, "%d\n", data[i]) < 0) {
+            fclose(file);
+            return DATA_ERROR_FILE;
+        }
+    }
+    
+    fclose(file);
+    return DATA_SUCCESS;
+}
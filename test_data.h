@@ -3,17 +3,71 @@
 
 #include <stdio.h>
 #include <stdlib.h>
+#include <stdint.h>
 
 typedef enum {
     DATA_SUCCESS = 0,
     DATA_ERROR_FILE = -1,
     DATA_ERROR_MEMORY = -2,
-    DATA_ERROR_INVALID_SIZE = -3
+    DATA_ERROR_INVALID_SIZE = -3,
+    DATA_ERROR_FORMAT = -4
 } DataError;
 
+// 二进制测试数据格式：32字节文件头 + count个小端序定长元素
+#define TEST_DATA_MAGIC   0x44545253u   // 文件前4个字节为 "SRTD"
+#define TEST_DATA_VERSION 1
+
+// 元素类型
+typedef enum {
+    DTYPE_INT32 = 1
+} DataType;
+
+// 数据分布
+typedef enum {
+    DIST_UNIFORM = 0,       // 均匀随机
+    DIST_SORTED,            // 已升序
+    DIST_REVERSED,          // 降序
+    DIST_FEW_UNIQUE,        // 大量重复（只有FEW_UNIQUE_VALUES种取值）
+    DIST_NEARLY_SORTED,     // 升序后随机交换k对元素（k = size * NEARLY_SORTED_SWAP_PERCENT / 100）
+    DIST_ORGAN_PIPE,        // 先升后降（管风琴形）
+    DIST_ZIPF,              // Zipf分布（s=1，小值出现频率高）
+    DIST_COUNT
+} DataDistribution;
+
+#define FEW_UNIQUE_VALUES 16
+#define NEARLY_SORTED_SWAP_PERCENT 1
+
+typedef struct {
+    uint32_t magic;         // TEST_DATA_MAGIC
+    uint16_t version;       // TEST_DATA_VERSION
+    uint16_t dtype;         // DataType
+    uint64_t count;         // 元素个数
+    uint64_t seed;          // 生成数据使用的随机种子
+    uint32_t distribution;  // DataDistribution
+    uint32_t reserved;      // 保留，写0
+} TestDataHeader;
+
+// 内存映射的测试数据（data指向映射区域中的元素，只读）
+typedef struct {
+    TestDataHeader header;
+    int* data;
+    void* mapping;
+    size_t mapping_size;
+} MappedTestData;
+
 // 函数声明
 DataError generate_test_data(const char* filename, int size);
 int* read_test_data(const char* filename, int* size, DataError* error);
 void free_test_data(int* data);
 
+// 按分布生成数据（每次调用都从固定种子开始，结果可复现）
+DataError fill_test_data(int data[], int size, DataDistribution distribution);
+const char* distribution_name(DataDistribution distribution);
+
+// 二进制格式
+DataError generate_test_data_binary(const char* filename, int size, DataDistribution distribution);
+DataError map_test_data(const char* filename, MappedTestData* mapped);
+void unmap_test_data(MappedTestData* mapped);
+DataError export_test_data_text(const char* filename, const int* data, int size);
+
 #endif
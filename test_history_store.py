@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+history_store.py 的回归测试: python -m pytest -q
+"""
+
+import sqlite3
+
+import pytest
+
+import history_store
+
+
+def _add_run(conn, run_id, run_ts, median_ms, distribution='Uniform'):
+    """写入一次运行及其单元（算法A，规模100）"""
+    conn.execute('INSERT OR IGNORE INTO runs (run_id, run_ts) VALUES (?, ?)', (run_id, run_ts))
+    conn.execute('INSERT INTO cells (run_id, run_ts, algorithm, pivot, distribution, build, dtype, threads, '
+                 'task_depth, size, samples, mean_ms, median_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                 (run_id, run_ts, 'A', 'N/A', distribution, '-O2', 'int32', 1, 0, 100, 5, 100.0, median_ms))
+
+
+def test_query_cell_period_median(tmp_path):
+    """每个时间段取各次运行中位数的中位数（偶数个取中间两个的平均），没有中位数的旧记录用平均时间"""
+    conn = history_store.connect(str(tmp_path / 'history.sqlite'))
+    with conn:
+        for i, median in enumerate([4.0, 1.0, 3.0]):
+            _add_run(conn, f'a{i}', f'2026-10-01T0{i}:00:00', median)
+        for i, median in enumerate([5.0, None, 7.0, 8.0]):
+            _add_run(conn, f'b{i}', f'2026-10-02T0{i}:00:00', median)
+        _add_run(conn, 'b0', '2026-10-02T00:00:00', 50.0, distribution='Sorted')
+
+    rows = history_store.query_cell(conn, 'A', 'N/A', 100, distribution='Uniform', period='day')
+    assert [(r['period'], r['runs'], r['median_ms'], r['min_ms'], r['max_ms']) for r in rows] == [
+        ('2026-10-01', 3, 3.0, 1.0, 4.0), ('2026-10-02', 4, 7.5, 5.0, 100.0)]
+
+    # 不按分布过滤时每个分布是单独的序列；--last只保留最近的运行
+    rows = history_store.query_cell(conn, 'A', 'N/A', 100, period='month', last_runs=4)
+    assert [(r['distribution'], r['runs'], r['median_ms']) for r in rows] == [('Sorted', 1, 50.0), ('Uniform', 4, 7.5)]
+    conn.close()
+
+
+# 版本0的单元表：没有dtype列，主键不含元素类型
+SCHEMA_V0_CELLS = """
+CREATE TABLE cells (
+    run_id TEXT NOT NULL, run_ts TEXT NOT NULL, algorithm TEXT NOT NULL, pivot TEXT NOT NULL,
+    distribution TEXT NOT NULL, build TEXT NOT NULL, threads INTEGER NOT NULL, task_depth INTEGER NOT NULL,
+    size INTEGER NOT NULL, samples INTEGER, mean_ms REAL, median_ms REAL, {extra}
+    PRIMARY KEY (run_id, algorithm, pivot, distribution, build, threads, task_depth, size)
+)"""
+
+
+def _create_v0(path, extra=''):
+    """创建版本0的数据库，含一个单元"""
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA_V0_CELLS.format(extra=extra))
+    conn.execute('CREATE INDEX idx_cells_trend ON cells (algorithm, pivot, size, run_ts)')
+    conn.execute("INSERT INTO cells (run_id, run_ts, algorithm, pivot, distribution, build, threads, task_depth, "
+                 "size, samples, mean_ms, median_ms) VALUES ('r0', '2026-10-01T00:00:00', 'A', 'N/A', 'Uniform', "
+                 "'-O2', 1, 0, 100, 5, 2.0, 1.5)")
+    conn.commit()
+    conn.close()
+
+
+def test_migrate_v0_adds_dtype(tmp_path):
+    """旧数据库升级后单元记为int32，版本号在同一事务中更新"""
+    path = str(tmp_path / 'history.sqlite')
+    _create_v0(path)
+    conn = history_store.connect(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == history_store.SCHEMA_VERSION
+    assert conn.execute('SELECT dtype, median_ms FROM cells').fetchall() == [('int32', 1.5)]
+    conn.close()
+
+
+def test_migrate_failure_rolls_back(tmp_path):
+    """升级中途失败（旧表有新格式中不存在的列）时整体回滚：旧表、旧数据和版本号保持不变"""
+    path = str(tmp_path / 'history.sqlite')
+    _create_v0(path, extra='legacy REAL,')
+    with pytest.raises(sqlite3.OperationalError):
+        history_store.connect(path)
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {'cells'}
+    assert conn.execute('SELECT median_ms FROM cells').fetchall() == [(1.5,)]
+    conn.close()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+results_store.py 的回归测试: python -m pytest -q（没有安装pyarrow时跳过）
+"""
+
+import pandas as pd
+import pytest
+
+import results_store
+
+pytest.importorskip('pyarrow')
+
+
+def _raw(algorithms):
+    """每个算法两行计时结果的原始结果表"""
+    from analyze_results import LOG_COLUMN_DEFAULTS
+    rows = [{**LOG_COLUMN_DEFAULTS, 'Algorithm': algo, 'PivotStrategy': 'N/A', 'Size': 100, 'Time(ms)': 1.0,
+             'Sorted': 1, 'Repeat': repeat}
+            for algo in algorithms for repeat in range(2)]
+    return pd.DataFrame(rows)
+
+
+def _metadata(run_id):
+    return {'run_id': run_id, 'run_date': '2026-10-17', 'started_at': '2026-10-17T00:00:00'}
+
+
+def test_reimport_replaces_all_files_of_the_run(tmp_path):
+    """重复导入同一运行时删除旧文件（包括新导入中没有的算法分区），其他运行（包括RunId前缀相同的）不受影响"""
+    store = str(tmp_path / 'store')
+    results_store.write_run(_raw(['Introsort', 'Merge Sort (Buffered)']), store, _metadata('20261017T000000-vm'))
+    results_store.write_run(_raw(['Introsort']), store, _metadata('20261017T000000-vm-2'))
+    results_store.write_run(_raw(['Introsort']), store, _metadata('20261017T000000-vm'))
+
+    counts = results_store.load_results(store).groupby(['RunId', 'Algorithm'], observed=True).size()
+    assert counts.to_dict() == {('20261017T000000-vm', 'Introsort'): 2, ('20261017T000000-vm-2', 'Introsort'): 2}